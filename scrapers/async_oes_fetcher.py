@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Async fetcher for historical BLS OES pages
+Expands a (year, area) grid into static oes_{area}.htm URLs and fetches them concurrently
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from io import BytesIO
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from http_oes_fetcher import HTTPOESFetcher
+from oes_page_cache import OESPageCache
+
+# Shared parsing helpers live in utils/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from oes_table_parser import read_target_table
+from oes_dataset import DATASET_DIR, parse_years, write_pages
+from oes_metrics import data_read, instrument, quiet_output
+
+BLS_BASE_URL = "https://www.bls.gov"
+
+def static_page_id(area_code):
+    """Page id used in static OES URLs: '0040140' -> '40140', 'nat' -> 'nat'"""
+    area_code = str(area_code).strip()
+    return area_code.lstrip('0') if area_code.isdigit() else area_code.lower()
+
+def build_oes_url(year, area_code, base_url=BLS_BASE_URL):
+    """Static May OES page URL for one year and area"""
+    return f"{base_url}/oes/{year}/may/oes_{static_page_id(area_code)}.htm"
+
+def build_oes_grid(years, area_codes, base_url=BLS_BASE_URL):
+    """Expand years x areas into (year, area_code, url) jobs"""
+    return [(year, area_code, build_oes_url(year, area_code, base_url))
+            for year in years for area_code in area_codes]
+
+def parse_oes_page(html, year, area_code):
+    """Default parser: the OES data table from a static page, tagged with year and area"""
+    df = read_target_table(BytesIO(html), 'location quotient')
+    if df is None:
+        raise ValueError("no location quotient table found")
+    df.insert(0, 'Area_Code', area_code)
+    df.insert(0, 'Year', year)
+    return df
+
+class HostRateLimiter:
+    """Spaces out request starts per host"""
+
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_start = {}
+        self._locks = {}
+
+    async def wait(self, url):
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+class AsyncOESFetcher:
+    """Concurrent fetch-and-parse of OES pages across years and areas"""
+
+    def __init__(self, concurrency=8, per_host_rate=5.0, base_url=BLS_BASE_URL, cache=None, timeout=30):
+        self.concurrency = concurrency
+        self.per_host_rate = per_host_rate
+        self.base_url = base_url
+        self.cache = cache
+        self.timeout = timeout
+
+        self.errors = []
+        self.pages = 0
+        self.bytes = 0
+
+    async def _fetch_and_parse(self, fetcher, semaphore, limiter, parser, job):
+        year, area_code, url = job
+        async with semaphore:
+            await limiter.wait(url)
+            html = await asyncio.to_thread(fetcher.fetch, url)
+        self.pages += 1
+        self.bytes += len(html)
+        # Back on the event loop's thread, inside the caller's stage
+        data_read(len(html))
+
+        # Parse as soon as the body arrives, off the event loop
+        return await asyncio.to_thread(parser, html, year, area_code)
+
+    async def fetch_all(self, years, area_codes, parser=parse_oes_page):
+        """Fetch every (year, area) page and yield parsed results as they complete"""
+        jobs = build_oes_grid(years, area_codes, self.base_url)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limiter = HostRateLimiter(self.per_host_rate)
+
+        with HTTPOESFetcher(pool_size=self.concurrency, timeout=self.timeout, cache=self.cache) as fetcher:
+            tasks = {asyncio.ensure_future(self._fetch_and_parse(fetcher, semaphore, limiter, parser, job)): job
+                     for job in jobs}
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    year, area_code, url = tasks[task]
+                    try:
+                        yield year, area_code, task.result()
+                    except Exception as e:
+                        self.errors.append({'Year': year, 'Area_Code': area_code, 'URL': url, 'Error': str(e)})
+
+    async def _collect(self, years, area_codes, parser):
+        frames = []
+        async for year, area_code, df in self.fetch_all(years, area_codes, parser):
+            print(f"✅ {year} {area_code}: {len(df)} rows")
+            frames.append(df)
+        return frames
+
+    @instrument('fetch_pages')
+    def build_panel(self, years, area_codes, parser=parse_oes_page):
+        """Fetch the whole grid and stack the parsed pages into one panel"""
+        years = list(years)
+        area_codes = list(area_codes)
+        print(f"🚀 Fetching {len(years) * len(area_codes)} pages "
+              f"({self.concurrency} concurrent, {self.per_host_rate}/s per host)...")
+
+        start = time.perf_counter()
+        frames = asyncio.run(self._collect(years, area_codes, parser))
+        elapsed = time.perf_counter() - start
+
+        print(f"📊 Fetched {self.pages} pages ({self.bytes / 1e6:.1f} MB) in {elapsed:.1f}s")
+        for error in self.errors:
+            print(f"❌ {error['Year']} {error['Area_Code']}: {error['Error']}")
+
+        if not frames:
+            return None
+        return pd.concat(frames, ignore_index=True)
+
+def main():
+    """Main function to build a multi-year OES panel"""
+    parser = argparse.ArgumentParser(description="Fetch historical BLS OES pages for many years and areas")
+    parser.add_argument("area_codes", nargs="+", help="Area codes, e.g. 0040140")
+    parser.add_argument("--years", default="2012-2024", help="Year range or list, e.g. 2012-2024")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum requests in flight")
+    parser.add_argument("--rate", type=float, default=5.0, help="Maximum request starts per second per host")
+    parser.add_argument("--output", default=os.path.join("oes_data", "oes_panel.csv"), help="Output CSV")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Parquet dataset directory")
+    args = parser.parse_args()
+
+    fetcher = AsyncOESFetcher(concurrency=args.concurrency, per_host_rate=args.rate, cache=OESPageCache())
+    panel = fetcher.build_panel(parse_years(args.years), args.area_codes)
+
+    if panel is not None:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        panel.to_csv(args.output, index=False)
+        print(f"💾 Panel saved to {args.output} ({len(panel)} rows)")
+        
+        try:
+            pages = ((year, area_code, page) for (year, area_code), page in panel.groupby(['Year', 'Area_Code'], sort=False))
+            write_pages(pages, args.dataset)
+            print(f"💾 Panel written to dataset {args.dataset}")
+        except ImportError as e:
+            print(f"⚠️  Skipping Parquet dataset: {e}")
+    else:
+        print("❌ No pages could be fetched")
+
+if __name__ == "__main__":
+    with quiet_output():
+        main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Concurrent multi-MSA BLS OES Scraper
+Spreads a list of area codes across a bounded pool of reusable headless Chrome workers
+"""
+
+import argparse
+import os
+import queue
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from selenium_oes_scraper import SeleniumBLSOESScraper
+from oes_metrics import quiet_output
+
+class WorkerStats:
+    """Throughput counters for one WebDriver worker"""
+
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.areas = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rows = 0
+        self.driver_starts = 0
+        self.busy_seconds = 0.0
+        self.ready_seconds = []
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def elapsed_seconds(self):
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    @property
+    def areas_per_minute(self):
+        if self.elapsed_seconds == 0:
+            return 0.0
+        return self.areas / self.elapsed_seconds * 60
+
+    @property
+    def median_ready_seconds(self):
+        if not self.ready_seconds:
+            return None
+        return statistics.median(self.ready_seconds)
+
+    def as_dict(self):
+        return {
+            'Worker': self.worker_id,
+            'Areas': self.areas,
+            'Succeeded': self.succeeded,
+            'Failed': self.failed,
+            'Rows': self.rows,
+            'Driver_Starts': self.driver_starts,
+            'Busy_Seconds': round(self.busy_seconds, 2),
+            'Elapsed_Seconds': round(self.elapsed_seconds, 2),
+            'Areas_Per_Minute': round(self.areas_per_minute, 2),
+            'Median_Ready_Seconds': self.median_ready_seconds,
+        }
+
+class BatchOESScraper:
+    """Scrape many MSAs with a bounded pool of reusable webdrivers"""
+
+    def __init__(self, area_codes, max_workers=4, data_dir=os.path.join("oes_data", "areas"),
+                 max_pages_per_driver=50, scraper_factory=SeleniumBLSOESScraper):
+        self.area_codes = list(dict.fromkeys(area_codes))  # Drop duplicates, keep order
+        self.max_workers = max(1, min(max_workers, len(self.area_codes) or 1))
+        self.data_dir = data_dir
+        self.max_pages_per_driver = max_pages_per_driver
+        self.scraper_factory = scraper_factory
+
+        os.makedirs(self.data_dir, exist_ok=True)
+
+        self.results = []
+        self.worker_stats = []
+        self._lock = threading.Lock()
+
+    def area_dir(self, area_code):
+        """Output directory for one area"""
+        return os.path.join(self.data_dir, area_code)
+
+    def _start_driver(self, scraper, stats):
+        """Start (or restart) a worker's webdriver"""
+        if scraper.driver:
+            try:
+                scraper.close_driver()
+            except Exception:
+                scraper.driver = None
+
+        if not scraper.setup_driver():
+            return False
+
+        stats.driver_starts += 1
+        return True
+
+    def _worker(self, worker_id, area_queue):
+        """Pull area codes off the queue until it is empty"""
+        stats = WorkerStats(worker_id)
+        stats.started_at = time.perf_counter()
+        scraper = self.scraper_factory(data_dir=self.data_dir)
+        pages_on_driver = 0
+
+        try:
+            while True:
+                try:
+                    area_code = area_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                # Recycle the browser periodically so memory stays flat
+                if scraper.driver is None or pages_on_driver >= self.max_pages_per_driver:
+                    if not self._start_driver(scraper, stats):
+                        self._record(stats, area_code, None, 0.0, "webdriver failed to start")
+                        continue
+                    pages_on_driver = 0
+
+                scraper.data_dir = self.area_dir(area_code)
+                os.makedirs(scraper.data_dir, exist_ok=True)
+
+                start = time.perf_counter()
+                error = None
+                try:
+                    data = scraper.scrape_area(area_code, output_file="oes_selenium_data.csv")
+                except Exception as e:
+                    data = None
+                    error = str(e)
+                    # The browser may be wedged; force a fresh one for the next area
+                    pages_on_driver = self.max_pages_per_driver
+                else:
+                    pages_on_driver += 1
+                elapsed = time.perf_counter() - start
+
+                if data is None and error is None:
+                    error = "no data extracted"
+                self._record(stats, area_code, data, elapsed, error)
+
+        finally:
+            if scraper.driver:
+                scraper.close_driver()
+            readiness = getattr(scraper, 'readiness', None)
+            if readiness is not None:
+                stats.ready_seconds = [timing['Seconds'] for timing in readiness.timings]
+            stats.finished_at = time.perf_counter()
+            with self._lock:
+                self.worker_stats.append(stats)
+
+        return stats
+
+    def _record(self, stats, area_code, data, elapsed, error):
+        """Record the outcome for one area"""
+        stats.areas += 1
+        stats.busy_seconds += elapsed
+        rows = 0 if data is None else len(data)
+        if data is None:
+            stats.failed += 1
+        else:
+            stats.succeeded += 1
+            stats.rows += rows
+
+        with self._lock:
+            self.results.append({
+                'Area_Code': area_code,
+                'Worker': stats.worker_id,
+                'Status': 'ok' if data is not None else 'failed',
+                'Rows': rows,
+                'Seconds': round(elapsed, 2),
+                'Error': error or '',
+            })
+
+        status = "✅" if data is not None else "❌"
+        print(f"{status} [worker {stats.worker_id}] {area_code}: {rows} rows in {elapsed:.1f}s")
+
+    def run(self):
+        """Scrape every area and return the per-area summary"""
+        print(f"🚀 Scraping {len(self.area_codes)} areas with {self.max_workers} workers...")
+
+        area_queue = queue.Queue()
+        for area_code in self.area_codes:
+            area_queue.put(area_code)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._worker, i + 1, area_queue) for i in range(self.max_workers)]
+            for future in futures:
+                future.result()
+        total_seconds = time.perf_counter() - start
+
+        summary = pd.DataFrame(self.results, columns=['Area_Code', 'Worker', 'Status', 'Rows', 'Seconds', 'Error'])
+        worker_stats = self.get_worker_stats()
+
+        summary.to_csv(os.path.join(self.data_dir, "batch_summary.csv"), index=False)
+        worker_stats.to_csv(os.path.join(self.data_dir, "batch_worker_stats.csv"), index=False)
+
+        self.print_report(summary, worker_stats, total_seconds)
+        return summary
+
+    def get_worker_stats(self):
+        """Per-worker throughput stats as a DataFrame"""
+        rows = [stats.as_dict() for stats in sorted(self.worker_stats, key=lambda s: s.worker_id)]
+        return pd.DataFrame(rows, columns=list(WorkerStats(0).as_dict().keys()))
+
+    def print_report(self, summary, worker_stats, total_seconds):
+        """Print the batch summary"""
+        succeeded = int((summary['Status'] == 'ok').sum())
+
+        print(f"\n📊 BATCH SUMMARY")
+        print("=" * 50)
+        print(f"   Areas: {len(summary)} ({succeeded} succeeded, {len(summary) - succeeded} failed)")
+        print(f"   Total time: {total_seconds:.1f}s")
+        if total_seconds > 0:
+            print(f"   Throughput: {len(summary) / total_seconds * 60:.1f} areas/minute")
+        ready_seconds = [seconds for stats in self.worker_stats for seconds in stats.ready_seconds]
+        if ready_seconds:
+            print(f"   Median page-ready time: {statistics.median(ready_seconds):.2f}s")
+
+        print(f"\n👷 WORKER STATS:")
+        print(worker_stats.to_string(index=False))
+        print(f"\n💾 Results saved to {self.data_dir}")
+
+def read_area_codes(path):
+    """Read area codes from a text file, one per line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+def main():
+    """Main function to run the batch scraper"""
+    parser = argparse.ArgumentParser(description="Scrape BLS OES data for many MSAs concurrently")
+    parser.add_argument("area_codes", nargs="*", help="Area codes, e.g. 0040140")
+    parser.add_argument("--areas-file", help="Text file with one area code per line")
+    parser.add_argument("--workers", type=int, default=4, help="Number of concurrent webdrivers")
+    args = parser.parse_args()
+
+    area_codes = list(args.area_codes)
+    if args.areas_file:
+        area_codes.extend(read_area_codes(args.areas_file))
+
+    if not area_codes:
+        parser.error("no area codes given")
+
+    BatchOESScraper(area_codes, max_workers=args.workers).run()
+
+if __name__ == "__main__":
+    with quiet_output():
+        main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Long-lived Chrome session for the BLS OES scrapers
+Reuses tabs across page loads and blocks resource types the scrapers never need
+"""
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+# URL patterns blocked for each resource type
+RESOURCE_URL_PATTERNS = {
+    'image': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico'],
+    'font': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'stylesheet': ['*.css'],
+    'media': ['*.mp4', '*.webm', '*.mp3', '*.ogg'],
+}
+
+# Only the table matters, so nothing purely visual is loaded by default
+DEFAULT_BLOCKED_RESOURCES = ('image', 'font', 'stylesheet', 'media')
+
+def blocked_url_patterns(block_resources):
+    """URL patterns for a list of resource types"""
+    patterns = []
+    for resource_type in block_resources:
+        if resource_type not in RESOURCE_URL_PATTERNS:
+            raise ValueError(f"Unknown resource type: {resource_type}")
+        patterns.extend(RESOURCE_URL_PATTERNS[resource_type])
+    return patterns
+
+def build_chrome_options(block_resources=DEFAULT_BLOCKED_RESOURCES):
+    """Headless Chrome options shared by every scraper"""
+    # Selenium is imported only when a browser is actually needed
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")  # Run in background
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument(f"--user-agent={USER_AGENT}")
+
+    if 'image' in block_resources:
+        # Stops image decoding as well as the download
+        chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+    return chrome_options
+
+class BrowserSession:
+    """One Chrome process reused for many page loads"""
+
+    def __init__(self, block_resources=DEFAULT_BLOCKED_RESOURCES, max_tabs=1, configure_options=None):
+        self.block_resources = tuple(block_resources)
+        self.blocked_patterns = blocked_url_patterns(self.block_resources)
+        self.max_tabs = max(1, max_tabs)
+        self.configure_options = configure_options
+
+        self.driver = None
+        self.tabs = []
+        self.next_tab = 0
+        self.pages_loaded = 0
+
+    def start(self):
+        """Start Chrome once; later calls return the running driver"""
+        if self.driver is not None:
+            return self.driver
+
+        from selenium import webdriver
+
+        chrome_options = build_chrome_options(self.block_resources)
+        if self.configure_options:
+            self.configure_options(chrome_options)
+
+        self.driver = webdriver.Chrome(options=chrome_options)
+        self.tabs = [self.driver.current_window_handle]
+        self._apply_blocking()
+        return self.driver
+
+    def _apply_blocking(self):
+        """Block the configured resource URLs in the current tab"""
+        if not self.blocked_patterns:
+            return
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_patterns})
+
+    def _switch_to_next_tab(self):
+        """Open tabs up to max_tabs, then rotate through them"""
+        if len(self.tabs) < self.max_tabs and self.pages_loaded >= len(self.tabs):
+            self.driver.switch_to.new_window('tab')
+            self.tabs.append(self.driver.current_window_handle)
+            self.next_tab = len(self.tabs)
+            self._apply_blocking()
+            return
+
+        handle = self.tabs[self.next_tab % len(self.tabs)]
+        self.next_tab += 1
+        if self.driver.current_window_handle != handle:
+            self.driver.switch_to.window(handle)
+
+    def load(self, url):
+        """Load a page in a reused tab"""
+        driver = self.start()
+        self._switch_to_next_tab()
+        driver.get(url)
+        self.pages_loaded += 1
+        return driver
+
+    def close(self):
+        """Quit Chrome"""
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            finally:
+                self.driver = None
+                self.tabs = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Browser-free HTTP fetcher for static BLS OES pages
+Retrieves the static oes_{area}.htm pages with a pooled HTTP client
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Same browser identity the Selenium scrapers use; bls.gov rejects generic clients
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+class HTTPOESFetcher:
+    """Pooled HTTP client for static BLS OES pages"""
+
+    def __init__(self, pool_size=10, timeout=30, retries=2, cache=None):
+        self.timeout = timeout
+        self.cache = cache
+
+        # One session keeps connections alive across pages
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+
+    def fetch(self, url):
+        """Fetch a page and return its raw bytes"""
+        if self.cache is None:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return response.content
+
+        page = self.cache.get(url)
+        if page is not None:
+            return page.body
+
+        # Revalidate a stale copy instead of downloading it again
+        stale_page = self.cache.lookup(url)
+        headers = stale_page.validator_headers() if stale_page is not None else {}
+
+        response = self.session.get(url, timeout=self.timeout, headers=headers)
+        if response.status_code == 304 and stale_page is not None:
+            self.cache.revalidate(url, response.headers)
+            return stale_page.body
+
+        response.raise_for_status()
+        self.cache.put(url, response.content, response.headers)
+        return response.content
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Single-round-trip table extraction for the BLS OES scrapers
+Serializes the target table in the browser and builds the DataFrame in one step
+"""
+
+import re
+
+from pandas.io.parsers import TextParser
+
+# Same whitespace handling pd.read_html applies to cell text
+WHITESPACE_RE = re.compile(r"[\r\n]+|\s{2,}")
+
+# Picks the first table whose header mentions a keyword (in priority order) and
+# returns its header and body cells as plain arrays
+TABLE_TO_JSON_JS = """
+var keywords = arguments[0];
+var tables = Array.prototype.slice.call(document.querySelectorAll('table'));
+
+function cellText(cell) { return cell.textContent || ''; }
+
+function headerCells(table) {
+    // Last header row made of <th> cells; DataTables adds hidden helper rows of <td>
+    var headRows = table.querySelectorAll('thead tr');
+    for (var i = headRows.length - 1; i >= 0; i--) {
+        var cells = headRows[i].querySelectorAll('th');
+        if (cells.length) { return Array.prototype.map.call(cells, cellText); }
+    }
+    var row = table.querySelector('tr');
+    return row ? Array.prototype.map.call(row.querySelectorAll('th'), cellText) : [];
+}
+
+function bodyRows(table) {
+    var rows = table.querySelectorAll('tbody tr');
+    if (!rows.length) { rows = table.querySelectorAll('tr'); }
+    var out = [];
+    for (var i = 0; i < rows.length; i++) {
+        var cells = rows[i].querySelectorAll('td');
+        if (cells.length) { out.push(Array.prototype.map.call(cells, cellText)); }
+    }
+    return out;
+}
+
+for (var k = 0; k < keywords.length; k++) {
+    for (var t = 0; t < tables.length; t++) {
+        var header = headerCells(tables[t]);
+        if (header.join(' ').toLowerCase().indexOf(keywords[k]) !== -1) {
+            return {index: t, header: header, rows: bodyRows(tables[t])};
+        }
+    }
+}
+return null;
+"""
+
+# Cell text for a list of row elements in one call
+ROWS_TO_JSON_JS = """
+return Array.prototype.map.call(arguments[0], function (row) {
+    return Array.prototype.map.call(row.querySelectorAll('td'), function (cell) {
+        return (cell.innerText || cell.textContent || '').trim();
+    });
+});
+"""
+
+# Visible text for a list of elements in one call
+ELEMENTS_TO_TEXT_JS = """
+return Array.prototype.map.call(arguments[0], function (element) {
+    return element.innerText || '';
+});
+"""
+
+def clean_cell(text):
+    """Normalize cell text the way pd.read_html does"""
+    return WHITESPACE_RE.sub(" ", str(text).strip())
+
+def payload_to_dataframe(payload):
+    """Build a DataFrame from a {header, rows} payload in one step"""
+    if not payload or not payload.get('rows'):
+        return None
+
+    header = [clean_cell(cell) for cell in payload['header']]
+    width = len(header) or max(len(row) for row in payload['rows'])
+    if not header:
+        header = list(range(width))
+
+    # Pad or trim ragged rows so every row lines up with the header
+    rows = []
+    for row in payload['rows']:
+        cells = [clean_cell(cell) for cell in row[:width]]
+        cells.extend([''] * (width - len(cells)))
+        rows.append(cells)
+
+    # TextParser gives the same numeric inference pd.read_html uses
+    return TextParser([header] + rows, header=0, thousands=',').read()
+
+def extract_table_json(driver, header_keywords):
+    """Serialize the first table whose header matches into a DataFrame"""
+    payload = driver.execute_script(TABLE_TO_JSON_JS, [keyword.lower() for keyword in header_keywords])
+    return payload_to_dataframe(payload)
+
+def extract_rows_json(driver, elements):
+    """Read the cell text of many row elements in one call"""
+    return [row for row in driver.execute_script(ROWS_TO_JSON_JS, elements) if row]
+
+def extract_text_json(driver, elements):
+    """Read the visible text of many elements in one call"""
+    return driver.execute_script(ELEMENTS_TO_TEXT_JS, elements)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Network capture for the BLS OES Query System
+Pulls the JSON payloads the single-page app loads out of Chrome's DevTools performance log
+"""
+
+import base64
+import json
+import re
+
+import pandas as pd
+
+# Cells like "$1,234.50", "12.3%" or "1,695,430" once the decoration is removed
+NUMERIC_TEXT_RE = re.compile(r"^-?\d+(\.\d+)?$")
+DECORATION_RE = re.compile(r"[$,%\s]")
+
+def enable_performance_logging(chrome_options):
+    """Ask Chrome to record network events in the performance log"""
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return chrome_options
+
+def find_json_responses(log_entries, url_filter=None):
+    """Pick the JSON network responses out of raw performance log entries"""
+    responses = []
+
+    for entry in log_entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+
+        if message.get('method') != 'Network.responseReceived':
+            continue
+
+        response = message['params']['response']
+        if 'json' not in response.get('mimeType', ''):
+            continue
+        if url_filter and url_filter not in response.get('url', ''):
+            continue
+
+        responses.append({'request_id': message['params']['requestId'], 'url': response['url']})
+
+    return responses
+
+def decode_response_body(body):
+    """Decode a Network.getResponseBody result into a JSON object"""
+    text = body.get('body', '')
+    if body.get('base64Encoded'):
+        text = base64.b64decode(text).decode('utf-8')
+    return json.loads(text)
+
+def capture_json_payloads(driver, url_filter=None):
+    """Fetch the bodies of every JSON response recorded since the last call"""
+    payloads = []
+
+    for response in find_json_responses(driver.get_log('performance'), url_filter):
+        try:
+            body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': response['request_id']})
+            payloads.append({'url': response['url'], 'payload': decode_response_body(body)})
+        except Exception:
+            # Bodies can be evicted or belong to aborted requests; skip them
+            continue
+
+    return payloads
+
+def find_record_list(payload):
+    """Return the largest list of record objects anywhere in a JSON payload"""
+    best = []
+    stack = [payload]
+
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            records = [item for item in node if isinstance(item, dict)]
+            if len(records) > len(best) and len(records) == len(node):
+                best = node
+            stack.extend(node)
+
+    return best
+
+def coerce_numeric_columns(df):
+    """Convert text columns that are entirely numeric into numbers"""
+    for col in df.columns:
+        if df[col].dtype != object and not pd.api.types.is_string_dtype(df[col]):
+            continue
+
+        text = df[col].dropna().astype(str).str.replace(DECORATION_RE, '', regex=True)
+        if len(text) and text.str.match(NUMERIC_TEXT_RE).all():
+            df[col] = pd.to_numeric(df[col].astype(str).str.replace(DECORATION_RE, '', regex=True), errors='coerce')
+
+    return df
+
+def payloads_to_dataframe(payloads):
+    """Build one typed DataFrame from the record lists in captured payloads"""
+    frames = []
+    for captured in payloads:
+        records = find_record_list(captured['payload'])
+        if records:
+            frames.append(pd.json_normalize(records))
+
+    if not frames:
+        return None
+
+    # The app's biggest response is the occupation table
+    df = max(frames, key=len)
+    return coerce_numeric_columns(df)
+
+def save_payloads(payloads, output_file):
+    """Record captured payloads so they can be replayed later"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(payloads, f)
+    return output_file
+
+def load_payloads(input_file):
+    """Load previously recorded payloads"""
+    with open(input_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
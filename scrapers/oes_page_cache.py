@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache for fetched BLS OES pages
+Stores gzip-compressed bodies by SHA-256 with fetch time, TTL and validator headers
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+class CachedPage:
+    """A cached page body plus its freshness metadata"""
+
+    def __init__(self, url, body, entry):
+        self.url = url
+        self.body = body
+        self.sha256 = entry['sha256']
+        self.fetched_at = entry['fetched_at']
+        self.ttl = entry['ttl']
+        self.etag = entry.get('etag')
+        self.last_modified = entry.get('last_modified')
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+    @property
+    def is_fresh(self):
+        return self.age < self.ttl
+
+    def validator_headers(self):
+        """Conditional request headers for revalidating this page"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+class OESPageCache:
+    """URL-keyed page cache with content-addressed bodies and LRU size eviction"""
+
+    def __init__(self, cache_dir=os.path.join("oes_data", "page_cache"), max_bytes=500 * 1024 * 1024,
+                 default_ttl=7 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_file):
+            return {}
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # A corrupt index only costs a refetch
+            return {}
+
+    def _save_index(self):
+        temp_file = self.index_file + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(temp_file, self.index_file)
+
+    def _object_path(self, sha256):
+        return os.path.join(self.objects_dir, sha256[:2], sha256 + ".gz")
+
+    def _read_body(self, entry):
+        with gzip.open(self._object_path(entry['sha256']), 'rb') as f:
+            return f.read()
+
+    def lookup(self, url):
+        """Return the cached page for a URL whether or not it is still fresh"""
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                return None
+            try:
+                body = self._read_body(entry)
+            except OSError:
+                del self._index[url]
+                return None
+            entry['last_access'] = time.time()
+            return CachedPage(url, body, entry)
+
+    def get(self, url):
+        """Return the cached page for a URL only if it is still fresh"""
+        page = self.lookup(url)
+        with self._lock:
+            if page is None:
+                self.misses += 1
+                return None
+            if not page.is_fresh:
+                self.stale += 1
+                self.misses += 1
+                return None
+            self.hits += 1
+            return page
+
+    def put(self, url, body, headers=None, ttl=None):
+        """Store a page body with its fetch metadata"""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        headers = headers or {}
+        sha256 = hashlib.sha256(body).hexdigest()
+
+        with self._lock:
+            path = self._object_path(sha256)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_path = path + ".tmp"
+                with gzip.open(temp_path, 'wb') as f:
+                    f.write(body)
+                os.replace(temp_path, path)
+
+            previous = self._index.get(url)
+            now = time.time()
+            self._index[url] = {
+                'sha256': sha256,
+                'size': os.path.getsize(path),
+                'fetched_at': now,
+                'last_access': now,
+                'ttl': self.default_ttl if ttl is None else ttl,
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'changed': previous is None or previous['sha256'] != sha256,
+            }
+
+            self._evict()
+            self._save_index()
+            return self._index.get(url)
+
+    def revalidate(self, url, headers=None):
+        """Mark a cached page fresh again after a 304 Not Modified"""
+        headers = headers or {}
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                return None
+            entry['fetched_at'] = time.time()
+            entry['changed'] = False
+            entry['etag'] = headers.get('ETag', entry.get('etag'))
+            entry['last_modified'] = headers.get('Last-Modified', entry.get('last_modified'))
+            self.revalidated += 1
+            self._save_index()
+            return entry
+
+    def _object_sizes(self):
+        """Size of each stored object; URLs with identical bodies share one"""
+        return {entry['sha256']: entry['size'] for entry in self._index.values()}
+
+    def _evict(self):
+        """Drop least recently used URLs until the stored objects fit in max_bytes"""
+        sizes = self._object_sizes()
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        for url, entry in sorted(self._index.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes or len(self._index) <= 1:
+                break
+            del self._index[url]
+            self.evictions += 1
+
+            # Only delete the body once no other URL points at it
+            sha256 = entry['sha256']
+            if not any(other['sha256'] == sha256 for other in self._index.values()):
+                total -= sizes[sha256]
+                try:
+                    os.remove(self._object_path(sha256))
+                except OSError:
+                    pass
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'revalidated': self.revalidated,
+                'evictions': self.evictions,
+                'entries': len(self._index),
+                'bytes': sum(self._object_sizes().values()),
+            }
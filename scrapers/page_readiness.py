@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Event-driven page readiness detection for the BLS OES scrapers
+Waits until the data table is present and its row count has stopped changing
+"""
+
+import statistics
+import time
+
+# One round-trip: document state plus the row count of the biggest matching table
+TABLE_STATE_JS = """
+var selectors = arguments[0];
+var rows = 0;
+for (var i = 0; i < selectors.length; i++) {
+    var tables = document.querySelectorAll(selectors[i]);
+    for (var j = 0; j < tables.length; j++) {
+        var count = tables[j].querySelectorAll('tbody tr').length || tables[j].querySelectorAll('tr').length;
+        if (count > rows) { rows = count; }
+    }
+}
+return [document.readyState, rows];
+"""
+
+DEFAULT_TABLE_SELECTORS = ["table", "[data-testid='data-table']", ".data-table", ".oes-data"]
+
+class TableStable:
+    """WebDriverWait condition: table present and row count unchanged for a settle period"""
+
+    def __init__(self, selectors=None, stable_for=1.0, min_rows=1):
+        self.selectors = list(selectors or DEFAULT_TABLE_SELECTORS)
+        self.stable_for = stable_for
+        self.min_rows = min_rows
+        self.last_count = 0
+        self.stable_since = None
+
+    def __call__(self, driver):
+        # Selenium loads with the first page wait, not on import
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            ready_state, count = driver.execute_script(TABLE_STATE_JS, self.selectors)
+        except WebDriverException:
+            return False
+
+        now = time.perf_counter()
+        if ready_state != "complete" or count < self.min_rows or count != self.last_count:
+            # Still loading or still growing; restart the settle clock
+            self.last_count = count
+            self.stable_since = now
+            return False
+
+        if now - self.stable_since >= self.stable_for:
+            return count
+        return False
+
+class PageReadiness:
+    """Waits for pages to become ready and records how long each one took"""
+
+    def __init__(self, stable_for=1.0, poll_interval=0.25, selectors=None):
+        self.stable_for = stable_for
+        self.poll_interval = poll_interval
+        self.selectors = selectors
+        self.timings = []
+
+    def wait_until_ready(self, driver, timeout=30, label=None):
+        """Block until the table is stable or the overall deadline passes"""
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        condition = TableStable(self.selectors, stable_for=self.stable_for)
+        start = time.perf_counter()
+
+        try:
+            rows = WebDriverWait(driver, timeout, poll_frequency=self.poll_interval).until(condition)
+            ready = True
+        except TimeoutException:
+            rows = condition.last_count
+            ready = False
+
+        seconds = time.perf_counter() - start
+        self.timings.append({'Page': label, 'Ready': ready, 'Rows': rows, 'Seconds': round(seconds, 3)})
+        return ready
+
+    def median_seconds(self):
+        """Median time-to-ready across recorded pages"""
+        if not self.timings:
+            return None
+        return statistics.median(timing['Seconds'] for timing in self.timings)
@@ -5,45 +5,68 @@ Handles JavaScript-heavy websites and extracts data from the BLS OES Query Syste
 """
 
 import pandas as pd
-import time
 import os
-from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+import sys
+from io import BytesIO, StringIO
+from page_readiness import PageReadiness
+from browser_session import BrowserSession, DEFAULT_BLOCKED_RESOURCES
+from js_table_extractor import extract_table_json, extract_text_json
+from oes_page_cache import OESPageCache
+from oes_network_capture import enable_performance_logging, capture_json_payloads, payloads_to_dataframe, save_payloads
+
+# Shared parsing helpers live in utils/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from oes_table_parser import read_target_table, table_html_matches
+from oes_metrics import file_written, instrument, quiet_output
+
+# Header text that identifies the OES data table, in priority order
+OES_TABLE_KEYWORDS = ['location quotient', 'occupation', 'employment', 'wage']
 
 class SeleniumBLSOESScraper:
     """Selenium-based scraper for BLS OES data"""
     
-    def __init__(self):
-        # Riverside MSA information
-        self.riverside_area_code = "0040140"  # Riverside-San Bernardino-Ontario, CA MSA
+    def __init__(self, area_code="0040140", data_dir="oes_data", extraction_mode="js", cache=None,
+                 session=None, block_resources=DEFAULT_BLOCKED_RESOURCES, take_screenshots=False):
+        # MSA information (defaults to Riverside-San Bernardino-Ontario, CA MSA)
+        self.area_code = area_code
+        self.riverside_area_code = area_code  # Kept for existing callers
         self.base_url = "https://data.bls.gov/oes"
         
+        # "js" serializes the table in one round-trip; "html" parses each table's outerHTML;
+        # "network" reads the JSON the query app loads and skips the DOM entirely
+        if extraction_mode not in ("js", "html", "network"):
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
+        self.extraction_mode = extraction_mode
+        
         # Create data directory
-        self.data_dir = "oes_data"
+        self.data_dir = data_dir
         os.makedirs(self.data_dir, exist_ok=True)
         
-        # Initialize webdriver
+        # Optional OESPageCache; fresh cached pages skip the browser entirely
+        self.cache = cache
+        
+        # Initialize webdriver; a shared BrowserSession is reused and never closed here
         self.driver = None
+        self.session = session
+        self.owns_session = session is None
+        self.block_resources = block_resources
+        
+        # Screenshots force a full render, so they are opt-in
+        self.take_screenshots = take_screenshots
+        
+        # Records how long each page took to become ready
+        self.readiness = PageReadiness()
     
+    @instrument('setup_driver', expect_result=True)
     def setup_driver(self):
         """Setup Chrome webdriver with appropriate options"""
         print("🔧 Setting up Chrome webdriver...")
         
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")  # Run in background
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-        
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
+            if self.session is None:
+                configure_options = enable_performance_logging if self.extraction_mode == "network" else None
+                self.session = BrowserSession(block_resources=self.block_resources, configure_options=configure_options)
+            self.driver = self.session.start()
             print("✅ Chrome webdriver initialized successfully")
             return True
         except Exception as e:
@@ -51,19 +74,31 @@ class SeleniumBLSOESScraper:
             print("💡 Make sure Chrome is installed and chromedriver is available")
             return False
     
+    def close_driver(self):
+        """Quit Chrome unless the session is shared with other scrapers"""
+        if self.owns_session and self.session is not None:
+            self.session.close()
+            self.session = None
+        self.driver = None
+    
+    def page_url(self):
+        """BLS OES Query System URL for the configured area"""
+        return f"{self.base_url}/#/area/{self.area_code}"
+    
+    @instrument('navigate', expect_result=True)
     def navigate_to_oes_page(self):
-        """Navigate to the BLS OES page for Riverside"""
+        """Navigate to the BLS OES page for the configured area"""
         print("🌐 Navigating to BLS OES Query System...")
         
-        url = f"{self.base_url}/#/area/{self.riverside_area_code}"
+        url = self.page_url()
         print(f"📍 Target URL: {url}")
         
         try:
-            self.driver.get(url)
+            self.session.load(url)
             print("✅ Successfully loaded the page")
             
-            # Wait for page to load
-            time.sleep(5)
+            # Wait for the data table to settle
+            self.wait_for_data_to_load()
             
             # Check if page loaded correctly
             if "Riverside" in self.driver.page_source or "OES" in self.driver.page_source:
@@ -77,40 +112,90 @@ class SeleniumBLSOESScraper:
             print(f"❌ Error navigating to page: {e}")
             return False
     
+    @instrument('wait_for_table', expect_result=True)
     def wait_for_data_to_load(self, timeout=30):
-        """Wait for data to load on the page"""
+        """Wait until the data table is present and its row count has settled"""
         print("⏳ Waiting for data to load...")
         
         try:
-            # Wait for common data elements to appear
-            selectors = [
-                "table",
-                "[data-testid='data-table']",
-                ".data-table",
-                ".oes-data",
-                "tbody",
-                "tr"
-            ]
-            
-            for selector in selectors:
-                try:
-                    WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    print(f"✅ Found data element: {selector}")
-                    return True
-                except TimeoutException:
-                    continue
+            ready = self.readiness.wait_until_ready(self.driver, timeout=timeout, label=self.driver.current_url)
+            timing = self.readiness.timings[-1]
             
-            print("⚠️  No standard data elements found, continuing anyway")
-            return True
+            if ready:
+                print(f"✅ Data table ready: {timing['Rows']} rows after {timing['Seconds']:.2f}s")
+            else:
+                print(f"⚠️  Table not stable after {timeout}s ({timing['Rows']} rows), continuing anyway")
+            return ready
             
         except Exception as e:
             print(f"❌ Error waiting for data: {e}")
             return False
     
+    @instrument('extract_network', expect_result=True)
+    def extract_network_data(self):
+        """Extract data from the JSON responses the query app loaded"""
+        print("📡 Extracting data from captured network responses...")
+        
+        try:
+            payloads = capture_json_payloads(self.driver)
+            print(f"📊 Captured {len(payloads)} JSON responses")
+            
+            if not payloads:
+                print("❌ No JSON responses captured")
+                return None
+            
+            # Keep the raw payloads so parsing can be replayed without a browser
+            payload_file = os.path.join(self.data_dir, "bls_oes_payloads.json")
+            save_payloads(payloads, payload_file)
+            print(f"💾 Payloads saved to {payload_file}")
+            
+            df = payloads_to_dataframe(payloads)
+            
+            if df is None:
+                print("❌ No record data found in payloads")
+                return None
+            
+            print(f"📊 Payload data shape: {df.shape}")
+            return df
+            
+        except Exception as e:
+            print(f"❌ Error extracting network data: {e}")
+            return None
+    
+    @instrument('extract_js', expect_result=True)
+    def extract_table_data_js(self):
+        """Extract the data table with a single execute_script round-trip"""
+        print("📋 Extracting table data via injected JavaScript...")
+        
+        try:
+            df = extract_table_json(self.driver, OES_TABLE_KEYWORDS)
+            
+            if df is None:
+                print("❌ No matching table found")
+                return None
+            
+            print(f"📊 Table shape: {df.shape}")
+            
+            if self.is_riverside_data_table(df):
+                print("✅ Found Riverside data table")
+                return df
+            
+            print("❌ Matching table does not look like OES data")
+            return None
+            
+        except Exception as e:
+            print(f"❌ Error extracting table data via JavaScript: {e}")
+            return None
+    
+    def is_candidate_table_html(self, table_html):
+        """Cheap check on a table's HTML before building a DataFrame from it"""
+        return table_html_matches(table_html, OES_TABLE_KEYWORDS) or table_html.count('<tr') > 100
+    
+    @instrument('extract_tables', expect_result=True)
     def extract_table_data(self):
         """Extract table data from the page"""
+        from selenium.webdriver.common.by import By
+
         print("📋 Extracting table data...")
         
         try:
@@ -126,7 +211,12 @@ class SeleniumBLSOESScraper:
                 try:
                     # Get table HTML and convert to DataFrame
                     table_html = table.get_attribute('outerHTML')
-                    df = pd.read_html(table_html)[0]
+                    
+                    # Skip tables that cannot be OES data without building a DataFrame
+                    if not self.is_candidate_table_html(table_html):
+                        print(f"⏭️  Table {i+1} header does not match, skipping")
+                        continue
+                    df = pd.read_html(StringIO(table_html))[0]
                     
                     print(f"📊 Table {i+1} shape: {df.shape}")
                     print(f"📋 Table {i+1} columns: {list(df.columns)}")
@@ -153,8 +243,53 @@ class SeleniumBLSOESScraper:
             print(f"❌ Error extracting table data: {e}")
             return None
     
+    @instrument('extract_html', expect_result=True)
+    def extract_tables_from_html(self, html):
+        """Extract Riverside data tables from saved page HTML"""
+        print("📋 Extracting table data from HTML...")
+        
+        try:
+            # Convert only the table whose header names the OES columns
+            df = read_target_table(BytesIO(html), OES_TABLE_KEYWORDS)
+            if df is not None and self.is_riverside_data_table(df):
+                print(f"✅ Found Riverside data table: {df.shape}")
+                return df
+            
+            # Fall back to parsing every table
+            tables = pd.read_html(BytesIO(html))
+            print(f"📊 Found {len(tables)} tables on the page")
+            
+            all_data = [df for df in tables if self.is_riverside_data_table(df)]
+            
+            if all_data:
+                combined_df = pd.concat(all_data, ignore_index=True)
+                print(f"📊 Combined data shape: {combined_df.shape}")
+                return combined_df
+            else:
+                print("❌ No Riverside data found in tables")
+                return None
+                
+        except Exception as e:
+            print(f"❌ Error extracting table data: {e}")
+            return None
+    
+    def load_cached_data(self):
+        """Extract data from a fresh cached copy of the page, if there is one"""
+        if self.cache is None:
+            return None
+        
+        page = self.cache.get(self.page_url())
+        if page is None:
+            return None
+        
+        print(f"⚡ Using cached page source ({page.age / 60:.0f} minutes old)")
+        return self.extract_tables_from_html(page.body)
+    
+    @instrument('extract_elements', expect_result=True)
     def extract_data_from_elements(self):
         """Extract data from various page elements"""
+        from selenium.webdriver.common.by import By
+
         print("🔍 Extracting data from page elements...")
         
         try:
@@ -174,16 +309,16 @@ class SeleniumBLSOESScraper:
                     elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                     print(f"📊 Found {len(elements)} elements with selector: {selector}")
                     
-                    for element in elements[:10]:  # Limit to first 10 for testing
-                        try:
-                            text = element.text
-                            if text and len(text.strip()) > 0:
-                                # Split by whitespace or tabs
-                                row_data = [cell.strip() for cell in text.split('\n') if cell.strip()]
-                                if row_data:
-                                    all_rows.append(row_data)
-                        except Exception as e:
-                            continue
+                    if not elements:
+                        continue
+                    
+                    # Read every element's text in one round-trip
+                    for text in extract_text_json(self.driver, elements):
+                        if text and len(text.strip()) > 0:
+                            # Split by whitespace or tabs
+                            row_data = [cell.strip() for cell in text.split('\n') if cell.strip()]
+                            if row_data:
+                                all_rows.append(row_data)
                     
                     if all_rows:
                         break
@@ -234,6 +369,7 @@ class SeleniumBLSOESScraper:
         
         return False
     
+    @instrument('save_page_source')
     def save_page_source(self):
         """Save the page source for debugging"""
         try:
@@ -242,8 +378,14 @@ class SeleniumBLSOESScraper:
             
             with open(output_file, 'w', encoding='utf-8') as f:
                 f.write(page_source)
+            file_written(output_file)
             
             print(f"💾 Page source saved to {output_file}")
+            
+            # Keep a timestamped, content-addressed copy for repeat runs
+            if self.cache is not None:
+                self.cache.put(self.page_url(), page_source)
+            
             return output_file
             
         except Exception as e:
@@ -262,46 +404,72 @@ class SeleniumBLSOESScraper:
             print(f"❌ Error taking screenshot: {e}")
             return None
     
-    def get_oes_data(self):
-        """Main method to get OES data"""
-        print("🚀 Starting Selenium-based OES data extraction...")
+    def extract_dom_data(self):
+        """Extract data from the rendered page"""
+        # Take screenshot for debugging
+        if self.take_screenshots:
+            self.take_screenshot()
         
-        # Setup webdriver
-        if not self.setup_driver():
-            return None
+        # Save page source for debugging
+        self.save_page_source()
         
-        try:
-            # Navigate to the page
-            if not self.navigate_to_oes_page():
+        # Try to extract table data
+        data = None
+        if self.extraction_mode == "js":
+            data = self.extract_table_data_js()
+        
+        if data is None:
+            data = self.extract_table_data()
+        
+        if data is None:
+            # Try alternative extraction method
+            print("🔄 Trying alternative data extraction method...")
+            data = self.extract_data_from_elements()
+        
+        return data
+    
+    @instrument('scrape_area', expect_result=True)
+    def scrape_area(self, area_code=None, output_file="riverside_oes_selenium_data.csv"):
+        """Scrape one area with the already running webdriver"""
+        if area_code is not None:
+            self.area_code = area_code
+        
+        # Serve repeat runs from the page cache without touching the browser
+        data = self.load_cached_data()
+        
+        if data is None:
+            if self.driver is None and not self.setup_driver():
                 return None
             
-            # Wait for data to load
-            self.wait_for_data_to_load()
-            
-            # Take screenshot for debugging
-            self.take_screenshot()
-            
-            # Save page source for debugging
-            self.save_page_source()
+            # Navigate to the page (waits for the data table to settle)
+            if not self.navigate_to_oes_page():
+                return None
             
-            # Try to extract table data
-            data = self.extract_table_data()
+            if self.extraction_mode == "network":
+                data = self.extract_network_data()
             
             if data is None:
-                # Try alternative extraction method
-                print("🔄 Trying alternative data extraction method...")
-                data = self.extract_data_from_elements()
-            
-            if data is not None:
-                # Save the data
-                output_file = os.path.join(self.data_dir, "riverside_oes_selenium_data.csv")
-                data.to_csv(output_file, index=False)
-                print(f"💾 Data saved to {output_file}")
-                
-                return data
-            else:
-                print("❌ Could not extract any data")
-                return None
+                data = self.extract_dom_data()
+        
+        if data is not None:
+            # Save the data
+            output_path = os.path.join(self.data_dir, output_file)
+            data.to_csv(output_path, index=False)
+            file_written(output_path)
+            print(f"💾 Data saved to {output_path}")
+            
+            return data
+        else:
+            print("❌ Could not extract any data")
+            return None
+    
+    def get_oes_data(self):
+        """Main method to get OES data"""
+        print("🚀 Starting Selenium-based OES data extraction...")
+        
+        try:
+            # Starts the webdriver only if the page is not cached
+            return self.scrape_area()
                 
         except Exception as e:
             print(f"❌ Error during data extraction: {e}")
@@ -309,8 +477,8 @@ class SeleniumBLSOESScraper:
         
         finally:
             # Clean up
-            if self.driver:
-                self.driver.quit()
+            if self.driver and self.owns_session:
+                self.close_driver()
                 print("🧹 Webdriver closed")
     
     def analyze_extracted_data(self, data):
@@ -358,7 +526,7 @@ def main():
     print("🚀 Selenium-based BLS OES Web Scraper")
     print("=" * 50)
     
-    scraper = SeleniumBLSOESScraper()
+    scraper = SeleniumBLSOESScraper(cache=OESPageCache())
     
     # Get OES data
     data = scraper.get_oes_data()
@@ -386,4 +554,5 @@ def main():
         print("4. Contact BLS for direct data access")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    with quiet_output():
+        main()
@@ -5,44 +5,70 @@ Handles the 2019 BLS OES data format from the specific URL
 """
 
 import pandas as pd
-import time
 import os
-from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+import sys
+from io import BytesIO, StringIO
+from page_readiness import PageReadiness
+from browser_session import BrowserSession, DEFAULT_BLOCKED_RESOURCES
+from js_table_extractor import extract_table_json, extract_rows_json
+from http_oes_fetcher import HTTPOESFetcher
+from oes_page_cache import OESPageCache
+
+# Shared parsing helpers live in utils/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from oes_table_parser import read_target_table, table_html_matches
+from oes_metrics import data_read, file_written, instrument, quiet_output
+
+# Header text that identifies the 2019 OES data table, in priority order
+OES_TABLE_KEYWORDS_2019 = ['location quotient', 'occupation', 'employment', 'wage']
 
 class SeleniumBLSOESScraper2019:
     """Selenium-based scraper for 2019 BLS OES data"""
     
-    def __init__(self):
+    def __init__(self, url="https://www.bls.gov/oes/2019/may/oes_40140.htm", data_dir="oes_data_2019",
+                 fetch_mode="http", extraction_mode="js", cache=None, session=None,
+                 block_resources=DEFAULT_BLOCKED_RESOURCES, take_screenshots=False):
         # 2019 Riverside OES data URL
-        self.url = "https://www.bls.gov/oes/2019/may/oes_40140.htm"
+        self.url = url
+        
+        # "http" fetches the static page directly; "selenium" renders it in Chrome
+        if fetch_mode not in ("http", "selenium"):
+            raise ValueError(f"Unknown fetch mode: {fetch_mode}")
+        self.fetch_mode = fetch_mode
+        
+        # "js" serializes the table in one round-trip; "html" parses each table's outerHTML
+        if extraction_mode not in ("js", "html"):
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
+        self.extraction_mode = extraction_mode
         
         # Create data directory
-        self.data_dir = "oes_data_2019"
+        self.data_dir = data_dir
         os.makedirs(self.data_dir, exist_ok=True)
         
-        # Initialize webdriver
+        # Optional OESPageCache; fresh cached pages are served without any network traffic
+        self.cache = cache
+        
+        # Initialize webdriver; a shared BrowserSession is reused and never closed here
         self.driver = None
+        self.session = session
+        self.owns_session = session is None
+        self.block_resources = block_resources
+        
+        # Screenshots force a full render, so they are opt-in
+        self.take_screenshots = take_screenshots
+        
+        # Records how long each page took to become ready
+        self.readiness = PageReadiness()
     
+    @instrument('setup_driver', expect_result=True)
     def setup_driver(self):
         """Setup Chrome webdriver with appropriate options"""
         print("🔧 Setting up Chrome webdriver...")
         
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")  # Run in background
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-        
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
+            if self.session is None:
+                self.session = BrowserSession(block_resources=self.block_resources)
+            self.driver = self.session.start()
             print("✅ Chrome webdriver initialized successfully")
             return True
         except Exception as e:
@@ -50,17 +76,25 @@ class SeleniumBLSOESScraper2019:
             print("💡 Make sure Chrome is installed and chromedriver is available")
             return False
     
+    def close_driver(self):
+        """Quit Chrome unless the session is shared with other scrapers"""
+        if self.owns_session and self.session is not None:
+            self.session.close()
+            self.session = None
+        self.driver = None
+    
+    @instrument('navigate', expect_result=True)
     def navigate_to_oes_page(self):
         """Navigate to the 2019 BLS OES page for Riverside"""
         print("🌐 Navigating to 2019 BLS OES Data...")
         print(f"📍 Target URL: {self.url}")
         
         try:
-            self.driver.get(self.url)
+            self.session.load(self.url)
             print("✅ Successfully loaded the page")
             
-            # Wait for page to load
-            time.sleep(5)
+            # Wait for the data table to settle
+            self.wait_for_data_to_load()
             
             # Check if page loaded correctly
             if "Riverside" in self.driver.page_source or "OES" in self.driver.page_source:
@@ -74,39 +108,59 @@ class SeleniumBLSOESScraper2019:
             print(f"❌ Error navigating to page: {e}")
             return False
     
+    @instrument('wait_for_table', expect_result=True)
     def wait_for_data_to_load(self, timeout=30):
-        """Wait for data to load on the page"""
+        """Wait until the data table is present and its row count has settled"""
         print("⏳ Waiting for data to load...")
         
         try:
-            # Wait for common data elements to appear
-            selectors = [
-                "table",
-                "tbody",
-                "tr",
-                ".data-table",
-                ".oes-data"
-            ]
+            ready = self.readiness.wait_until_ready(self.driver, timeout=timeout, label=self.driver.current_url)
+            timing = self.readiness.timings[-1]
             
-            for selector in selectors:
-                try:
-                    WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    print(f"✅ Found data element: {selector}")
-                    return True
-                except TimeoutException:
-                    continue
-            
-            print("⚠️  No standard data elements found, proceeding anyway...")
-            return True
+            if ready:
+                print(f"✅ Data table ready: {timing['Rows']} rows after {timing['Seconds']:.2f}s")
+            else:
+                print(f"⚠️  Table not stable after {timeout}s ({timing['Rows']} rows), continuing anyway")
+            return ready
             
         except Exception as e:
             print(f"❌ Error waiting for data: {e}")
             return False
     
+    @instrument('extract_js', expect_result=True)
+    def extract_table_data_js(self):
+        """Extract the data table with a single execute_script round-trip"""
+        print("📋 Extracting table data via injected JavaScript...")
+        
+        try:
+            df = extract_table_json(self.driver, OES_TABLE_KEYWORDS_2019)
+            
+            if df is None:
+                print("❌ No matching table found")
+                return None
+            
+            print(f"📊 Table shape: {df.shape}")
+            
+            if self.is_riverside_data_table_2019(df):
+                print("✅ Found main data table")
+                return df
+            
+            print("❌ Matching table does not look like OES data")
+            return None
+            
+        except Exception as e:
+            print(f"❌ Error extracting table data via JavaScript: {e}")
+            return None
+    
+    def is_candidate_table_html(self, table_html):
+        """Cheap check on a table's HTML before building a DataFrame from it"""
+        return table_html_matches(table_html, OES_TABLE_KEYWORDS_2019) or table_html.count('<tr') > 100
+    
+    @instrument('extract_tables', expect_result=True)
     def extract_table_data(self):
         """Extract data from tables on the page"""
+        from selenium.webdriver.common.by import By
+
         print("📋 Extracting table data...")
         
         try:
@@ -123,8 +177,13 @@ class SeleniumBLSOESScraper2019:
                     # Get table HTML
                     table_html = table.get_attribute('outerHTML')
                     
+                    # Skip tables that cannot be OES data without building a DataFrame
+                    if not self.is_candidate_table_html(table_html):
+                        print(f"⏭️  Table {i+1} header does not match, skipping")
+                        continue
+                    
                     # Try to read as pandas DataFrame
-                    df = pd.read_html(table_html)[0]
+                    df = pd.read_html(StringIO(table_html))[0]
                     print(f"📊 Table {i+1} shape: {df.shape}")
                     print(f"📋 Table {i+1} columns: {list(df.columns)}")
                     
@@ -148,8 +207,58 @@ class SeleniumBLSOESScraper2019:
             print(f"❌ Error extracting table data: {e}")
             return None
     
+    @instrument('fetch_page', expect_result=True)
+    def fetch_page_source(self):
+        """Fetch the static 2019 page over plain HTTP (no browser)"""
+        print("🌐 Fetching 2019 BLS OES page over HTTP...")
+        print(f"📍 Target URL: {self.url}")
+        
+        try:
+            with HTTPOESFetcher(cache=self.cache) as fetcher:
+                html = fetcher.fetch(self.url)
+            data_read(len(html))
+            print(f"✅ Fetched {len(html)} bytes")
+            return html
+            
+        except Exception as e:
+            print(f"❌ Error fetching page: {e}")
+            return None
+    
+    @instrument('extract_html', expect_result=True)
+    def extract_tables_from_html(self, html):
+        """Extract the main data table from raw page HTML"""
+        print("📋 Extracting table data from HTML...")
+        
+        try:
+            # Convert only the table whose header names the OES columns
+            df = read_target_table(BytesIO(html), OES_TABLE_KEYWORDS_2019)
+            if df is not None and self.is_riverside_data_table_2019(df):
+                print(f"✅ Found main data table: {df.shape}")
+                return df
+            
+            # Fall back to parsing every table
+            tables = pd.read_html(BytesIO(html))
+            print(f"📊 Found {len(tables)} tables on the page")
+            
+            for i, df in enumerate(tables):
+                print(f"📊 Table {i+1} shape: {df.shape}")
+                
+                if self.is_riverside_data_table_2019(df):
+                    print(f"✅ Found main data table: Table {i+1}")
+                    return df
+            
+            print("❌ No Riverside data found in tables")
+            return None
+            
+        except Exception as e:
+            print(f"❌ Error extracting table data: {e}")
+            return None
+    
+    @instrument('extract_elements', expect_result=True)
     def extract_data_from_elements(self):
         """Extract data from page elements as fallback"""
+        from selenium.webdriver.common.by import By
+
         print("🔍 Extracting data from page elements...")
         
         try:
@@ -186,16 +295,8 @@ class SeleniumBLSOESScraper2019:
     def process_elements_to_dataframe(self, elements):
         """Convert HTML elements to DataFrame"""
         try:
-            data = []
-            for element in elements:
-                try:
-                    # Get text from all cells
-                    cells = element.find_elements(By.TAG_NAME, "td")
-                    if cells:
-                        row_data = [cell.text.strip() for cell in cells]
-                        data.append(row_data)
-                except Exception as e:
-                    continue
+            # Get text from all cells of all rows in one round-trip
+            data = extract_rows_json(self.driver, elements)
             
             if data:
                 # Create DataFrame
@@ -234,14 +335,23 @@ class SeleniumBLSOESScraper2019:
             print(f"❌ Error checking table: {e}")
             return False
     
-    def save_page_source(self):
+    @instrument('save_page_source')
+    def save_page_source(self, page_source=None):
         """Save the page source for debugging"""
         try:
-            page_source = self.driver.page_source
+            if page_source is None:
+                page_source = self.driver.page_source
+                
+                # Keep a timestamped, content-addressed copy of the rendered page
+                if self.cache is not None:
+                    self.cache.put(self.url, page_source)
+            if isinstance(page_source, bytes):
+                page_source = page_source.decode('utf-8', errors='replace')
             output_file = os.path.join(self.data_dir, "bls_oes_2019_page_source.html")
             
             with open(output_file, 'w', encoding='utf-8') as f:
                 f.write(page_source)
+            file_written(output_file)
             
             print(f"💾 Page source saved to {output_file}")
             
@@ -258,29 +368,74 @@ class SeleniumBLSOESScraper2019:
         except Exception as e:
             print(f"❌ Error taking screenshot: {e}")
     
+    @instrument('save_data')
+    def save_data(self, data):
+        """Save the extracted data to CSV"""
+        output_file = os.path.join(self.data_dir, "riverside_oes_2019_selenium_data.csv")
+        data.to_csv(output_file, index=False)
+        file_written(output_file)
+        print(f"💾 Data saved to {output_file}")
+        return output_file
+    
+    def get_oes_data_http(self):
+        """Get OES data from the static page without starting a browser"""
+        print("🚀 Starting HTTP-based 2019 OES data extraction...")
+        
+        html = self.fetch_page_source()
+        if html is None:
+            return None
+        
+        # Save page source for debugging
+        self.save_page_source(html)
+        
+        data = self.extract_tables_from_html(html)
+        
+        if data is not None:
+            self.save_data(data)
+            return data
+        else:
+            print("❌ Could not extract any data")
+            return None
+    
+    @instrument('scrape_area', expect_result=True)
     def get_oes_data(self):
         """Main method to get OES data"""
+        if self.fetch_mode == "http":
+            return self.get_oes_data_http()
+        
         print("🚀 Starting Selenium-based 2019 OES data extraction...")
         
+        # Serve repeat runs from the page cache without starting a browser
+        if self.cache is not None:
+            page = self.cache.get(self.url)
+            if page is not None:
+                print(f"⚡ Using cached page source ({page.age / 60:.0f} minutes old)")
+                data = self.extract_tables_from_html(page.body)
+                if data is not None:
+                    self.save_data(data)
+                    return data
+        
         try:
             # Setup webdriver
             if not self.setup_driver():
                 return None
             
-            # Navigate to page
+            # Navigate to page (waits for the data table to settle)
             if not self.navigate_to_oes_page():
                 return None
             
-            # Wait for data to load
-            if not self.wait_for_data_to_load():
-                print("⚠️  Data loading timeout, proceeding anyway...")
-            
             # Save page source and screenshot for debugging
             self.save_page_source()
-            self.take_screenshot()
+            if self.take_screenshots:
+                self.take_screenshot()
             
             # Extract data
-            data = self.extract_table_data()
+            data = None
+            if self.extraction_mode == "js":
+                data = self.extract_table_data_js()
+            
+            if data is None:
+                data = self.extract_table_data()
             
             if data is None:
                 # Try alternative extraction method
@@ -289,9 +444,7 @@ class SeleniumBLSOESScraper2019:
             
             if data is not None:
                 # Save the data
-                output_file = os.path.join(self.data_dir, "riverside_oes_2019_selenium_data.csv")
-                data.to_csv(output_file, index=False)
-                print(f"💾 Data saved to {output_file}")
+                self.save_data(data)
                 
                 return data
             else:
@@ -304,8 +457,8 @@ class SeleniumBLSOESScraper2019:
         
         finally:
             # Clean up
-            if self.driver:
-                self.driver.quit()
+            if self.driver and self.owns_session:
+                self.close_driver()
                 print("🧹 Webdriver closed")
     
     def analyze_extracted_data(self, data):
@@ -353,7 +506,7 @@ def main():
     print("🚀 Selenium-based BLS OES 2019 Web Scraper")
     print("=" * 50)
     
-    scraper = SeleniumBLSOESScraper2019()
+    scraper = SeleniumBLSOESScraper2019(cache=OESPageCache(os.path.join("oes_data_2019", "page_cache")))
     
     # Get OES data
     data = scraper.get_oes_data()
@@ -381,4 +534,5 @@ def main():
         print("4. Contact BLS for direct data access")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    with quiet_output():
+        main()
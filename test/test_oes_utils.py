@@ -0,0 +1,779 @@
+#!/usr/bin/env python3
+"""
+Tests for the Riverside BLS OES processing utilities
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add the utils directory to the path (go up one level from test/ to find utils/)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
+
+def make_flat_file_rows():
+    """A few rows shaped like a BLS all-data flat file"""
+    rows = []
+    for area, lq_base in (('40140', 1.0), ('31080', 2.0), ('12345', 3.0)):
+        for code, title, emp in (('00-0000', 'All Occupations', '1538400'),
+                                 ('11-0000', 'Management Occupations', '98760'),
+                                 ('11-1011', 'Chief Executives', '2070'),
+                                 ('47-2161', 'Plasterers and Stucco Masons', '3120')):
+            rows.append({'AREA': area, 'AREA_TITLE': f'Area {area}', 'NAICS': '000000',
+                         'I_GROUP': 'cross-industry', 'OCC_CODE': code, 'OCC_TITLE': title,
+                         'TOT_EMP': emp, 'EMP_PRSE': '4.3', 'H_MEAN': '113.23', 'A_MEAN': '235520',
+                         'JOBS_1000': '1.223', 'LOC_QUOTIENT': str(lq_base + 0.5)})
+        # Industry breakdown rows must be filtered out
+        rows.append({'AREA': area, 'AREA_TITLE': f'Area {area}', 'NAICS': '236000',
+                     'I_GROUP': '3-digit', 'OCC_CODE': '47-2161', 'OCC_TITLE': 'Plasterers and Stucco Masons',
+                     'TOT_EMP': '900', 'EMP_PRSE': '9.9', 'H_MEAN': '30.00', 'A_MEAN': '62400',
+                     'JOBS_1000': '0.5', 'LOC_QUOTIENT': '9.99'})
+    return pd.DataFrame(rows)
+
+def test_flat_file_ingest(monkeypatch):
+    """Test streaming ingestion of CSV and XLSX flat files filtered by area"""
+    print("🧪 Testing OES flat file ingestion...")
+    
+    import oes_dataset
+    from oes_flat_file_ingest import ingest_flat_file
+    
+    # All areas of a year go to the dataset in one rewrite of the year file
+    year_writes = []
+    write_year = oes_dataset._write_year
+    monkeypatch.setattr(oes_dataset, '_write_year', lambda year, *args: year_writes.append(year) or write_year(year, *args))
+    
+    flat = make_flat_file_rows()
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_file = os.path.join(work_dir, "all_data_M_2023.csv")
+        xlsx_file = os.path.join(work_dir, "all_data_M_2023.xlsx")
+        flat.to_csv(csv_file, index=False)
+        flat.to_excel(xlsx_file, index=False)
+        
+        for path in (csv_file, xlsx_file):
+            output_dir = os.path.join(work_dir, os.path.splitext(os.path.basename(path))[1][1:])
+            dataset_dir = os.path.join(output_dir, "dataset")
+            results = ingest_flat_file(path, ["0040140", "0031080"], output_dir=output_dir, chunksize=2,
+                                       dataset_dir=dataset_dir)
+            
+            assert sorted(results) == ["0031080", "0040140"]
+            riverside = results["0040140"]
+            assert list(riverside.columns)[0] == 'Occupation (SOC code)'
+            assert 'Location Quotient  ()' in riverside.columns
+            assert riverside['Occupation (SOC code)'].tolist() == [
+                'All Occupations (00-0000)', 'Management Occupations (11-0000)',
+                'Chief Executives (11-1011)', 'Plasterers and Stucco Masons (47-2161)']
+            assert riverside['Location Quotient  ()'].tolist()[2:] == [1.5, 1.5]
+            assert os.path.exists(os.path.join(output_dir, "oes_0040140_2023_cleaned_data.csv"))
+            assert riverside.loc[0, 'Employment  (1)'] == 1538400
+            assert oes_dataset.list_partitions(dataset_dir) == [(2023, "0031080"), (2023, "0040140")]
+        assert year_writes == [2023, 2023]
+
+def test_targeted_table_parse():
+    """Test that the targeted parser matches pd.read_html on the saved 2019 page"""
+    print("🧪 Testing targeted OES table parsing...")
+    
+    from io import StringIO
+    from oes_table_parser import read_target_table, table_html_matches
+    
+    page_source = os.path.join(os.path.dirname(__file__), '..', 'oes_data_2019', 'bls_oes_2019_page_source.html')
+    with open(page_source, 'r', encoding='utf-8') as f:
+        html = f.read()
+    
+    expected = next(df for df in pd.read_html(StringIO(html))
+                    if any('location quotient' in str(col).lower() for col in df.columns))
+    parsed = read_target_table(page_source, 'Location Quotient')
+    pd.testing.assert_frame_equal(parsed, expected)
+    
+    assert read_target_table(page_source, 'no such column') is None
+    assert table_html_matches("<table><thead><tr><th>Location quotient</th></tr></thead></table>", ['location quotient'])
+    assert not table_html_matches("<table><tr><td>Navigation</td></tr></table>", ['location quotient'])
+
+def test_value_parser():
+    """Test splitting footnote-prefixed cells into values, footnote codes and null reasons"""
+    print("🧪 Testing OES value parsing...")
+    
+    from oes_value_parser import parse_oes_column, NULL_REASON_NONE, NULL_REASON_DASH, NULL_REASON_HASH, \
+        NULL_REASON_DOUBLE_STAR, NULL_REASON_FOOTNOTE_ONLY, NULL_REASON_EMPTY
+    from process_extracted_data import clean_oes_data
+    
+    cells = pd.Series(["()  2,070", "()  $113.23", "(5)  -", "(8)", "0.6%", "#", "(2)  **", None])
+    values, footnotes, reasons = parse_oes_column(cells)
+    
+    assert values.iloc[:2].tolist() == [2070.0, 113.23]
+    assert values.iloc[4] == 0.6
+    assert values.iloc[[2, 3, 5, 6, 7]].isna().all()
+    assert footnotes.dtype == 'int8' and reasons.dtype == 'int8'
+    assert footnotes.tolist() == [0, 0, 5, 8, 0, 0, 2, 0]
+    assert reasons.tolist() == [NULL_REASON_NONE, NULL_REASON_NONE, NULL_REASON_DASH, NULL_REASON_FOOTNOTE_ONLY,
+                                NULL_REASON_NONE, NULL_REASON_HASH, NULL_REASON_DOUBLE_STAR, NULL_REASON_EMPTY]
+    
+    raw = pd.DataFrame({'Occupation (SOC code)': ['Chief Executives (11-1011)', 'Legislators (11-1031)'],
+                        'Employment  (1)': ['()  2,070', '()  220'],
+                        'Hourly mean wage  ()': ['()  $113.23', '(4)  -'],
+                        'Location Quotient  ()': ['()  0.89', '()  0.75']})
+    cleaned, codes = clean_oes_data(raw, return_codes=True)
+    assert cleaned['Employment  (1)'].tolist() == [2070.0, 220.0]
+    assert cleaned['Location Quotient  ()'].tolist() == [0.89, 0.75]
+    assert codes.to_dict('records') == [{'Occupation': 'Legislators (11-1031)', 'Column': 'Hourly mean wage  ()',
+                                         'Footnote': 4, 'Null_Reason': NULL_REASON_DASH}]
+    
+    # 2019 layout: the occupation column is the title, so code and level must stay text
+    from oes_table_parser import read_target_table
+    page_source = os.path.join(os.path.dirname(__file__), '..', 'oes_data_2019', 'bls_oes_2019_page_source.html')
+    cleaned_2019 = clean_oes_data(read_target_table(page_source, 'Location Quotient'))
+    assert cleaned_2019['Occupation code'].iloc[0] == '00-0000'
+    assert {'total', 'major', 'detail'} <= set(cleaned_2019['Level'])
+    assert pd.api.types.is_numeric_dtype(cleaned_2019['Employment'])
+    assert cleaned_2019['Location quotient'].notna().any()
+
+def test_canonical_schema():
+    """Test mapping the 2019, 2024 and flat file layouts onto the canonical typed frame"""
+    print("🧪 Testing canonical OES schema...")
+    
+    from oes_schema import to_canonical, CANONICAL_COLUMNS, CANONICAL_DTYPES
+    
+    repo_dir = os.path.join(os.path.dirname(__file__), '..')
+    df_2019 = pd.read_csv(os.path.join(repo_dir, 'oes_data_2019', 'riverside_oes_2019_selenium_data.csv'))
+    df_2024 = pd.read_csv(os.path.join(repo_dir, 'oes_data', 'riverside_oes_selenium_data.csv'))
+    flat = make_flat_file_rows().query("I_GROUP == 'cross-industry' and AREA == '40140'")
+    
+    for raw, year in ((df_2019, 2019), (df_2024, 2024), (flat, 2023)):
+        canonical = to_canonical(raw, year=year, area_code='0040140')
+        assert list(canonical.columns) == ['Year', 'Area_Code'] + CANONICAL_COLUMNS
+        for col, dtype in CANONICAL_DTYPES.items():
+            assert canonical[col].dtype == dtype, col
+        
+        chief = canonical[canonical['SOC_Code'] == '11-1011'].iloc[0]
+        assert chief['Occupation'] == 'Chief Executives'
+        assert chief['Level'] == 'detail'
+    
+    for raw in (df_2019, df_2024):
+        assert to_canonical(raw).memory_usage(deep=True).sum() < raw.memory_usage(deep=True).sum()
+    
+    canonical_2024 = to_canonical(df_2024)
+    total = canonical_2024[canonical_2024['SOC_Code'] == '00-0000'].iloc[0]
+    assert total['Level'] == 'total'
+    assert total['Employment'] == 1695430
+    assert canonical_2024.loc[canonical_2024['SOC_Code'] == '11-1011', 'Location_Quotient'].iloc[0] == np.float32(0.89)
+    
+    # A parsed page source keeps one space before the footnote suffix
+    parsed = to_canonical(df_2024.rename(columns=lambda col: ' '.join(col.split())))
+    assert parsed['Location_Quotient'].notna().sum() == canonical_2024['Location_Quotient'].notna().sum()
+    
+    # Repeated header rows and the page's footnote rows are not occupations
+    assert canonical_2024['SOC_Code'].notna().all()
+    header = pd.DataFrame([df_2024.columns], columns=df_2024.columns)
+    assert len(to_canonical(pd.concat([df_2024.head(3), header], ignore_index=True))) == 3
+    
+    # Flat file level spellings; unknown ones fall back to the level of the code
+    grouped = flat.assign(O_GROUP=['total', 'major', 'detailed', 'unknown'])
+    assert to_canonical(grouped)['Level'].tolist() == ['total', 'major', 'detail', 'detail']
+
+def test_parquet_dataset():
+    """Test writing area-years to the Parquet dataset and reading them back with projection and filters"""
+    print("🧪 Testing OES Parquet dataset...")
+    
+    from oes_dataset import write_area_year, write_pages, read_dataset, list_partitions
+    from oes_schema import to_canonical
+    
+    repo_dir = os.path.join(os.path.dirname(__file__), '..')
+    df_2019 = pd.read_csv(os.path.join(repo_dir, 'oes_data_2019', 'riverside_oes_2019_selenium_data.csv'))
+    df_2024 = pd.read_csv(os.path.join(repo_dir, 'oes_data', 'riverside_oes_selenium_data.csv'))
+    
+    with tempfile.TemporaryDirectory() as dataset_dir:
+        write_area_year(df_2019, 2019, "0040140", dataset_dir)
+        write_pages([(2024, "0040140", df_2024), (2024, "0031080", df_2024.head(10))], dataset_dir)
+        assert list_partitions(dataset_dir) == [(2019, "0040140"), (2024, "0031080"), (2024, "0040140")]
+        
+        # A full area-year round-trips to the canonical frame, one row per occupation: the
+        # scraped page lists its table twice, followed by footnote rows with no SOC code
+        riverside_2024 = read_dataset(dataset_dir, filters={'Year': 2024, 'Area_Code': "0040140"})
+        expected = to_canonical(df_2024)
+        expected = expected[expected['SOC_Code'].notna()].drop_duplicates('SOC_Code').reset_index(drop=True)
+        for col in ['SOC_Code', 'Occupation']:
+            expected[col] = expected[col].cat.remove_unused_categories()
+        assert len(df_2024) == 1408 and len(riverside_2024) == len(expected) == 702
+        assert riverside_2024['SOC_Code'].is_unique
+        assert riverside_2024['Year'].eq(2024).all()
+        for col in expected.columns:
+            assert riverside_2024[col].dtype == expected[col].dtype, col
+            assert riverside_2024[col].astype(object).equals(expected[col].astype(object)), col
+        
+        # Column projection and an area filter across years
+        lq = read_dataset(dataset_dir, columns=['Year', 'Location_Quotient'], filters={'Area_Code': ["0040140"]})
+        assert list(lq.columns) == ['Year', 'Location_Quotient']
+        assert lq['Year'].value_counts().to_dict() == {2024: len(expected), 2019: len(to_canonical(df_2019))}
+        
+        # Rewriting an area-year replaces it and leaves the other areas alone
+        write_area_year(df_2024.head(5), 2024, "0040140", dataset_dir)
+        counts = read_dataset(dataset_dir, columns=['Area_Code'], filters={'Year': 2024})['Area_Code'].value_counts()
+        assert counts.to_dict() == {"0031080": 10, "0040140": 5}
+        
+        # Processes writing the same year at once keep every area
+        from concurrent.futures import ProcessPoolExecutor
+        areas = [f"00{n:05d}" for n in range(1, 7)]
+        with ProcessPoolExecutor(max_workers=3) as executor:
+            list(executor.map(write_area_year, [df_2024.head(3)] * len(areas), [2023] * len(areas), areas,
+                              [dataset_dir] * len(areas)))
+        assert [area for year, area in list_partitions(dataset_dir) if year == 2023] == areas
+        # No temp files left behind; the hidden lock file is skipped by dataset discovery
+        assert sorted(os.listdir(os.path.join(dataset_dir, "Year=2023"))) == [".part-0.parquet.lock", "part-0.parquet"]
+
+def test_lq_cube():
+    """Test building the memory-mapped LQ cube and slicing it by area, occupation and year"""
+    print("🧪 Testing memory-mapped LQ cube...")
+    
+    from oes_dataset import write_pages
+    from lq_cube import build_cube, LQCube
+    
+    repo_dir = os.path.join(os.path.dirname(__file__), '..')
+    df_2019 = pd.read_csv(os.path.join(repo_dir, 'oes_data_2019', 'riverside_oes_2019_selenium_data.csv'))
+    df_2024 = pd.read_csv(os.path.join(repo_dir, 'oes_data', 'riverside_oes_selenium_data.csv'))
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        dataset_dir = os.path.join(work_dir, "dataset")
+        cube_dir = os.path.join(work_dir, "cube")
+        write_pages([(2019, "0040140", df_2019), (2024, "0040140", df_2024), (2024, "0031080", df_2024.head(10))],
+                    dataset_dir)
+        
+        assert build_cube(dataset_dir, cube_dir) is not None
+        cube = LQCube(cube_dir)
+        assert cube.areas == ["0031080", "0040140"]
+        assert cube.years == [2019, 2024]
+        assert cube.occupations['11-1011'] == 'Chief Executives'
+        
+        assert isinstance(cube.arrays['Location_Quotient'], np.memmap)
+        assert np.isclose(cube.get("0040140", "11-0000", 2019), 0.79)
+        assert np.isclose(cube.get("0040140", "11-1011", 2024), 0.89)
+        assert cube.get("0040140", "00-0000", 2024, measure='Employment') == 1695430
+        
+        across_areas = cube.occupation_across_areas("11-1011", 2024)
+        assert across_areas.index.tolist() == ["0031080", "0040140"]
+        assert np.isclose(across_areas["0031080"], 0.89)
+        
+        history = cube.area_across_years("0040140")
+        assert history.shape == (len(cube.soc_codes), 2)
+        assert np.isnan(cube.get("0031080", "11-1011", 2019))
+
+def test_soc_index_join():
+    """Test SOC keys, hierarchy keys and the SOC hash join used by the 2019/2024 comparison"""
+    print("🧪 Testing SOC code index...")
+    
+    from soc_index import soc_keys, format_soc, hierarchy_keys, SOCIndex
+    from compare_2019_2024 import find_matching_occupations
+    
+    keys = soc_keys(['11-1011', 'Chief Executives (11-1011)', '00-0000', 'Total', None])
+    assert keys.tolist() == [111011, 111011, 0, -1, -1]
+    assert format_soc([111011, 0, -1]) == ['11-1011', '00-0000', None]
+    hierarchy = hierarchy_keys([111011, 472161, 151252, 311131, 515111, -1])
+    assert hierarchy['Major_Key'].tolist() == [110000, 470000, 150000, 310000, 510000, -1]
+    # SOC 2018 minor groups numbered XX-XX00
+    assert hierarchy['Minor_Key'].tolist() == [111000, 472000, 151200, 311100, 515100, -1]
+    assert hierarchy['Broad_Key'].tolist() == [111010, 472160, 151250, 311130, 515110, -1]
+    
+    from oes_schema import soc_level
+    assert soc_level(pd.Series(['15-1200', '15-1250', '15-1252', '15-2000'])).tolist() == [
+        'minor', 'broad', 'detail', 'minor']
+    
+    df_2019 = pd.DataFrame({'SOC_Code': ['11-0000', '11-1011', '11-1021', '53-1047', '99-9999'],
+                            'Occupation_clean': ['Management Occupations', 'Chief Executives',
+                                                 'General and Operations Managers',
+                                                 'First-Line Supervisors of Transportation Workers',
+                                                 'Only in 2019'],
+                            'Location_Quotient': [0.8, 0.5, 1.0, 1.74, 2.0]})
+    df_2024 = pd.DataFrame({'SOC_Code': ['11-1011', '11-1021', '11-1011', '53-1047'],
+                            'Occupation_clean': ['Chief Executives', 'General and Operations Managers',
+                                                 'Chief Executives',
+                                                 'First-Line Supervisors of Transportation Workers, Except Aircraft'],
+                            'Location_Quotient': [0.89, None, 0.89, 1.52]})
+    
+    index = SOCIndex(df_2024)
+    assert len(index) == 3
+    assert '11-1011' in index and '99-9999' not in index
+    assert index.lookup(['53-1047', '99-9999', '11-1011']).tolist() == [2, -1, 0]
+    assert SOCIndex(df_2019).children('11-0000')['SOC_Code'].tolist() == ['11-1011', '11-1021']
+    
+    merged = find_matching_occupations(df_2019, df_2024)
+    # Renamed titles still join on code; duplicates and missing LQs drop out
+    assert sorted(merged['SOC_Code']) == ['11-1011', '53-1047']
+    chief = merged[merged['SOC_Code'] == '11-1011'].iloc[0]
+    assert chief['Occupation'] == 'Chief Executives'
+    assert np.isclose(chief['Change'], 0.39) and np.isclose(chief['Percent_Change'], 78.0)
+
+def test_panel_comparison():
+    """Test change, percent change, CAGR and rank movement across every pair of years"""
+    print("🧪 Testing N-year panel comparison...")
+    
+    from panel_comparison import panel_from_frames, compare_panel, summarize_comparison
+    
+    def page(lqs):
+        return pd.DataFrame({'Occupation (SOC code)': ['Chief Executives (11-1011)', 'Legislators (11-1031)',
+                                                       'Plasterers and Stucco Masons (47-2161)'],
+                             'Location Quotient  ()': lqs})
+    
+    frames = [(2014, "0040140", page(['1.00', '2.00', '0.50'])),
+              (2019, "0040140", page(['1.50', '1.00', '(5)  -'])),
+              (2024, "0040140", page(['2.25', '0.50', '0.80'])),
+              (2024, "0031080", page(['0.30', '0.20', '0.10']))]
+    panel = panel_from_frames(frames)
+    assert panel.values.shape == (2, 3, 3)
+    
+    comparison = compare_panel(panel)
+    riverside = comparison[comparison['Area_Code'] == "0040140"].set_index(['SOC_Code', 'Year_From', 'Year_To'])
+    # Three year pairs, minus the pairs with a suppressed LQ; the single-year area has no pairs
+    assert len(comparison) == 3 + 3 + 1
+    
+    chief = riverside.loc[('11-1011', 2014, 2024)]
+    assert chief['Occupation'] == 'Chief Executives'
+    assert np.isclose(chief['Change'], 1.25) and np.isclose(chief['Percent_Change'], 125.0)
+    assert np.isclose(chief['CAGR_Percent'], (2.25 ** 0.1 - 1) * 100)
+    assert (chief['Rank_From'], chief['Rank_To'], chief['Rank_Change']) == (2, 1, 1)
+    
+    legislators = riverside.loc[('11-1031', 2019, 2024)]
+    assert np.isclose(legislators['Percent_Change'], -50.0)
+    assert legislators['Rank_Change'] == -1
+    assert ('47-2161', 2014, 2019) not in riverside.index
+    
+    consecutive = compare_panel(panel, pairs='consecutive')
+    assert sorted(set(zip(consecutive['Year_From'], consecutive['Year_To']))) == [(2014, 2019), (2019, 2024)]
+    
+    summary = summarize_comparison(comparison).set_index(['Area_Code', 'Year_From', 'Year_To'])
+    assert summary.loc[("0040140", 2014, 2024), 'Increased'] == 2
+    assert summary.loc[("0040140", 2014, 2024), 'Decreased'] == 1
+    
+    # A major group ranks among the groups, not ahead of the detailed occupations
+    management = pd.DataFrame({'Occupation (SOC code)': ['Management Occupations (11-0000)'],
+                               'Location Quotient  ()': ['9.00']})
+    grouped = compare_panel(panel_from_frames([(year, area, pd.concat([management, df], ignore_index=True))
+                                               for year, area, df in frames]))
+    grouped = grouped[grouped['Area_Code'] == "0040140"].set_index(['SOC_Code', 'Year_From', 'Year_To'])
+    chief = grouped.loc[('11-1011', 2014, 2024)]
+    assert (chief['Rank_From'], chief['Rank_To'], chief['Rank_Change']) == (2, 1, 1)
+    assert grouped.loc[('11-0000', 2014, 2024), 'Rank_From'] == 1
+    
+    # Value columns are named after the panel's measure
+    assert {'LQ_From', 'LQ_To'} <= set(comparison.columns)
+    employment = pd.DataFrame({'Occupation (SOC code)': ['Chief Executives (11-1011)'], 'Employment  (1)': ['2,070']})
+    employment_panel = panel_from_frames([(2019, "0040140", employment), (2024, "0040140", employment)],
+                                         measure='Employment')
+    employment_comparison = compare_panel(employment_panel)
+    assert employment_comparison[['Employment_From', 'Employment_To']].iloc[0].tolist() == [2070.0, 2070.0]
+    assert 'LQ_From' not in employment_comparison.columns
+
+def test_lq_report():
+    """Test binned categories, stable ranks, partial-sort top/bottom lists and grouped summaries"""
+    print("🧪 Testing columnar LQ report engine...")
+    
+    from lq_report import CATEGORY_LABELS_2019, categorize, distribution, lq_report, lq_summary, summary_stats, top_bottom
+    
+    lqs = [2.5, 1.0, np.nan, 0.5, 1.5, 1.0, 2.0, 0.2]
+    # Bands are right-closed, and a missing LQ falls into the lowest band as it always has
+    assert list(categorize(lqs)) == ['Very High Concentration', 'Below Average', 'Low Concentration',
+                                     'Low Concentration', 'Above Average', 'Below Average',
+                                     'High Concentration', 'Low Concentration']
+    assert list(categorize([0.9], labels=CATEGORY_LABELS_2019)) == ['Average']
+    assert distribution(lqs).tolist() == [2, 2, 2, 1]
+    
+    stats = summary_stats(lqs)
+    expected = pd.Series(lqs).describe()
+    assert stats['count'] == 7 and np.isclose(stats['median'], expected['50%'])
+    assert np.isclose(stats['mean'], expected['mean']) and np.isclose(stats['std'], expected['std'])
+    assert (stats['min'], stats['max']) == (0.2, 2.5)
+    
+    top, bottom = top_bottom(lqs, 3)
+    # Same rows as nlargest/nsmallest with keep='first'
+    assert top.tolist() == pd.Series(lqs).nlargest(3).index.tolist() == [0, 6, 4]
+    assert bottom.tolist() == pd.Series(lqs).nsmallest(3).index.tolist() == [7, 3, 1]
+    
+    df = pd.DataFrame({'Area_Code': ['B'] * 4 + ['A'] * 4,
+                       'Occupation': [f"Occupation {i}" for i in range(8)],
+                       'Location Quotient': lqs})
+    report = lq_report(df, 'Occupation', 'Location Quotient', area_col='Area_Code')
+    assert report['Area_Code'].tolist() == ['A'] * 4 + ['B'] * 4
+    assert report['Rank'].tolist() == [1, 2, 3, 4, 1, 2, 3, 4]
+    # Ties keep input order; missing LQs rank last
+    assert report['Occupation'].tolist()[:4] == ['Occupation 6', 'Occupation 4', 'Occupation 5', 'Occupation 7']
+    assert report['Occupation'].tolist()[7] == 'Occupation 2'
+    
+    summary = lq_summary(df, 'Location Quotient', area_col='Area_Code').set_index('Area_Code')
+    assert summary.loc['B', 'Occupations'] == 4 and summary.loc['B', 'LQ_Count'] == 3
+    assert summary.loc['A', 'High_Concentration'] == 0 and summary.loc['A', 'Moderate_Concentration'] == 2
+
+def test_lq_engine():
+    """Test LQs computed from employment against national, summed and per-group baselines"""
+    print("🧪 Testing location quotient engine...")
+    
+    from lq_engine import aggregate_areas, baseline, compute_lq, employment_matrix, lq_frame, matrix_lq
+    
+    rows = []
+    for area, total, emp in (("99", 1000, [100, 50, 10]), ("A", 100, [20, 5, None]), ("B", 200, [10, 20, 4])):
+        rows.append((area, '00-0000', 'All Occupations', total))
+        for code, title, value in zip(['11-1011', '47-2161', '53-1047'],
+                                      ['Chief Executives', 'Plasterers', 'Supervisors'], emp):
+            rows.append((area, code, title, value))
+    df = pd.DataFrame(rows, columns=['Area_Code', 'SOC_Code', 'Occupation', 'Employment'])
+    df['Employment'] = df['Employment'].astype('Int32')
+    
+    matrix = employment_matrix(df)
+    assert matrix.shape == (3, 3) and matrix.areas == ['99', 'A', 'B'] and matrix.totals.tolist() == [1000.0, 100.0, 200.0]
+    
+    lq = matrix_lq(matrix, baseline_areas=["99"])
+    a = matrix.rows(["A"])[0]
+    # (20 / 100) / (100 / 1000) = 2.0; suppressed employment stays unknown
+    assert np.allclose(lq[a, :2], [2.0, 1.0]) and np.isnan(lq[a, 2])
+    assert np.allclose(lq[matrix.rows(["99"])[0]], 1.0)
+    # The default baseline is the nation alone, not the nation plus its areas
+    assert np.allclose(matrix_lq(matrix), lq, equal_nan=True)
+    assert np.allclose(matrix_lq(employment_matrix(df[df['Area_Code'] != "99"])),
+                       matrix_lq(matrix, baseline_areas=["A", "B"])[1:], equal_nan=True)
+    
+    # Region of A and B as the baseline: A's 20 of 100 against 30 of 300
+    regional = matrix_lq(matrix, baseline_areas=["A", "B"])
+    assert np.isclose(regional[a, 0], 2.0) and np.isclose(regional[matrix.rows(["B"])[0], 1], (20 / 200) / (25 / 300))
+    
+    # Each area against its own group equals computing the groups one by one
+    grouped = matrix_lq(matrix, groups=['US', 'Region', 'Region'])
+    assert np.allclose(grouped[1:], regional[1:], equal_nan=True) and np.allclose(grouped[0], 1.0)
+    
+    combined = aggregate_areas(matrix, {'A+B': ["A", "B"]})
+    employment, total = baseline(matrix, ["99"])
+    combined_lq = compute_lq(combined.employment, combined.totals, employment, total)
+    assert np.allclose(combined_lq[0], [(30 / 300) / 0.1, (25 / 300) / 0.05, (4 / 300) / 0.01])
+    
+    frame = lq_frame(matrix, lq)
+    assert len(frame) == 8 and set(frame['Occupation']) == {'Chief Executives', 'Plasterers', 'Supervisors'}
+    
+    # Without a total row, the area total is the sum of its detailed occupations
+    no_total = employment_matrix(df[df['SOC_Code'] != '00-0000'])
+    assert no_total.totals[no_total.rows(["B"])[0]] == 34.0
+
+def test_shift_share():
+    """Test the national growth, occupation mix and competitive split of employment change"""
+    print("🧪 Testing shift-share decomposition...")
+    
+    from panel_comparison import panel_from_frames
+    from shift_share import shift_share, summarize_shift_share
+    
+    def page(total, chiefs, plasterers):
+        # The major group repeats its detailed occupation's employment
+        return pd.DataFrame({'Occupation (SOC code)': ['All Occupations (00-0000)', 'Management Occupations (11-0000)',
+                                                       'Chief Executives (11-1011)',
+                                                       'Plasterers and Stucco Masons (47-2161)'],
+                             'Employment  (1)': [total, chiefs, chiefs, plasterers]})
+    
+    frames = [(2019, "99", page('1,000', '100', '50')), (2024, "99", page('1,100', '120', '50')),
+              (2019, "0040140", page('100', '10', '20')), (2024, "0040140", page('120', '15', '18'))]
+    panel = panel_from_frames(frames, measure='Employment')
+    result = shift_share(panel, pairs='consecutive').set_index(['Area_Code', 'SOC_Code'])
+    
+    chief = result.loc[("0040140", '11-1011')]
+    # Nation +10%, chief executives nationally +20%, Riverside chief executives +50%
+    assert np.isclose(chief['National_Growth'], 1.0)
+    assert np.isclose(chief['Occupation_Mix'], 1.0)
+    assert np.isclose(chief['Competitive'], 3.0)
+    
+    components = result[['National_Growth', 'Occupation_Mix', 'Competitive']].sum(axis=1)
+    assert np.allclose(components, result['Change'])
+    # The baseline itself has no competitive effect
+    assert np.allclose(result.loc["99", 'Competitive'], 0.0)
+    
+    # Only detailed occupations are decomposed, so the summary counts each job once
+    assert set(result.index.get_level_values('SOC_Code')) == {'11-1011', '47-2161'}
+    summary = summarize_shift_share(result.reset_index()).set_index('Area_Code')
+    assert np.isclose(summary.loc["0040140", 'Change'], 3.0)
+    
+    regional = shift_share(panel, baseline_areas=["0040140"]).set_index(['Area_Code', 'SOC_Code'])
+    assert np.allclose(regional.loc["0040140", 'Competitive'], 0.0)
+
+def test_lq_monte_carlo():
+    """Test LQ intervals and category stability, reproducible across worker counts"""
+    print("🧪 Testing Monte Carlo LQ intervals...")
+    
+    from lq_monte_carlo import simulate_areas, simulate_lq
+    from oes_schema import to_canonical
+    
+    # Without sampling error the interval collapses onto the published LQ
+    low, high, stability = simulate_lq([2.5, 0.8], [0.0, 0.0], 0.0, draws=200, seed=1)
+    assert np.allclose(low, [2.5, 0.8]) and np.allclose(high, [2.5, 0.8]) and stability.tolist() == [1.0, 1.0]
+    
+    # A noisy LQ near a category edge is far less stable than a precise one well inside its band
+    low, high, stability = simulate_lq([1.05, 3.0], [0.3, 0.02], 0.006, draws=2000, seed=1)
+    assert low[0] < 1.05 < high[0] and high[1] - low[1] < high[0] - low[0]
+    assert stability[0] < 0.7 and stability[1] > 0.99
+    assert np.isnan(simulate_lq([1.0], [np.nan], 0.0, draws=10, seed=1)[2][0])
+    
+    page = pd.DataFrame({'Occupation (SOC code)': ['All Occupations (00-0000)', 'Chief Executives (11-1011)',
+                                                   'Legislators (11-1031)', 'Tapers (47-2082)'],
+                         'Employment percent relative standard error  (3)': ['0.6', '4.3', '25.0', '(8)  -'],
+                         'Location Quotient  ()': ['1.00', '0.89', '1.60', '5.78']})
+    frames = {"0040140": to_canonical(page), "0031080": to_canonical(page)}
+    serial = simulate_areas(frames, draws=500, seed=7, workers=1)
+    parallel = simulate_areas(frames, draws=500, seed=7, workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert len(serial) == 6 and serial['Location_Quotient'].tolist()[:3] == [0.89, 1.6, 5.78]
+    # Each area has its own stream
+    assert not np.array_equal(serial['LQ_Low'][:2], serial['LQ_Low'][3:5])
+
+def test_pipeline():
+    """Test that only stages with changed inputs rerun, with early cutoff on unchanged outputs"""
+    print("🧪 Testing incremental pipeline runner...")
+    
+    from pipeline import Pipeline, Stage
+    
+    def step(name, source, target, transform):
+        code = (f"open('runs.log', 'a').write('{name}\\n'); text = open('{source}').read(); "
+                f"open('{target}', 'w').write({transform})")
+        return [sys.executable, '-c', code]
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, text in (('in_a.txt', 'one\ntwo\n'), ('in_b.txt', 'b\n')):
+            with open(os.path.join(tmpdir, name), 'w') as f:
+                f.write(text)
+        
+        stages = [
+            Stage('count', step('count', 'in_a.txt', 'a.txt', "str(text.count(chr(10)))"),
+                  inputs=['in_a.txt'], outputs=['a.txt']),
+            Stage('upper', step('upper', 'in_b.txt', 'b.txt', "text.upper()"),
+                  inputs=['in_b.txt'], outputs=['b.txt']),
+            Stage('join', step('join', 'a.txt', 'c.txt', "text + open('b.txt').read()"),
+                  inputs=['a.txt', 'b.txt'], outputs=['c.txt'], deps=['count', 'upper']),
+        ]
+        
+        def runs():
+            path = os.path.join(tmpdir, 'runs.log')
+            if not os.path.exists(path):
+                return []
+            with open(path) as f:
+                ran = f.read().split()
+            os.remove(path)
+            return sorted(ran)
+        
+        status = Pipeline(stages, root=tmpdir).run(workers=2)
+        assert set(status.values()) == {'ran'} and runs() == ['count', 'join', 'upper']
+        with open(os.path.join(tmpdir, 'c.txt')) as f:
+            assert f.read() == '2B\n'
+        
+        # No-op rebuild, from a fresh runner reading the saved state
+        status = Pipeline(stages, root=tmpdir).run()
+        assert set(status.values()) == {'fresh'} and runs() == []
+        
+        # Same line count: 'count' reruns but writes identical content, so 'join' stays fresh
+        with open(os.path.join(tmpdir, 'in_a.txt'), 'w') as f:
+            f.write('three\nfour\n')
+        status = Pipeline(stages, root=tmpdir).run()
+        assert status == {'count': 'ran', 'upper': 'fresh', 'join': 'fresh'} and runs() == ['count']
+        
+        with open(os.path.join(tmpdir, 'in_b.txt'), 'w') as f:
+            f.write('c\n')
+        assert Pipeline(stages, root=tmpdir).run(dry_run=True) == {'count': 'fresh', 'upper': 'stale', 'join': 'stale'}
+        assert runs() == []
+        status = Pipeline(stages, root=tmpdir).run(targets=['upper'])
+        assert status == {'upper': 'ran'}
+        
+        # A stage that exits cleanly without writing its outputs fails, and its dependents are skipped
+        broken = [stages[0], Stage('upper', [sys.executable, '-c', 'pass'], inputs=['in_b.txt'], outputs=['b2.txt']),
+                  stages[2]]
+        status = Pipeline(broken, root=tmpdir).run()
+        assert status['upper'] == 'failed' and status['join'] == 'skipped'
+
+def test_cli_lazy_imports():
+    """Test that analysis commands run through the CLI without importing selenium"""
+    print("🧪 Testing unified CLI lazy imports...")
+    
+    import subprocess
+    
+    cli = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils', 'oes_cli.py')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pd.DataFrame({'Area_Code': ['0040140'], 'SOC_Code': ['47-2161'], 'Occupation': ['Plasterers'],
+                      'Employment': [3120.0], 'Location_Quotient': [5.66]}).to_csv(
+            os.path.join(tmpdir, 'riverside.csv'), index=False)
+        
+        for argv in (['query', 'dataset', '--dataset', os.path.join(tmpdir, 'dataset')],
+                     ['analyze', 'intervals', '--input', 'riverside.csv', '--draws', '100', '--workers', '1',
+                      '--output', 'intervals.csv']):
+            result = subprocess.run([sys.executable, cli, '--timing'] + argv, cwd=tmpdir,
+                                    capture_output=True, text=True, timeout=120)
+            assert result.returncode == 0, result.stderr
+            assert '(selenium not loaded)' in result.stdout, result.stdout
+        
+        intervals = pd.read_csv(os.path.join(tmpdir, 'intervals.csv'))
+        assert intervals['Location_Quotient'].tolist() == [5.66]
+
+def test_batch_process():
+    """Test that an archive of page sources is processed in parallel with per-page errors isolated"""
+    print("🧪 Testing batch page source processing...")
+    
+    import shutil
+    from batch_process import find_page_sources, page_key, process_pages
+    from oes_schema import to_canonical
+    from oes_table_parser import read_target_table
+    
+    page_source = os.path.join(os.path.dirname(__file__), '..', 'oes_data_2019', 'bls_oes_2019_page_source.html')
+    
+    assert page_key(os.path.join('archive', '2019', 'oes_40140.htm')) == (2019, '0040140')
+    assert page_key(os.path.join('oes_data', 'areas', '0031080', 'page.html'), year=2024) == (2024, '0031080')
+    assert page_key(os.path.join('oes_data_2019', 'page.html'), area_code='0040140') == (2019, '0040140')
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for area in ('40140', '31080', '12345'):
+            os.makedirs(os.path.join(tmpdir, '2019'), exist_ok=True)
+            shutil.copy(page_source, os.path.join(tmpdir, '2019', f'oes_{area}.htm'))
+        os.makedirs(os.path.join(tmpdir, 'areas', '0040140'))
+        with open(os.path.join(tmpdir, 'areas', '0040140', 'bls_oes_page_source.html'), 'w') as f:
+            f.write("<html><body><p>Service unavailable</p></body></html>")
+        
+        paths = find_page_sources([tmpdir])
+        assert len(paths) == 4
+        
+        merged, status = process_pages(paths, year=2024, workers=2)
+        serial, _ = process_pages(paths, year=2024, workers=1)
+        pd.testing.assert_frame_equal(merged, serial)
+        
+        assert status['Error'].notna().tolist() == [False, False, False, True]
+        assert sorted(merged['Area_Code'].astype(str).unique()) == ['0012345', '0031080', '0040140']
+        
+        expected = to_canonical(read_target_table(page_source, 'Location Quotient'))
+        riverside = merged[merged['Area_Code'].astype(str) == '0040140'].reset_index(drop=True)
+        pd.testing.assert_frame_equal(riverside[expected.columns], expected.reset_index(drop=True))
+
+def test_stage_metrics():
+    """Test that stages record time, rows, bytes and failures as JSON-lines events"""
+    print("🧪 Testing structured stage metrics...")
+    
+    import io
+    import contextlib
+    import oes_metrics
+    from oes_metrics import configure, file_written, instrument, load_events, quiet_output, stage, summarize
+    
+    @instrument('clean', expect_result=True)
+    def clean(df):
+        return df.dropna() if len(df) else None
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        metrics_file = os.path.join(tmpdir, 'metrics.jsonl')
+        configure(path=metrics_file)
+        try:
+            with stage('process', area='0040140') as record:
+                cleaned = clean(pd.DataFrame({'LQ': [1.0, None, 2.0]}))
+                clean(pd.DataFrame({'LQ': []}))
+                output = os.path.join(tmpdir, 'out.csv')
+                cleaned.to_csv(output, index=False)
+                file_written(output)
+                record.rows_out = len(cleaned)
+            try:
+                with stage('broken'):
+                    raise ValueError("bad page")
+            except ValueError:
+                pass
+        finally:
+            configure(path='')
+        
+        events = load_events(metrics_file)
+        assert [event['stage'] for event in events] == ['clean', 'clean', 'process', 'broken']
+        first, empty, process, broken = events
+        assert (first['rows_in'], first['rows_out'], first['status'], first['parent']) == (3, 2, 'ok', 'process')
+        assert (empty['rows_in'], empty['status']) == (0, 'failed')
+        assert process['bytes_written'] == os.path.getsize(output) and process['area'] == '0040140'
+        assert process['wall_seconds'] >= first['wall_seconds'] + empty['wall_seconds']
+        assert broken['status'] == 'error' and broken['error'] == 'ValueError: bad page'
+        assert all(event['run_id'] == oes_metrics.RUN_ID for event in events)
+        
+        summary = summarize(events).set_index('stage')
+        assert summary.loc['clean', 'calls'] == 2 and summary.loc['clean', 'failed'] == 1
+        
+        # Dataset reads count the Parquet files they open; fetched pages count their bodies
+        from oes_dataset import read_dataset, write_area_year, year_file
+        from oes_metrics import data_read, recorded_events
+        dataset_dir = os.path.join(tmpdir, 'dataset')
+        write_area_year(make_flat_file_rows().head(4), 2023, "0040140", dataset_dir)
+        read_dataset(dataset_dir, filters={'Year': 2023})
+        with stage('fetch_page'):
+            data_read(len(b"<html></html>"))
+        dataset_read, fetch_page = recorded_events()[-2:]
+        assert (dataset_read['stage'], fetch_page['stage']) == ('dataset_read', 'fetch_page')
+        assert dataset_read['bytes_read'] == os.path.getsize(year_file(2023, dataset_dir))
+        assert fetch_page['bytes_read'] == 13
+    
+    captured = io.StringIO()
+    with contextlib.redirect_stdout(captured):
+        with quiet_output(True):
+            print("📊 progress chatter")
+        print("kept")
+    assert captured.getvalue() == "kept\n"
+
+    # Child processes share the run id, and scripts run directly honour OES_QUIET
+    import subprocess
+    utils_dir = os.path.join(os.path.dirname(__file__), '..', 'utils')
+    child = subprocess.run([sys.executable, '-c', 'import oes_metrics; print(oes_metrics.RUN_ID)'],
+                           cwd=utils_dir, capture_output=True, text=True, check=True)
+    assert child.stdout.strip() == oes_metrics.RUN_ID == os.environ[oes_metrics.RUN_ID_ENV]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        script = subprocess.run([sys.executable, os.path.join(utils_dir, 'oes_dataset.py'), '--dataset', tmpdir],
+                                env=dict(os.environ, OES_QUIET='1'), capture_output=True, text=True, check=True)
+    assert script.stdout == ""
+
+def test_stage_profiling(monkeypatch):
+    """Test that stages named in OES_PROFILE write CPU and allocation profiles without code changes"""
+    print("🧪 Testing stage profiling hooks...")
+    
+    import pstats
+    import tracemalloc
+    from oes_metrics import instrument, recorded_events
+    from oes_profiling import hotspot_summary, load_profiles
+    
+    @instrument('inner')
+    def inner(n):
+        return [str(i) * 4 for i in range(n)]
+    
+    @instrument('outer')
+    def outer(n):
+        return len(inner(n))
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv('OES_PROFILE_DIR', tmpdir)
+        
+        outer(1000)
+        assert load_profiles(tmpdir) == []
+        
+        monkeypatch.setenv('OES_PROFILE', 'outer, inner')
+        outer(50000)
+        inner(1000)
+        
+        profiles = load_profiles(tmpdir)
+        # The nested inner call is part of the outer profile, not a second one
+        assert [profile['stage'] for profile in profiles] == ['outer', 'inner']
+        assert not tracemalloc.is_tracing()
+        
+        outer_profile = profiles[0]
+        assert outer_profile['peak_memory_bytes'] > 1_000_000
+        assert any('<listcomp>' in hotspot['function'] for hotspot in outer_profile['hotspots'])
+        stats = pstats.Stats(outer_profile['profile'])
+        assert any(function == 'inner' for _, _, function in stats.stats)
+        with open(outer_profile['report']) as f:
+            assert f.read().startswith('Stage outer:')
+        
+        events = [event for event in recorded_events() if event['stage'] == 'outer']
+        assert 'profile' not in events[-2] and events[-1]['profile'] == outer_profile['report']
+        
+        stages, functions = hotspot_summary(profiles, 5)
+        assert set(stages['stage']) == {'outer', 'inner'} and len(functions) == 5
+        
+        # Stages overlapping in thread pool workers: one profiler per process, the others are skipped
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        both_started = threading.Barrier(2)
+        
+        @instrument('worker')
+        def worker(n):
+            both_started.wait(timeout=10)
+            return len(inner(n))
+        
+        monkeypatch.setenv('OES_PROFILE', 'worker')
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            assert list(executor.map(worker, [1000, 2000])) == [1000, 2000]
+        assert [profile['stage'] for profile in load_profiles(tmpdir)].count('worker') == 1
+        assert not tracemalloc.is_tracing()
+        worker_events = [event for event in recorded_events() if event['stage'] == 'worker']
+        assert sum('profile' in event for event in worker_events[-2:]) == 1
@@ -5,10 +5,33 @@ Test script for Riverside BLS OES scrapers
 
 import sys
 import os
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 
 # Add the scrapers directory to the path (go up one level from test/ to find scrapers/)
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scrapers'))
 
+# Saved 2019 page, served by a local stand-in for www.bls.gov
+DATA_2019_DIR = os.path.join(os.path.dirname(__file__), '..', 'oes_data_2019')
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler that keeps test output clean"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_local_server(directory):
+    """Serve a directory over HTTP on a free local port"""
+    handler = partial(QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
 def test_2024_scraper():
     """Test the 2024 Riverside scraper"""
     print("🧪 Testing 2024 Riverside scraper...")
@@ -46,6 +69,323 @@ def test_2019_scraper():
         print(f"❌ Error testing 2019 scraper: {e}")
         return False
 
+def test_2019_http_fetch():
+    """Test the browser-free 2019 fetch mode against a local stand-in"""
+    print("🧪 Testing 2019 HTTP fetch mode...")
+    
+    from selenium_oes_scraper_2019 import SeleniumBLSOESScraper2019
+    
+    server = start_local_server(DATA_2019_DIR)
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/bls_oes_2019_page_source.html"
+        with tempfile.TemporaryDirectory() as data_dir:
+            scraper = SeleniumBLSOESScraper2019(url=url, data_dir=data_dir)
+            
+            start = time.perf_counter()
+            data = scraper.get_oes_data()
+            elapsed = time.perf_counter() - start
+            
+            assert scraper.driver is None
+            assert data is not None
+            assert data.shape == (655, 11)
+            assert 'Location quotient' in data.columns
+            assert os.path.exists(os.path.join(data_dir, "riverside_oes_2019_selenium_data.csv"))
+            print(f"⏱️  Fetched and parsed in {elapsed:.2f}s")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+class FakeAreaScraper:
+    """Stand-in for SeleniumBLSOESScraper that never starts Chrome"""
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.driver = None
+
+    def setup_driver(self):
+        self.driver = object()
+        return True
+
+    def close_driver(self):
+        self.driver = None
+
+    def scrape_area(self, area_code, output_file):
+        import pandas as pd
+        if area_code == "bad":
+            return None
+        data = pd.DataFrame({'Occupation (SOC code)': ['All Occupations (00-0000)'], 'Area': [area_code]})
+        data.to_csv(os.path.join(self.data_dir, output_file), index=False)
+        return data
+
+def test_batch_scraper_pool():
+    """Test that the batch scraper spreads areas over reusable workers"""
+    print("🧪 Testing batch multi-MSA scraper...")
+    
+    from batch_oes_scraper import BatchOESScraper
+    
+    area_codes = [f"00{code}" for code in range(40140, 40150)] + ["bad"]
+    with tempfile.TemporaryDirectory() as data_dir:
+        batch = BatchOESScraper(area_codes, max_workers=3, data_dir=data_dir,
+                                max_pages_per_driver=1, scraper_factory=FakeAreaScraper)
+        summary = batch.run()
+        
+        assert len(summary) == len(area_codes)
+        assert (summary['Status'] == 'ok').sum() == 10
+        assert os.path.exists(os.path.join(data_dir, "0040140", "oes_selenium_data.csv"))
+        
+        stats = batch.get_worker_stats()
+        assert len(stats) == 3
+        assert stats['Areas'].sum() == len(area_codes)
+        # One page per driver means every area gets a fresh (recycled) browser
+        assert stats['Driver_Starts'].sum() == len(area_codes)
+
+class FakeLoadingDriver:
+    """Stand-in webdriver whose table grows for a few polls and then settles"""
+
+    def __init__(self, row_counts):
+        self.row_counts = list(row_counts)
+
+    def execute_script(self, script, *args):
+        count = self.row_counts.pop(0) if len(self.row_counts) > 1 else self.row_counts[0]
+        return ["complete", count]
+
+def test_page_readiness():
+    """Test that readiness waits for a stable row count within one deadline"""
+    print("🧪 Testing page readiness detection...")
+    
+    from page_readiness import PageReadiness
+    
+    readiness = PageReadiness(stable_for=0.05, poll_interval=0.01)
+    
+    # Rows stream in, then stop changing
+    assert readiness.wait_until_ready(FakeLoadingDriver([0, 120, 480, 655]), timeout=2, label="growing")
+    assert readiness.timings[-1]['Rows'] == 655
+    
+    # A table that never appears gives up at the single overall deadline
+    start = time.perf_counter()
+    assert not readiness.wait_until_ready(FakeLoadingDriver([0]), timeout=0.3, label="empty")
+    assert time.perf_counter() - start < 1.0
+    
+    assert len(readiness.timings) == 2
+    assert readiness.median_seconds() is not None
+
+def test_js_payload_matches_read_html():
+    """Test that the one-call JSON payload builds the same frame as pd.read_html"""
+    print("🧪 Testing bulk JSON table extraction...")
+    
+    import pandas as pd
+    from lxml import html as lxml_html
+    from js_table_extractor import payload_to_dataframe
+    
+    page_file = os.path.join(DATA_2019_DIR, "bls_oes_2019_page_source.html")
+    expected = pd.read_html(page_file)[0]
+    
+    # Build the payload TABLE_TO_JSON_JS would return for the saved page
+    table = lxml_html.parse(page_file).xpath('//table')[0]
+    payload = {
+        'index': 0,
+        'header': [cell.text_content() for cell in table.xpath('./thead/tr[th][last()]/th')],
+        'rows': [[cell.text_content() for cell in row.xpath('./td')] for row in table.xpath('./tbody/tr')],
+    }
+    
+    pd.testing.assert_frame_equal(payload_to_dataframe(payload), expected)
+
+class FakeCDPDriver:
+    """Stand-in webdriver replaying a recorded performance log and response bodies"""
+
+    def __init__(self, log_entries, bodies):
+        self.log_entries = log_entries
+        self.bodies = bodies
+
+    def get_log(self, log_type):
+        assert log_type == 'performance'
+        return self.log_entries
+
+    def execute_cdp_cmd(self, command, params):
+        assert command == 'Network.getResponseBody'
+        return self.bodies[params['requestId']]
+
+def recorded_response(request_id, url, mime_type):
+    """One Network.responseReceived entry as Chrome logs it"""
+    import json
+    message = {'message': {'method': 'Network.responseReceived',
+                           'params': {'requestId': request_id,
+                                      'response': {'url': url, 'mimeType': mime_type}}}}
+    return {'level': 'INFO', 'message': json.dumps(message)}
+
+def test_network_capture_replay():
+    """Test that recorded OES query payloads become a typed DataFrame"""
+    print("🧪 Testing network payload capture...")
+    
+    import base64
+    import json
+    from oes_network_capture import capture_json_payloads, payloads_to_dataframe
+    
+    records = [
+        {'occupation': 'All Occupations', 'soc': '00-0000', 'employment': '1,695,430', 'annualMean': '$64,270', 'lq': '1.00'},
+        {'occupation': 'Chief Executives', 'soc': '11-1011', 'employment': '2,070', 'annualMean': '$235,520', 'lq': '0.89'},
+        {'occupation': 'Legislators', 'soc': '11-1031', 'employment': '220', 'annualMean': None, 'lq': '0.75'},
+    ]
+    log_entries = [
+        recorded_response('1', 'https://data.bls.gov/oes/app.css', 'text/css'),
+        recorded_response('2', 'https://data.bls.gov/oes/api/area/0040140', 'application/json'),
+        {'level': 'INFO', 'message': 'not json'},
+    ]
+    bodies = {'2': {'body': base64.b64encode(json.dumps({'data': {'rows': records}}).encode()).decode(),
+                    'base64Encoded': True}}
+    
+    payloads = capture_json_payloads(FakeCDPDriver(log_entries, bodies))
+    assert [captured['url'] for captured in payloads] == ['https://data.bls.gov/oes/api/area/0040140']
+    
+    df = payloads_to_dataframe(payloads)
+    assert len(df) == 3
+    assert df['employment'].tolist() == [1695430, 2070, 220]
+    assert df['lq'].dtype.kind == 'f'
+    assert df['annualMean'].isna().sum() == 1
+    assert df['soc'].tolist() == ['00-0000', '11-1011', '11-1031']
+
+def test_page_cache():
+    """Test cache hits, revalidation and LRU eviction against a local stand-in"""
+    print("🧪 Testing OES page cache...")
+    
+    from http_oes_fetcher import HTTPOESFetcher
+    from oes_page_cache import OESPageCache
+    
+    server = start_local_server(DATA_2019_DIR)
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/bls_oes_2019_page_source.html"
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = OESPageCache(cache_dir)
+            with HTTPOESFetcher(cache=cache) as fetcher:
+                first = fetcher.fetch(url)
+                second = fetcher.fetch(url)
+            assert first == second
+            assert cache.stats()['hits'] == 1
+            assert cache.stats()['misses'] == 1
+            
+            # Bodies are stored compressed, once per distinct content
+            assert 0 < cache.stats()['bytes'] < len(first)
+            
+            # A reopened cache serves from disk; an expired entry is revalidated (304)
+            reopened = OESPageCache(cache_dir, default_ttl=0)
+            reopened.put(url, first, {'Last-Modified': 'Wed, 01 Jan 2031 00:00:00 GMT'})
+            with HTTPOESFetcher(cache=reopened) as fetcher:
+                assert fetcher.fetch(url) == first
+            assert reopened.stats()['revalidated'] == 1
+            
+            # Size-bounded LRU eviction keeps the most recently used page
+            small = OESPageCache(os.path.join(cache_dir, "small"), max_bytes=100)
+            small.put("http://example/a", b"a" * 500)
+            small.put("http://example/b", os.urandom(500))
+            assert small.lookup("http://example/a") is None
+            assert small.lookup("http://example/b") is not None
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_async_panel_fetch():
+    """Test the async (year, area) grid fetch against a local stand-in"""
+    print("🧪 Testing async multi-year fetcher...")
+    
+    import shutil
+    from async_oes_fetcher import AsyncOESFetcher, build_oes_url
+    
+    assert build_oes_url(2019, "0040140") == "https://www.bls.gov/oes/2019/may/oes_40140.htm"
+    
+    with tempfile.TemporaryDirectory() as site_dir:
+        # Lay the saved page out like www.bls.gov/oes/{year}/may/
+        for year in (2017, 2018, 2019):
+            year_dir = os.path.join(site_dir, "oes", str(year), "may")
+            os.makedirs(year_dir)
+            shutil.copy(os.path.join(DATA_2019_DIR, "bls_oes_2019_page_source.html"),
+                        os.path.join(year_dir, "oes_40140.htm"))
+        
+        server = start_local_server(site_dir)
+        try:
+            fetcher = AsyncOESFetcher(concurrency=4, per_host_rate=50,
+                                      base_url=f"http://127.0.0.1:{server.server_port}")
+            panel = fetcher.build_panel([2017, 2018, 2019], ["0040140", "0099999"])
+        finally:
+            server.shutdown()
+            server.server_close()
+    
+    assert sorted(panel['Year'].unique()) == [2017, 2018, 2019]
+    assert len(panel) == 3 * 655
+    # The missing area fails on its own without stopping the other pages
+    assert len(fetcher.errors) == 3
+    assert {error['Area_Code'] for error in fetcher.errors} == {"0099999"}
+
+class FakeChrome:
+    """Stand-in Chrome that records tabs, page loads and CDP commands"""
+
+    instances = 0
+
+    def __init__(self, options=None):
+        FakeChrome.instances += 1
+        self.options = options
+        self.handles = ["tab-0"]
+        self.current_window_handle = "tab-0"
+        self.cdp_commands = []
+        self.loads = []
+        self.switch_to = self
+
+    def new_window(self, kind):
+        self.current_window_handle = f"tab-{len(self.handles)}"
+        self.handles.append(self.current_window_handle)
+
+    def window(self, handle):
+        self.current_window_handle = handle
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append((self.current_window_handle, command, params))
+
+    def get(self, url):
+        self.loads.append((self.current_window_handle, url))
+
+    def quit(self):
+        pass
+
+def test_browser_session_reuse(monkeypatch):
+    """Test that one Chrome is reused across pages with resources blocked in every tab"""
+    print("🧪 Testing persistent browser session...")
+    
+    import browser_session
+    from selenium import webdriver
+    
+    # BrowserSession imports webdriver when it starts Chrome
+    monkeypatch.setattr(webdriver, "Chrome", FakeChrome)
+    FakeChrome.instances = 0
+    
+    with browser_session.BrowserSession(block_resources=('image', 'font'), max_tabs=2) as session:
+        for area in range(5):
+            session.load(f"https://data.bls.gov/oes/#/area/{area}")
+        driver = session.driver
+    
+    assert FakeChrome.instances == 1
+    assert [handle for handle, _ in driver.loads] == ["tab-0", "tab-1", "tab-0", "tab-1", "tab-0"]
+    
+    blocked = [(handle, params['urls']) for handle, command, params in driver.cdp_commands
+               if command == 'Network.setBlockedURLs']
+    assert [handle for handle, _ in blocked] == ["tab-0", "tab-1"]
+    assert '*.png' in blocked[0][1] and '*.woff2' in blocked[0][1] and '*.css' not in blocked[0][1]
+    
+    prefs = driver.options.experimental_options["prefs"]
+    assert prefs["profile.managed_default_content_settings.images"] == 2
+
+def test_scrapers_import_without_selenium():
+    """Test that importing the scrapers defers selenium until a browser is started"""
+    print("🧪 Testing lazy selenium imports...")
+    
+    import subprocess
+    
+    code = ("import sys; import selenium_oes_scraper, selenium_oes_scraper_2019, batch_oes_scraper; "
+            "print(sorted(m for m in sys.modules if m.split('.')[0] == 'selenium'))")
+    scrapers_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scrapers')
+    result = subprocess.run([sys.executable, '-c', code], cwd=scrapers_dir, capture_output=True, text=True,
+                            timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == '[]'
+
 def main():
     """Run tests for both scrapers"""
     print("🚀 Testing Riverside BLS OES Scrapers")
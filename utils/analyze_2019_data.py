@@ -4,9 +4,14 @@ Analyze 2019 BLS OES Data
 Analyze the already extracted 2019 data from CSV
 """
 
+import numpy as np
 import pandas as pd
 import os
+from oes_dataset import store_area_year
+from oes_metrics import file_read, file_written, instrument, quiet_output
+from lq_report import CATEGORY_EDGES, CATEGORY_LABELS_2019, distribution, lq_report, summary_stats, top_bottom
 
+@instrument('analyze_2019', expect_result=True)
 def analyze_2019_data():
     """Analyze the 2019 OES data"""
     print("📊 ANALYZING 2019 BLS OES DATA")
@@ -21,10 +26,14 @@ def analyze_2019_data():
     
     try:
         df = pd.read_csv(data_file)
+        file_read(data_file)
         print(f"✅ Successfully loaded 2019 data")
         print(f"📊 Data shape: {df.shape}")
         print(f"📋 Columns: {list(df.columns)}")
         
+        # Columnar copy for queries across years and areas (the schema does its own cleaning)
+        store_area_year(df, 2019, "0040140")
+        
         # Clean the data
         df = clean_2019_data(df)
         
@@ -44,6 +53,7 @@ def analyze_2019_data():
         print(f"❌ Error analyzing 2019 data: {e}")
         return None
 
+@instrument('clean')
 def clean_2019_data(df):
     """Clean the 2019 data"""
     print("🧹 Cleaning 2019 data...")
@@ -98,6 +108,7 @@ def clean_2019_data(df):
         print(f"❌ Error cleaning data: {e}")
         return None
 
+@instrument('analyze')
 def analyze_oes_data_2019(df):
     """Analyze the 2019 OES data"""
     print("\n📊 ANALYZING LOS ANGELES 2019 OES DATA")
@@ -125,48 +136,43 @@ def analyze_oes_data_2019(df):
     
     # Basic statistics
     try:
-        lq_stats = df[lq_col].describe()
+        lq_stats = summary_stats(df[lq_col])
         print(f"\n📈 Location Quotient Statistics:")
         print(f"   Count: {lq_stats['count']:.0f}")
         print(f"   Mean: {lq_stats['mean']:.3f}")
-        print(f"   Median: {lq_stats['50%']:.3f}")
+        print(f"   Median: {lq_stats['median']:.3f}")
         print(f"   Min: {lq_stats['min']:.3f}")
         print(f"   Max: {lq_stats['max']:.3f}")
         print(f"   Std: {lq_stats['std']:.3f}")
         
+        occupations = df.iloc[:, 1].astype(str).to_numpy()  # Second column should be occupation title
+        lq_values = df[lq_col].to_numpy(dtype='float64', na_value=np.nan)
+        top_lq, bottom_lq = top_bottom(lq_values, 10)
+        
         # Find highest LQ occupations
         print(f"\n🏆 TOP 10 HIGHEST LOCATION QUOTIENTS (2019):")
         print("-" * 60)
         
-        top_lq = df.nlargest(10, lq_col)
-        for i, (_, row) in enumerate(top_lq.iterrows(), 1):
-            occupation = str(row.iloc[1])[:50]  # Second column should be occupation title
-            lq_value = row[lq_col]
-            print(f"{i:2d}. {occupation:<50} LQ: {lq_value:.3f}")
+        for i, pos in enumerate(top_lq, 1):
+            print(f"{i:2d}. {occupations[pos][:50]:<50} LQ: {lq_values[pos]:.3f}")
         
         # Find lowest LQ occupations
         print(f"\n📉 TOP 10 LOWEST LOCATION QUOTIENTS (2019):")
         print("-" * 60)
         
-        bottom_lq = df.nsmallest(10, lq_col)
-        for i, (_, row) in enumerate(bottom_lq.iterrows(), 1):
-            occupation = str(row.iloc[1])[:50]  # Second column should be occupation title
-            lq_value = row[lq_col]
-            print(f"{i:2d}. {occupation:<50} LQ: {lq_value:.3f}")
+        for i, pos in enumerate(bottom_lq, 1):
+            print(f"{i:2d}. {occupations[pos][:50]:<50} LQ: {lq_values[pos]:.3f}")
         
         # Analyze by LQ categories
         print(f"\n📊 LOCATION QUOTIENT DISTRIBUTION (2019):")
         print("-" * 40)
         
-        high_concentration = df[df[lq_col] > 2.0]
-        moderate_concentration = df[(df[lq_col] > 1.0) & (df[lq_col] <= 2.0)]
-        average_concentration = df[(df[lq_col] > 0.5) & (df[lq_col] <= 1.0)]
-        low_concentration = df[df[lq_col] <= 0.5]
+        low_concentration, average_concentration, moderate_concentration, high_concentration = distribution(lq_values)
         
-        print(f"   High concentration (LQ > 2.0): {len(high_concentration)} occupations")
-        print(f"   Moderate concentration (1.0 < LQ ≤ 2.0): {len(moderate_concentration)} occupations")
-        print(f"   Average concentration (0.5 < LQ ≤ 1.0): {len(average_concentration)} occupations")
-        print(f"   Low concentration (LQ ≤ 0.5): {len(low_concentration)} occupations")
+        print(f"   High concentration (LQ > 2.0): {high_concentration} occupations")
+        print(f"   Moderate concentration (1.0 < LQ ≤ 2.0): {moderate_concentration} occupations")
+        print(f"   Average concentration (0.5 < LQ ≤ 1.0): {average_concentration} occupations")
+        print(f"   Low concentration (LQ ≤ 0.5): {low_concentration} occupations")
         
         # Save analysis results
         analysis_file = "oes_data_2019/riverside_oes_2019_analysis_results.csv"
@@ -175,17 +181,19 @@ def analyze_oes_data_2019(df):
         analysis_summary = pd.DataFrame({
             'Metric': ['Total Occupations', 'High Concentration (LQ>2)', 'Moderate Concentration (1<LQ≤2)', 
                       'Average Concentration (0.5<LQ≤1)', 'Low Concentration (LQ≤0.5)', 'Mean LQ', 'Median LQ'],
-            'Value': [len(df), len(high_concentration), len(moderate_concentration), 
-                     len(average_concentration), len(low_concentration), 
-                     lq_stats['mean'], lq_stats['50%']]
+            'Value': [len(df), high_concentration, moderate_concentration, 
+                     average_concentration, low_concentration, 
+                     lq_stats['mean'], lq_stats['median']]
         })
         
         analysis_summary.to_csv(analysis_file, index=False)
+        file_written(analysis_file)
         print(f"\n💾 Analysis results saved to {analysis_file}")
         
     except Exception as e:
         print(f"❌ Error analyzing data: {e}")
 
+@instrument('report')
 def create_location_quotient_report_2019(df):
     """Create a comprehensive location quotient report for 2019"""
     print("\n📋 CREATING 2019 LOCATION QUOTIENT REPORT")
@@ -214,47 +222,22 @@ def create_location_quotient_report_2019(df):
         return
     
     try:
-        # Create ranked report
-        report_data = []
-        
-        for _, row in df.iterrows():
-            occupation = str(row[occupation_col])
-            lq_value = row[lq_col]
-            
-            # Categorize by LQ
-            if lq_value > 2.0:
-                category = "Very High Concentration"
-            elif lq_value > 1.5:
-                category = "High Concentration"
-            elif lq_value > 1.0:
-                category = "Above Average"
-            elif lq_value > 0.5:
-                category = "Average"
-            else:
-                category = "Low Concentration"
-            
-            report_data.append({
-                'Occupation': occupation,
-                'Location_Quotient': lq_value,
-                'Category': category
-            })
-        
-        # Create DataFrame and sort by LQ
-        report_df = pd.DataFrame(report_data)
-        report_df = report_df.sort_values('Location_Quotient', ascending=False)
-        report_df.insert(0, 'Rank', range(1, len(report_df) + 1))
+        # Ranks, categories and order in one columnar pass
+        report_df = lq_report(df, occupation_col, lq_col, labels=CATEGORY_LABELS_2019)
         
         # Save report
         report_file = "oes_data_2019/riverside_location_quotient_2019_report.csv"
         report_df.to_csv(report_file, index=False)
+        file_written(report_file)
         print(f"💾 Location quotient report saved to {report_file}")
         
         # Print summary
         print(f"\n📊 REPORT SUMMARY:")
         print(f"   Total occupations analyzed: {len(report_df)}")
-        print(f"   Very High Concentration (LQ > 2.0): {len(report_df[report_df['Location_Quotient'] > 2.0])}")
-        print(f"   High Concentration (LQ > 1.5): {len(report_df[report_df['Location_Quotient'] > 1.5])}")
-        print(f"   Above Average (LQ > 1.0): {len(report_df[report_df['Location_Quotient'] > 1.0])}")
+        category_counts = distribution(report_df['Location_Quotient'], CATEGORY_EDGES)
+        print(f"   Very High Concentration (LQ > 2.0): {category_counts[4]}")
+        print(f"   High Concentration (LQ > 1.5): {category_counts[3:].sum()}")
+        print(f"   Above Average (LQ > 1.0): {category_counts[2:].sum()}")
         
     except Exception as e:
         print(f"❌ Error creating report: {e}")
@@ -280,4 +263,5 @@ def main():
         print(f"❌ Error in main analysis: {e}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    with quiet_output():
+        main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Batch Page Source Processing
+Parse and clean many saved OES page sources across a process pool and merge them into the Parquet dataset
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from oes_dataset import DATASET_DIR, write_panel
+from oes_metrics import file_written, instrument, quiet_output
+from oes_schema import to_canonical
+from oes_table_parser import read_target_table
+
+PAGE_PATTERNS = ('*.html', '*.htm')
+DEFAULT_YEAR = 2024
+
+# oes_40140.htm (static pages) and oes_data/areas/0040140/ (batch scraper output)
+STATIC_PAGE_PATTERN = re.compile(r'^oes_(\w+)\.html?$', re.IGNORECASE)
+AREA_DIR_PATTERN = re.compile(r'^\d{7}$')
+YEAR_PATTERN = re.compile(r'^(?:Year=|.*_)?((?:19|20)\d{2})$')
+
+def find_page_sources(paths):
+    """Directories (searched recursively), globs and files -> sorted unique page source paths"""
+    found = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for pattern in PAGE_PATTERNS:
+                found.update(glob.glob(os.path.join(path, '**', pattern), recursive=True))
+        else:
+            found.update(match for match in glob.glob(path, recursive=True) if os.path.isfile(match))
+    return sorted(found)
+
+def page_key(path, year=None, area_code=None):
+    """(year, area_code) of a page from its path, falling back to the given defaults
+
+    The area comes from a static page name (oes_40140.htm -> 0040140) or a 7-digit
+    area directory; the year from a directory such as 2019/, Year=2019/ or oes_data_2019/.
+    """
+    parts = os.path.normpath(os.path.abspath(path)).split(os.sep)
+    found_year, found_area = None, None
+
+    static = STATIC_PAGE_PATTERN.match(parts[-1])
+    if static:
+        page_id = static.group(1)
+        found_area = page_id.zfill(7) if page_id.isdigit() else page_id
+    for part in reversed(parts[:-1]):
+        if found_area is None and AREA_DIR_PATTERN.match(part):
+            found_area = part
+        year_match = YEAR_PATTERN.match(part)
+        if found_year is None and year_match:
+            found_year = int(year_match.group(1))
+
+    return found_year or year, found_area or area_code
+
+def process_page(task):
+    """Process pool worker: one page source -> (path, canonical frame or None, error or None)"""
+    path, year, area_code = task
+    try:
+        if year is None or area_code is None:
+            raise ValueError("year or area code unknown (pass --year/--area)")
+        table = read_target_table(path, 'Location Quotient')
+        if table is None:
+            raise ValueError("no location quotient table found")
+        df = to_canonical(table, year=year, area_code=area_code)
+        if df.empty:
+            raise ValueError("location quotient table has no data rows")
+        return path, df, None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+@instrument('batch_process')
+def process_pages(paths, year=None, area_code=None, workers=None, progress_every=100):
+    """Parse every page in a process pool; returns the merged frame and one status row per page
+
+    A page that fails is recorded with its error and does not stop the others. When
+    several pages map to the same year and area, the last one in path order wins.
+    """
+    tasks = [(path, *page_key(path, year, area_code)) for path in paths]
+    workers = workers or os.cpu_count() or 1
+
+    results = {}
+    errors = 0
+    start = time.perf_counter()
+
+    def report(done):
+        elapsed = time.perf_counter() - start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        print(f"📊 {done}/{len(tasks)} pages ({done / len(tasks):.0%}), {errors} errors, {rate:.1f} pages/s")
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            futures = [executor.submit(process_page, task) for task in tasks]
+            for done, future in enumerate(as_completed(futures), 1):
+                path, df, error = future.result()
+                results[path] = (df, error)
+                errors += error is not None
+                if done % progress_every == 0 or done == len(tasks):
+                    report(done)
+    else:
+        for done, task in enumerate(tasks, 1):
+            path, df, error = process_page(task)
+            results[path] = (df, error)
+            errors += error is not None
+            if done % progress_every == 0 or done == len(tasks):
+                report(done)
+
+    status_rows = []
+    latest = {}
+    for path, page_year, page_area in tasks:
+        df, error = results[path]
+        status_rows.append({'Path': path, 'Year': page_year, 'Area_Code': page_area,
+                            'Rows': 0 if df is None else len(df), 'Error': error})
+        if df is not None:
+            latest[(page_year, page_area)] = df
+
+    frames = [latest[key] for key in sorted(latest, key=lambda key: (key[0], str(key[1])))]
+    merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return merged, pd.DataFrame(status_rows)
+
+def main():
+    """Main function to process an archive of saved page sources"""
+    parser = argparse.ArgumentParser(description="Process many saved OES page sources in parallel")
+    parser.add_argument("paths", nargs="+", help="Page source files, directories or globs")
+    parser.add_argument("--year", type=int, default=DEFAULT_YEAR,
+                        help="Year of pages whose path has no year directory")
+    parser.add_argument("--area", help="Area code of pages whose path does not name one")
+    parser.add_argument("--workers", type=int, help="Worker processes (CPU count by default)")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Parquet dataset directory")
+    parser.add_argument("--output", help="Also write the merged canonical data to this CSV")
+    parser.add_argument("--status", default=os.path.join("oes_data", "batch_process_status.csv"),
+                        help="Per-page status CSV")
+    args = parser.parse_args()
+
+    print("🚀 Batch processing saved OES page sources")
+    print("=" * 50)
+
+    paths = find_page_sources(args.paths)
+    if not paths:
+        print("❌ No page sources found")
+        return
+    print(f"📁 Found {len(paths)} page sources")
+
+    start = time.perf_counter()
+    merged, status = process_pages(paths, args.year, args.area, args.workers)
+    failed = status[status['Error'].notna()]
+    print(f"✅ Processed {len(status) - len(failed)} of {len(status)} pages in {time.perf_counter() - start:.2f}s "
+          f"({len(merged)} rows)")
+    for row in failed.head(10).itertuples(index=False):
+        print(f"   ❌ {row.Path}: {row.Error}")
+    if len(failed) > 10:
+        print(f"   ... and {len(failed) - 10} more (see {args.status})")
+
+    os.makedirs(os.path.dirname(args.status) or ".", exist_ok=True)
+    status.to_csv(args.status, index=False)
+    file_written(args.status)
+    print(f"💾 Page status saved to {args.status}")
+
+    if merged.empty:
+        print("❌ No data to store")
+        return
+
+    try:
+        paths = write_panel(merged, args.dataset)
+        print(f"💾 {merged['Area_Code'].nunique()} areas written to dataset ({len(paths)} year files)")
+    except ImportError as e:
+        print(f"⚠️  Skipping Parquet dataset: {e}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        merged.to_csv(args.output, index=False)
+        file_written(args.output)
+        print(f"💾 Merged data saved to {args.output}")
+
+if __name__ == "__main__":
+    with quiet_output():
+        main()
@@ -4,11 +4,33 @@ Compare 2019 and 2024 BLS OES Data
 Analyze changes in Riverside location quotients over time
 """
 
+import numpy as np
 import pandas as pd
 import os
+from oes_schema import to_canonical
+from oes_dataset import read_dataset
+from oes_metrics import file_read, file_written, instrument, quiet_output
+from soc_index import add_soc_keys, join_on_soc
+from lq_report import top_bottom
 
+def load_from_dataset(year, area_code="0040140"):
+    """Load one area-year from the Parquet dataset, if it has been written"""
+    try:
+        df = read_dataset(filters={'Year': year, 'Area_Code': area_code})
+    except ImportError:
+        return None
+    if df is None or df.empty:
+        return None
+    print(f"✅ Loaded {year} data from dataset: {df.shape}")
+    return df
+
+@instrument('load_2019', expect_result=True)
 def load_2019_data():
     """Load 2019 data"""
+    df = load_from_dataset(2019)
+    if df is not None:
+        return df
+    
     data_file = "oes_data_2019/riverside_oes_2019_selenium_data.csv"
     
     if not os.path.exists(data_file):
@@ -17,14 +39,20 @@ def load_2019_data():
     
     try:
         df = pd.read_csv(data_file)
+        file_read(data_file)
         print(f"✅ Loaded 2019 data: {df.shape}")
         return df
     except Exception as e:
         print(f"❌ Error loading 2019 data: {e}")
         return None
 
+@instrument('load_2024', expect_result=True)
 def load_2024_data():
     """Load 2024 data"""
+    df = load_from_dataset(2024)
+    if df is not None:
+        return df
+    
     data_file = "oes_data/riverside_oes_selenium_data.csv"
     
     if not os.path.exists(data_file):
@@ -33,32 +61,26 @@ def load_2024_data():
     
     try:
         df = pd.read_csv(data_file)
+        file_read(data_file)
         print(f"✅ Loaded 2024 data: {df.shape}")
         return df
     except Exception as e:
         print(f"❌ Error loading 2024 data: {e}")
         return None
 
+@instrument('clean')
 def clean_and_prepare_data(df_2019, df_2024):
     """Clean and prepare data for comparison"""
     print("🧹 Preparing data for comparison...")
     
     try:
-        # Clean 2019 data
-        df_2019_clean = df_2019.copy()
-        df_2019_clean['Location quotient'] = pd.to_numeric(df_2019_clean['Location quotient'], errors='coerce')
+        # Map both vintages onto the canonical typed layout
+        df_2019_clean = to_canonical(df_2019, year=2019)
+        df_2024_clean = to_canonical(df_2024, year=2024)
         
-        # Clean 2024 data
-        df_2024_clean = df_2024.copy()
-        df_2024_clean['Location Quotient  ()'] = pd.to_numeric(df_2024_clean['Location Quotient  ()'], errors='coerce')
-        
-        # Create occupation mapping
-        # 2019: 'Occupation title (click on the occupation title to view its profile)'
-        # 2024: 'Occupation (SOC code)'
-        
-        # Extract occupation names and clean them
-        df_2019_clean['Occupation_clean'] = df_2019_clean['Occupation title (click on the occupation title to view its profile)'].str.replace(r'\(click on the occupation title to view its profile\)', '', regex=True).str.strip()
-        df_2024_clean['Occupation_clean'] = df_2024_clean['Occupation (SOC code)'].str.replace(r'\(\d+-\d+\)', '', regex=True).str.strip()
+        # Occupation titles without SOC codes or link hints
+        df_2019_clean['Occupation_clean'] = df_2019_clean['Occupation'].astype(str).str.strip()
+        df_2024_clean['Occupation_clean'] = df_2024_clean['Occupation'].astype(str).str.strip()
         
         print(f"📊 2019 occupations: {len(df_2019_clean)}")
         print(f"📊 2024 occupations: {len(df_2024_clean)}")
@@ -69,42 +91,45 @@ def clean_and_prepare_data(df_2019, df_2024):
         print(f"❌ Error preparing data: {e}")
         return None, None
 
+@instrument('match_occupations', expect_result=True)
 def find_matching_occupations(df_2019, df_2024):
     """Find matching occupations between 2019 and 2024"""
     print("🔍 Finding matching occupations...")
     
     try:
-        # Create sets of occupation names
-        occupations_2019 = set(df_2019['Occupation_clean'].str.lower())
-        occupations_2024 = set(df_2024['Occupation_clean'].str.lower())
-        
-        # Find common occupations
-        common_occupations = occupations_2019.intersection(occupations_2024)
-        
-        print(f"📊 Common occupations found: {len(common_occupations)}")
+        columns = ['SOC_Code', 'Occupation_clean', 'Location_Quotient']
+        
+        # Hash join on integer SOC keys
+        by_code = join_on_soc(df_2019[columns], df_2024[columns], suffixes=('_2019', '_2024'))
+        print(f"📊 Matched by SOC code: {len(by_code)}")
+        
+        # Codes renumbered between SOC revisions still match on title
+        left = add_soc_keys(df_2019[columns])
+        right = add_soc_keys(df_2024[columns])
+        left = left[~left['SOC_Key'].isin(by_code['SOC_Key'])]
+        right = right[~right['SOC_Key'].isin(by_code['SOC_Key'])]
+        left = left.assign(Title_Key=left['Occupation_clean'].str.lower()).drop_duplicates('Title_Key')
+        right = right.assign(Title_Key=right['Occupation_clean'].str.lower()).drop_duplicates('Title_Key')
+        by_title = left.merge(right, on='Title_Key', how='inner', suffixes=('_2019', '_2024'))
+        print(f"📊 Matched by title after a code change: {len(by_title)}")
+        
+        matched = pd.concat([by_code, by_title], ignore_index=True)
+        
+        # float32 in the canonical frame; published to two decimals
+        lq_2019 = matched['Location_Quotient_2019'].astype('float64').round(4)
+        lq_2024 = matched['Location_Quotient_2024'].astype('float64').round(4)
+        both = lq_2019.notna() & lq_2024.notna()
+        
+        merged_df = pd.DataFrame({
+            'Occupation': matched['Occupation_clean_2024'].str.lower().str.title(),
+            'SOC_Code': matched['SOC_Code_2024'].astype(str),
+            'LQ_2019': lq_2019,
+            'LQ_2024': lq_2024,
+        })[both].reset_index(drop=True)
+        merged_df['Change'] = merged_df['LQ_2024'] - merged_df['LQ_2019']
+        merged_df['Percent_Change'] = np.where(merged_df['LQ_2019'] > 0,
+                                               merged_df['Change'] / merged_df['LQ_2019'] * 100, 0.0)
         
-        # Create merged dataset
-        merged_data = []
-        
-        for occupation in common_occupations:
-            # Find in 2019 data
-            row_2019 = df_2019[df_2019['Occupation_clean'].str.lower() == occupation]
-            row_2024 = df_2024[df_2024['Occupation_clean'].str.lower() == occupation]
-            
-            if not row_2019.empty and not row_2024.empty:
-                lq_2019 = row_2019['Location quotient'].iloc[0]
-                lq_2024 = row_2024['Location Quotient  ()'].iloc[0]
-                
-                if pd.notna(lq_2019) and pd.notna(lq_2024):
-                    merged_data.append({
-                        'Occupation': occupation.title(),
-                        'LQ_2019': lq_2019,
-                        'LQ_2024': lq_2024,
-                        'Change': lq_2024 - lq_2019,
-                        'Percent_Change': ((lq_2024 - lq_2019) / lq_2019) * 100 if lq_2019 > 0 else 0
-                    })
-        
-        merged_df = pd.DataFrame(merged_data)
         print(f"📊 Merged dataset: {len(merged_df)} occupations")
         
         return merged_df
@@ -113,6 +138,7 @@ def find_matching_occupations(df_2019, df_2024):
         print(f"❌ Error finding matching occupations: {e}")
         return None
 
+@instrument('analyze')
 def analyze_changes(merged_df):
     """Analyze changes between 2019 and 2024"""
     print("\n📊 ANALYZING CHANGES (2019-2024)")
@@ -130,15 +156,24 @@ def analyze_changes(merged_df):
         print(f"📈 Mean change: {merged_df['Change'].mean():.3f}")
         print(f"📈 Mean percent change: {merged_df['Percent_Change'].mean():.1f}%")
         
+        occupations = merged_df['Occupation'].astype(str).to_numpy()
+        lq_2019 = merged_df['LQ_2019'].to_numpy(dtype='float64')
+        lq_2024 = merged_df['LQ_2024'].to_numpy(dtype='float64')
+        change = merged_df['Change'].to_numpy(dtype='float64')
+        percent_change = merged_df['Percent_Change'].to_numpy(dtype='float64')
+        
+        # Partial sorts instead of full nlargest/nsmallest sorts
+        biggest_increases, biggest_decreases = top_bottom(change, 10)
+        biggest_percent_changes, _ = top_bottom(percent_change, 10)
+        
         # Biggest increases
         print(f"\n🚀 TOP 10 BIGGEST INCREASES (2019-2024):")
         print("-" * 70)
         print(f"{'Rank':<4} {'Occupation':<40} {'2019':<8} {'2024':<8} {'Change':<8} {'% Change':<10}")
         print("-" * 70)
         
-        biggest_increases = merged_df.nlargest(10, 'Change')
-        for i, (_, row) in enumerate(biggest_increases.iterrows(), 1):
-            print(f"{i:<4} {row['Occupation'][:39]:<40} {row['LQ_2019']:<8.3f} {row['LQ_2024']:<8.3f} {row['Change']:<8.3f} {row['Percent_Change']:<9.1f}%")
+        for i, pos in enumerate(biggest_increases, 1):
+            print(f"{i:<4} {occupations[pos][:39]:<40} {lq_2019[pos]:<8.3f} {lq_2024[pos]:<8.3f} {change[pos]:<8.3f} {percent_change[pos]:<9.1f}%")
         
         # Biggest decreases
         print(f"\n📉 TOP 10 BIGGEST DECREASES (2019-2024):")
@@ -146,9 +181,8 @@ def analyze_changes(merged_df):
         print(f"{'Rank':<4} {'Occupation':<40} {'2019':<8} {'2024':<8} {'Change':<8} {'% Change':<10}")
         print("-" * 70)
         
-        biggest_decreases = merged_df.nsmallest(10, 'Change')
-        for i, (_, row) in enumerate(biggest_decreases.iterrows(), 1):
-            print(f"{i:<4} {row['Occupation'][:39]:<40} {row['LQ_2019']:<8.3f} {row['LQ_2024']:<8.3f} {row['Change']:<8.3f} {row['Percent_Change']:<9.1f}%")
+        for i, pos in enumerate(biggest_decreases, 1):
+            print(f"{i:<4} {occupations[pos][:39]:<40} {lq_2019[pos]:<8.3f} {lq_2024[pos]:<8.3f} {change[pos]:<8.3f} {percent_change[pos]:<9.1f}%")
         
         # Biggest percentage changes
         print(f"\n📊 TOP 10 BIGGEST PERCENTAGE CHANGES (2019-2024):")
@@ -156,25 +190,24 @@ def analyze_changes(merged_df):
         print(f"{'Rank':<4} {'Occupation':<40} {'2019':<8} {'2024':<8} {'Change':<8} {'% Change':<10}")
         print("-" * 70)
         
-        biggest_percent_changes = merged_df.nlargest(10, 'Percent_Change')
-        for i, (_, row) in enumerate(biggest_percent_changes.iterrows(), 1):
-            print(f"{i:<4} {row['Occupation'][:39]:<40} {row['LQ_2019']:<8.3f} {row['LQ_2024']:<8.3f} {row['Change']:<8.3f} {row['Percent_Change']:<9.1f}%")
+        for i, pos in enumerate(biggest_percent_changes, 1):
+            print(f"{i:<4} {occupations[pos][:39]:<40} {lq_2019[pos]:<8.3f} {lq_2024[pos]:<8.3f} {change[pos]:<8.3f} {percent_change[pos]:<9.1f}%")
         
         # Summary statistics
         print(f"\n📈 CHANGE SUMMARY:")
         print("-" * 40)
         
-        increased = merged_df[merged_df['Change'] > 0]
-        decreased = merged_df[merged_df['Change'] < 0]
-        no_change = merged_df[merged_df['Change'] == 0]
+        # Decreased / unchanged / increased counted in one pass
+        decreased, no_change, increased = np.bincount(np.sign(change[~np.isnan(change)]).astype('int64') + 1, minlength=3)
         
-        print(f"   Occupations with increased LQ: {len(increased)} ({len(increased)/len(merged_df)*100:.1f}%)")
-        print(f"   Occupations with decreased LQ: {len(decreased)} ({len(decreased)/len(merged_df)*100:.1f}%)")
-        print(f"   Occupations with no change: {len(no_change)} ({len(no_change)/len(merged_df)*100:.1f}%)")
+        print(f"   Occupations with increased LQ: {increased} ({increased/len(merged_df)*100:.1f}%)")
+        print(f"   Occupations with decreased LQ: {decreased} ({decreased/len(merged_df)*100:.1f}%)")
+        print(f"   Occupations with no change: {no_change} ({no_change/len(merged_df)*100:.1f}%)")
         
         # Save results
         output_file = "oes_data/riverside_location_quotient_comparison_2019_2024.csv"
         merged_df.to_csv(output_file, index=False)
+        file_written(output_file)
         print(f"\n💾 Comparison results saved to {output_file}")
         
         return merged_df
@@ -226,4 +259,5 @@ def main():
         print(f"❌ Error in main comparison: {e}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    with quiet_output():
+        main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Location Quotient Cube
+Prebuilt area x SOC x year NumPy arrays of LQ and employment, opened with memory mapping for parse-free lookups
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from oes_dataset import DATASET_DIR, read_dataset
+from oes_metrics import file_written, quiet_output
+
+CUBE_DIR = os.path.join("oes_data", "lq_cube")
+
+# Measure -> (file, dtype); employment needs float64 to stay exact above 2**24
+CUBE_MEASURES = {
+    'Location_Quotient': ('location_quotient.npy', np.float32),
+    'Employment': ('employment.npy', np.float64),
+    'Jobs_Per_1000': ('jobs_per_1000.npy', np.float32),
+}
+
+LABELS_FILE = "labels.json"
+
+def build_cube(dataset_dir=DATASET_DIR, cube_dir=CUBE_DIR):
+    """Build the cube files from the Parquet dataset"""
+    print(f"🧊 Building LQ cube from {dataset_dir}...")
+
+    df = read_dataset(dataset_dir, columns=['Year', 'Area_Code', 'SOC_Code', 'Occupation'] + list(CUBE_MEASURES))
+    if df is None or df.empty:
+        print(f"❌ No data in dataset: {dataset_dir}")
+        return None
+
+    df = df[df['SOC_Code'].notna()]
+    area_idx, areas = pd.factorize(df['Area_Code'].astype(str), sort=True)
+    soc_idx, soc_codes = pd.factorize(df['SOC_Code'].astype(str), sort=True)
+    year_idx, years = pd.factorize(df['Year'].astype(int), sort=True)
+    shape = (len(areas), len(soc_codes), len(years))
+
+    os.makedirs(cube_dir, exist_ok=True)
+    for measure, (filename, dtype) in CUBE_MEASURES.items():
+        cube = np.full(shape, np.nan, dtype=dtype)
+        cube[area_idx, soc_idx, year_idx] = df[measure].to_numpy(dtype=dtype, na_value=np.nan)
+        temp_path = os.path.join(cube_dir, filename + ".tmp")
+        with open(temp_path, 'wb') as f:
+            np.save(f, cube)
+        os.replace(temp_path, os.path.join(cube_dir, filename))
+        file_written(os.path.join(cube_dir, filename))
+
+    titles = df.drop_duplicates('SOC_Code', keep='last')
+    labels = {
+        'areas': [str(area) for area in areas],
+        'soc_codes': [str(code) for code in soc_codes],
+        'years': [int(year) for year in years],
+        'occupations': dict(zip(titles['SOC_Code'].astype(str), titles['Occupation'].astype(str))),
+    }
+    with open(os.path.join(cube_dir, LABELS_FILE), 'w', encoding='utf-8') as f:
+        json.dump(labels, f)
+    file_written(os.path.join(cube_dir, LABELS_FILE))
+
+    print(f"✅ Cube built: {shape[0]} areas x {shape[1]} occupations x {shape[2]} years")
+    return shape
+
+class LQCube:
+    """Read-only, memory-mapped view of the cube; processes opening it share the OS page cache"""
+
+    def __init__(self, cube_dir=CUBE_DIR):
+        with open(os.path.join(cube_dir, LABELS_FILE), 'r', encoding='utf-8') as f:
+            labels = json.load(f)
+
+        self.areas = labels['areas']
+        self.soc_codes = labels['soc_codes']
+        self.years = labels['years']
+        self.occupations = labels['occupations']
+
+        self._area_index = {area: i for i, area in enumerate(self.areas)}
+        self._soc_index = {code: i for i, code in enumerate(self.soc_codes)}
+        self._year_index = {year: i for i, year in enumerate(self.years)}
+
+        self.arrays = {measure: np.load(os.path.join(cube_dir, filename), mmap_mode='r')
+                       for measure, (filename, _) in CUBE_MEASURES.items()}
+
+    @property
+    def shape(self):
+        return (len(self.areas), len(self.soc_codes), len(self.years))
+
+    def _index(self, index, key, axis_name):
+        if key is None:
+            return slice(None)
+        if isinstance(key, (list, tuple)):
+            return [self._index(index, k, axis_name) for k in key]
+        try:
+            return index[key]
+        except KeyError:
+            raise KeyError(f"{axis_name} not in cube: {key}")
+
+    def select(self, measure='Location_Quotient', area=None, soc_code=None, year=None):
+        """Array slice for any mix of fixed and free axes; single labels are views, not copies"""
+        return self.arrays[measure][self._index(self._area_index, area, 'Area'),
+                                    self._index(self._soc_index, soc_code, 'SOC code'),
+                                    self._index(self._year_index, int(year) if year is not None else None, 'Year')]
+
+    def get(self, area, soc_code, year, measure='Location_Quotient'):
+        """One value"""
+        return float(self.select(measure, area, soc_code, year))
+
+    def occupation_across_areas(self, soc_code, year, measure='Location_Quotient'):
+        """One occupation in one year, for every area"""
+        return pd.Series(self.select(measure, soc_code=soc_code, year=year), index=pd.Index(self.areas, name='Area_Code'),
+                         name=measure)
+
+    def area_across_years(self, area, measure='Location_Quotient'):
+        """One area: occupations x years"""
+        return pd.DataFrame(self.select(measure, area=area), index=pd.Index(self.soc_codes, name='SOC_Code'),
+                            columns=pd.Index(self.years, name='Year'))
+
+    def occupation_history(self, area, soc_code, measure='Location_Quotient'):
+        """One occupation in one area, for every year"""
+        return pd.Series(self.select(measure, area=area, soc_code=soc_code), index=pd.Index(self.years, name='Year'),
+                         name=measure)
+
+def main():
+    """Main function to build or query the LQ cube"""
+    parser = argparse.ArgumentParser(description="Build or query the memory-mapped LQ cube")
+    parser.add_argument("--build", action="store_true", help="Rebuild the cube from the Parquet dataset")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Parquet dataset directory")
+    parser.add_argument("--cube", default=CUBE_DIR, help="Cube directory")
+    parser.add_argument("--area", help="Area code to query")
+    parser.add_argument("--soc", help="SOC code to query")
+    parser.add_argument("--year", type=int, help="Year to query")
+    parser.add_argument("--measure", default="Location_Quotient", choices=list(CUBE_MEASURES))
+    args = parser.parse_args()
+
+    if args.build or not os.path.exists(os.path.join(args.cube, LABELS_FILE)):
+        if build_cube(args.dataset, args.cube) is None:
+            return
+
+    cube = LQCube(args.cube)
+    print(f"📊 Cube: {cube.shape[0]} areas x {cube.shape[1]} occupations x {cube.shape[2]} years")
+
+    if args.soc and args.year and not args.area:
+        print(cube.occupation_across_areas(args.soc, args.year, args.measure).dropna().sort_values(ascending=False))
+    elif args.area and args.soc:
+        print(cube.occupation_history(args.area, args.soc, args.measure))
+    elif args.area:
+        print(cube.area_across_years(args.area, args.measure).dropna(how='all'))
+
+if __name__ == "__main__":
+    with quiet_output():
+        main()
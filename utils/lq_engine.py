@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Location Quotient Engine
+Compute location quotients from area x occupation employment matrices, against the nation or any custom baseline
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from oes_dataset import DATASET_DIR, read_dataset
+from oes_metrics import file_written, quiet_output
+from oes_schema import soc_level
+
+# AREA of the U.S. rows in the BLS flat files
+NATIONAL_AREA_CODE = "99"
+TOTAL_SOC_CODE = "00-0000"
+
+class EmploymentMatrix:
+    """Area x occupation employment (NaN = suppressed) with each area's total employment"""
+
+    def __init__(self, employment, totals, areas, soc_codes, occupations=None):
+        self.employment = employment
+        self.totals = totals
+        self.areas = list(areas)
+        self.soc_codes = list(soc_codes)
+        self.occupations = occupations or {}
+        self._area_index = {area: i for i, area in enumerate(self.areas)}
+
+    @property
+    def shape(self):
+        return self.employment.shape
+
+    def rows(self, areas):
+        """Row positions of area codes"""
+        try:
+            return np.array([self._area_index[str(area)] for area in areas], dtype='int64')
+        except KeyError as e:
+            raise KeyError(f"Area not in employment matrix: {e.args[0]}")
+
+def employment_matrix(df, measure='Employment'):
+    """Build the matrix from a canonical frame with Area_Code, SOC_Code and Employment columns
+
+    An area's total is its 00-0000 row; areas without one fall back to the sum
+    of their detailed occupations.
+    """
+    df = df[df['SOC_Code'].notna()]
+    codes = df['SOC_Code'].astype(str)
+    employment = df[measure].to_numpy(dtype='float64', na_value=np.nan)
+
+    area_idx, areas = pd.factorize(df['Area_Code'].astype(str), sort=True)
+    is_total = (codes == TOTAL_SOC_CODE).to_numpy()
+    is_detail = (soc_level(codes) == 'detail').to_numpy()
+
+    totals = np.full(len(areas), np.nan)
+    totals[area_idx[is_total]] = employment[is_total]
+    detail_sums = np.bincount(area_idx[is_detail], weights=np.nan_to_num(employment[is_detail]), minlength=len(areas))
+    totals = np.where(np.isnan(totals), detail_sums, totals)
+
+    occupation_rows = ~is_total
+    soc_idx, soc_codes = pd.factorize(codes[occupation_rows], sort=True)
+    matrix = np.full((len(areas), len(soc_codes)), np.nan)
+    matrix[area_idx[occupation_rows], soc_idx] = employment[occupation_rows]
+
+    occupations = {}
+    if 'Occupation' in df.columns:
+        titles = df[occupation_rows].drop_duplicates('SOC_Code')
+        occupations = dict(zip(titles['SOC_Code'].astype(str), titles['Occupation'].astype(str)))
+
+    return EmploymentMatrix(matrix, totals, areas, soc_codes, occupations)
+
+def default_baseline_areas(matrix):
+    """The nation (area 99) if the matrix holds it, else every area
+
+    Summing the nation together with its own areas would count their employment twice.
+    """
+    return [NATIONAL_AREA_CODE] if NATIONAL_AREA_CODE in matrix.areas else list(matrix.areas)
+
+def baseline(matrix, areas=None):
+    """Summed employment and total of a set of areas (default_baseline_areas when None): a state, a region, the nation"""
+    rows = matrix.rows(default_baseline_areas(matrix) if areas is None else areas)
+    employment = matrix.employment[rows]
+    # A cell suppressed in every area stays unknown; otherwise suppressed cells count as zero
+    summed = np.where(np.isnan(employment).all(axis=0), np.nan, np.nansum(employment, axis=0))
+    return summed, float(np.nansum(matrix.totals[rows]))
+
+def group_baselines(matrix, groups):
+    """Per-area baselines, summing each area's group (e.g. every metro area against its own state)"""
+    codes, labels = pd.factorize(pd.Series(groups).astype(str))
+    # One (groups x areas) indicator product sums every group at once
+    indicator = np.zeros((len(labels), len(codes)))
+    indicator[codes, np.arange(len(codes))] = 1.0
+    known = indicator @ (~np.isnan(matrix.employment))
+    sums = np.where(known > 0, indicator @ np.nan_to_num(matrix.employment), np.nan)
+    totals = indicator @ np.nan_to_num(matrix.totals)
+    return sums[codes], totals[codes]
+
+def compute_lq(employment, totals, baseline_employment, baseline_total):
+    """LQ = (area occupation share of area employment) / (baseline occupation share) for every cell at once
+
+    The baseline is one row shared by every area, or one row per area.
+    """
+    employment = np.asarray(employment, dtype='float64')
+    totals = np.asarray(totals, dtype='float64').reshape(-1, 1)
+    baseline_employment = np.atleast_2d(np.asarray(baseline_employment, dtype='float64'))
+    baseline_total = np.asarray(baseline_total, dtype='float64').reshape(-1, 1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lq = (employment / totals) / (baseline_employment / baseline_total)
+    lq[~np.isfinite(lq)] = np.nan
+    return lq
+
+def matrix_lq(matrix, baseline_areas=None, groups=None):
+    """LQ matrix for every area against summed baseline areas, or against each area's own group"""
+    if groups is not None:
+        base_employment, base_total = group_baselines(matrix, groups)
+    else:
+        base_employment, base_total = baseline(matrix, baseline_areas)
+    return compute_lq(matrix.employment, matrix.totals, base_employment, base_total)
+
+def aggregate_areas(matrix, geographies):
+    """Custom geographies from existing areas: {'Inland Empire+LA': ['0040140', '0031080']} -> a new matrix"""
+    names = list(geographies)
+    employment = np.empty((len(names), matrix.shape[1]))
+    totals = np.empty(len(names))
+    for i, name in enumerate(names):
+        employment[i], totals[i] = baseline(matrix, geographies[name])
+    return EmploymentMatrix(employment, totals, names, matrix.soc_codes, matrix.occupations)
+
+def lq_frame(matrix, lq):
+    """Long frame of the non-missing LQs"""
+    area_idx, soc_idx = np.nonzero(~np.isnan(lq))
+    df = pd.DataFrame({
+        'Area_Code': pd.Categorical.from_codes(area_idx, matrix.areas),
+        'SOC_Code': pd.Categorical.from_codes(soc_idx, matrix.soc_codes),
+        'Employment': matrix.employment[area_idx, soc_idx],
+        'Location_Quotient': lq[area_idx, soc_idx],
+    })
+    if matrix.occupations:
+        df.insert(2, 'Occupation', df['SOC_Code'].map(matrix.occupations))
+    return df
+
+def parse_geographies(specs):
+    """['IE=0040140,0031080'] -> {'IE': ['0040140', '0031080']}"""
+    geographies = {}
+    for spec in specs or []:
+        name, _, areas = spec.partition('=')
+        geographies[name] = [area.strip() for area in areas.split(',') if area.strip()]
+    return geographies
+
+def main():
+    """Main function to compute location quotients from employment"""
+    parser = argparse.ArgumentParser(description="Compute OES location quotients from employment")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Parquet dataset directory")
+    parser.add_argument("--year", type=int, required=True, help="Survey year")
+    parser.add_argument("--baseline-areas", nargs="*",
+                        help="Areas summed into the baseline (area 99 if stored, else every area)")
+    parser.add_argument("--combine", nargs="*", metavar="NAME=AREA,AREA",
+                        help="Custom geographies to compute, built from stored areas")
+    parser.add_argument("--output", default=os.path.join("oes_data", "computed_location_quotients.csv"),
+                        help="Output CSV")
+    args = parser.parse_args()
+
+    print("🚀 Computing location quotients from employment")
+    print("=" * 50)
+
+    df = read_dataset(args.dataset, columns=['Area_Code', 'SOC_Code', 'Occupation', 'Employment', 'Location_Quotient'],
+                      filters={'Year': args.year})
+    if df is None or df.empty:
+        print(f"❌ No {args.year} data in dataset: {args.dataset}")
+        return
+
+    matrix = employment_matrix(df)
+    print(f"📊 Employment matrix: {matrix.shape[0]} areas x {matrix.shape[1]} occupations")
+
+    baseline_areas = args.baseline_areas or default_baseline_areas(matrix)
+    try:
+        base_employment, base_total = baseline(matrix, baseline_areas)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return
+
+    targets = aggregate_areas(matrix, parse_geographies(args.combine)) if args.combine else matrix
+    lq = compute_lq(targets.employment, targets.totals, base_employment, base_total)
+    result = lq_frame(targets, lq)
+    print(f"📊 Computed {len(result)} location quotients against {', '.join(baseline_areas)}")
+
+    if not args.combine:
+        # How close the computed values come to the published ones
+        published = df[['Area_Code', 'SOC_Code', 'Location_Quotient']].astype({'Area_Code': str, 'SOC_Code': str})
+        check = result.astype({'Area_Code': str, 'SOC_Code': str}).merge(
+            published, on=['Area_Code', 'SOC_Code'], suffixes=('', '_Published')).dropna()
+        if not check.empty:
+            error = (check['Location_Quotient'] - check['Location_Quotient_Published']).abs()
+            print(f"📈 Against published LQs: mean abs difference {error.mean():.3f} over {len(check)} values")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    result.to_csv(args.output, index=False)
+    file_written(args.output)
+    print(f"💾 Location quotients saved to {args.output}")
+
+if __name__ == "__main__":
+    with quiet_output():
+        main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Location Quotient Monte Carlo
+Confidence intervals and category stability for published LQs, sampling employment from the published RSEs
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from lq_engine import TOTAL_SOC_CODE
+from lq_report import CATEGORY_EDGES, CATEGORY_LABELS, categorize
+from oes_dataset import DATASET_DIR, read_dataset
+from oes_metrics import file_written, quiet_output
+from oes_schema import to_canonical
+
+DEFAULT_DRAWS = 10000
+BATCH_DRAWS = 1000
+DEFAULT_SEED = 2024
+
+def area_inputs(df):
+    """Canonical area frame -> occupation rows with an LQ, their RSE fractions and the area total's RSE fraction"""
+    df = df[df['SOC_Code'].notna()]
+    is_total = (df['SOC_Code'].astype(str) == TOTAL_SOC_CODE).to_numpy()
+
+    total_rse = df.loc[is_total, 'Employment_RSE'].dropna()
+    total_rse = float(total_rse.iloc[0]) / 100 if len(total_rse) else 0.0
+
+    rows = df[~is_total & df['Location_Quotient'].notna().to_numpy()].reset_index(drop=True)
+    # Canonical LQs are float32; round away the widening noise (0.79 -> 0.7900000214)
+    lq = rows['Location_Quotient'].to_numpy(dtype='float64', na_value=np.nan).round(4)
+    rse = rows['Employment_RSE'].to_numpy(dtype='float64', na_value=np.nan) / 100
+    return rows, lq, rse, total_rse
+
+def simulate_lq(lq, rse, total_rse, draws=DEFAULT_DRAWS, seed=None, confidence=0.95, edges=CATEGORY_EDGES):
+    """Interval bounds and category stability for each LQ, from draws batched over all occupations
+
+    LQ = (E_occ / E_area) / national share. National shares are held fixed (their errors are far
+    smaller), so each draw is LQ * (sampled E_occ / E_occ) / (sampled E_area / E_area).
+    """
+    rng = np.random.default_rng(seed)
+    lq = np.asarray(lq, dtype='float64')
+    scale = np.nan_to_num(np.asarray(rse, dtype='float64'))
+    n = len(lq)
+
+    samples = np.empty((draws, n), dtype='float32')
+    published = np.searchsorted(edges, lq, side='left')
+    same_category = np.zeros(n, dtype='int64')
+
+    for start in range(0, draws, BATCH_DRAWS):
+        size = min(BATCH_DRAWS, draws - start)
+        occupation = np.clip(rng.normal(1.0, scale, size=(size, n)), 0.0, None)
+        total = np.clip(rng.normal(1.0, total_rse, size=(size, 1)), 1e-6, None)
+        batch = lq * occupation / total
+        samples[start:start + size] = batch
+        same_category += (np.searchsorted(edges, batch, side='left') == published).sum(axis=0)
+
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(samples, [tail, 1 - tail], axis=0)
+    stability = same_category / draws
+
+    # No RSE, no measure of uncertainty
+    unknown = np.isnan(np.asarray(rse, dtype='float64'))
+    low[unknown], high[unknown], stability[unknown] = np.nan, np.nan, np.nan
+    return low, high, stability
+
+def _simulate_area(task):
+    """Process pool worker: one area with its own child seed"""
+    lq, rse, total_rse, draws, seed, confidence = task
+    return simulate_lq(lq, rse, total_rse, draws, seed, confidence)
+
+def simulate_areas(frames, draws=DEFAULT_DRAWS, seed=DEFAULT_SEED, workers=None, confidence=0.95):
+    """Intervals for {area_code: canonical frame} across a process pool
+
+    Every area gets its own stream spawned from one SeedSequence, in area order, so
+    results do not depend on the number of workers or the order they finish in.
+    """
+    areas = sorted(frames)
+    inputs = [area_inputs(frames[area]) for area in areas]
+    seeds = np.random.SeedSequence(seed).spawn(len(areas))
+    tasks = [(lq, rse, total_rse, draws, child, confidence)
+             for (_, lq, rse, total_rse), child in zip(inputs, seeds)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            results = list(executor.map(_simulate_area, tasks))
+    else:
+        results = [_simulate_area(task) for task in tasks]
+
+    parts = []
+    for area, (rows, lq, _, _), (low, high, stability) in zip(areas, inputs, results):
+        parts.append(pd.DataFrame({
+            'Area_Code': area,
+            'SOC_Code': rows['SOC_Code'].astype(str).to_numpy(),
+            'Occupation': rows['Occupation'].astype(str).to_numpy(),
+            'Location_Quotient': lq,
+            'LQ_Low': low.round(4),
+            'LQ_High': high.round(4),
+            'Category': categorize(lq),
+            'Category_Stability': stability,
+        }))
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat(parts, ignore_index=True)
+
+def load_frames(args):
+    """{area_code: canonical frame} from input files or from one year of the dataset"""
+    if args.input:
+        return {args.area or os.path.splitext(os.path.basename(path))[0]: to_canonical(pd.read_csv(path))
+                for path in args.input}
+
+    filters = {'Year': args.year}
+    if args.areas:
+        filters['Area_Code'] = args.areas
+    df = read_dataset(args.dataset, columns=['Area_Code', 'SOC_Code', 'Occupation', 'Employment_RSE',
+                                             'Location_Quotient'], filters=filters)
+    if df is None or df.empty:
+        return {}
+    return {str(area): area_df for area, area_df in df.groupby('Area_Code', observed=True)}
+
+def main():
+    """Main function to simulate LQ confidence intervals"""
+    parser = argparse.ArgumentParser(description="Monte Carlo confidence intervals for OES location quotients")
+    parser.add_argument("--input", nargs="*", help="OES CSVs (2019 or 2024 layout) instead of the dataset")
+    parser.add_argument("--area", help="Area code for a single --input file")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Parquet dataset directory")
+    parser.add_argument("--year", type=int, default=2024, help="Dataset year")
+    parser.add_argument("--areas", nargs="*", help="Dataset area codes (all by default)")
+    parser.add_argument("--draws", type=int, default=DEFAULT_DRAWS, help="Draws per occupation")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Interval coverage")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Root seed")
+    parser.add_argument("--workers", type=int, help="Worker processes (CPU count by default)")
+    parser.add_argument("--output", default=os.path.join("oes_data", "location_quotient_intervals.csv"),
+                        help="Output CSV")
+    args = parser.parse_args()
+
+    print("🎲 Simulating location quotient confidence intervals")
+    print("=" * 50)
+
+    frames = load_frames(args)
+    if not frames:
+        print("❌ No OES data to simulate")
+        return
+
+    start = time.perf_counter()
+    result = simulate_areas(frames, args.draws, args.seed, args.workers, args.confidence)
+    print(f"📊 {len(frames)} areas, {len(result)} occupations x {args.draws} draws "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    concentrated = result[result['Category'].isin(CATEGORY_LABELS[3:])]
+    if not concentrated.empty:
+        unstable = concentrated[concentrated['Category_Stability'] < 0.9]
+        print(f"📈 {len(unstable)} of {len(concentrated)} high-concentration labels hold in fewer than 90% of draws")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    result.to_csv(args.output, index=False)
+    file_written(args.output)
+    print(f"💾 Intervals saved to {args.output}")
+
+if __name__ == "__main__":
+    with quiet_output():
+        main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Location Quotient Report Engine
+Columnar LQ categories, ranks, top/bottom lists and summary statistics for one area or many stacked areas
+"""
+
+import numpy as np
+import pandas as pd
+
+# Report categories: LQ > 2.0, > 1.5, > 1.0, > 0.5, else
+CATEGORY_EDGES = np.array([0.5, 1.0, 1.5, 2.0])
+CATEGORY_LABELS = ['Low Concentration', 'Below Average', 'Above Average', 'High Concentration',
+                   'Very High Concentration']
+# The 2019 report has always called the 0.5-1.0 band "Average"
+CATEGORY_LABELS_2019 = ['Low Concentration', 'Average', 'Above Average', 'High Concentration',
+                        'Very High Concentration']
+
+# Distribution bands of the analysis summary: LQ <= 0.5, <= 1.0, <= 2.0, > 2.0
+DISTRIBUTION_EDGES = np.array([0.5, 1.0, 2.0])
+DISTRIBUTION_LABELS = ['Low', 'Average', 'Moderate', 'High']
+
+def lq_values(values):
+    """Any LQ column -> float64 array with NaN for missing values"""
+    return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+def lq_bins(values, edges=CATEGORY_EDGES):
+    """Band index of each value with right-closed bands (1.0 falls in the band below 1.0); -1 = missing"""
+    values = lq_values(values)
+    codes = np.searchsorted(edges, values, side='left').astype('int8')
+    codes[np.isnan(values)] = -1
+    return codes
+
+def categorize(values, edges=CATEGORY_EDGES, labels=CATEGORY_LABELS):
+    """Category label of each LQ value by binning"""
+    codes = lq_bins(values, edges)
+    # A missing LQ falls through to the lowest band, as in the original if/elif reports
+    codes[codes < 0] = 0
+    return pd.Categorical.from_codes(codes, categories=labels)
+
+def distribution(values, edges=DISTRIBUTION_EDGES):
+    """Number of values in each band, counted in one pass (missing values are not counted)"""
+    codes = lq_bins(values, edges)
+    return np.bincount(codes[codes >= 0], minlength=len(edges) + 1)
+
+def summary_stats(values):
+    """Count, mean, median, min, max and sample std of the non-missing values"""
+    values = lq_values(values)
+    values = values[~np.isnan(values)]
+    n = len(values)
+    if not n:
+        return {'count': 0, 'mean': np.nan, 'median': np.nan, 'min': np.nan, 'max': np.nan, 'std': np.nan}
+
+    # One partition places the min, the max and the middle element(s)
+    middle = sorted({0, (n - 1) // 2, n // 2, n - 1})
+    part = np.partition(values, middle)
+    mean = values.mean()
+    return {
+        'count': n,
+        'mean': mean,
+        'median': (part[(n - 1) // 2] + part[n // 2]) / 2,
+        'min': part[0],
+        'max': part[n - 1],
+        'std': np.sqrt(((values - mean) ** 2).sum() / (n - 1)) if n > 1 else np.nan,
+    }
+
+def rank_order(values, groups=None):
+    """Row order by group, then LQ descending (ties keep input order, missing last), and 1-based ranks"""
+    values = lq_values(values)
+    groups = np.zeros(len(values), dtype='int64') if groups is None else np.asarray(groups)
+
+    # One stable sort on (group, -LQ); NaN sorts after every number
+    order = np.lexsort((-values, groups))
+    sorted_groups = groups[order]
+    group_start = np.searchsorted(sorted_groups, sorted_groups, side='left')
+    ranks = np.arange(1, len(order) + 1) - group_start
+    return order, ranks
+
+def top_bottom(values, n=10):
+    """Positions of the n largest and n smallest values (ties keep input order) via partial sorts"""
+    values = lq_values(values)
+    valid = np.flatnonzero(~np.isnan(values))
+    n = min(n, len(valid))
+    if not n:
+        return np.array([], dtype='int64'), np.array([], dtype='int64')
+
+    def pick(keys):
+        # Partial sort for the n-th key, then take ties at the cutoff in input order
+        cutoff = np.partition(keys, n - 1)[n - 1]
+        below = np.flatnonzero(keys < cutoff)
+        candidates = np.concatenate([below, np.flatnonzero(keys == cutoff)[:n - len(below)]])
+        # Sort only the n candidates; position breaks ties
+        return valid[candidates[np.lexsort((candidates, keys[candidates]))]]
+
+    finite = values[valid]
+    return pick(-finite), pick(finite)
+
+def group_codes(df, area_col=None):
+    """Integer area codes and their labels; a single area when there is no area column"""
+    if area_col is None or area_col not in df.columns:
+        return np.zeros(len(df), dtype='int64'), [None]
+    codes, areas = pd.factorize(df[area_col].astype(str), sort=True)
+    return codes, list(areas)
+
+def lq_report(df, occupation_col, lq_col, area_col=None, labels=CATEGORY_LABELS):
+    """Ranked report (Rank, Occupation, Location_Quotient, Category), ranked within each area"""
+    codes, areas = group_codes(df, area_col)
+    values = lq_values(df[lq_col])
+    order, ranks = rank_order(values, codes)
+
+    report = pd.DataFrame({
+        'Rank': ranks,
+        'Occupation': df[occupation_col].astype(str).to_numpy()[order],
+        'Location_Quotient': values[order],
+        'Category': categorize(values[order], labels=labels),
+    })
+    if areas != [None]:
+        report.insert(0, 'Area_Code', pd.Categorical.from_codes(codes[order], areas))
+    return report
+
+def lq_summary(df, lq_col, area_col=None):
+    """One row per area: occupations, LQ statistics and distribution band counts"""
+    codes, areas = group_codes(df, area_col)
+    values = lq_values(df[lq_col])
+
+    rows = []
+    # Contiguous per-area slices from one stable sort of the area codes
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(areas) + 1))
+    for i, area in enumerate(areas):
+        area_values = values[order[bounds[i]:bounds[i + 1]]]
+        stats = summary_stats(area_values)
+        counts = distribution(area_values)
+        row = {'Occupations': len(area_values)}
+        row.update({f"LQ_{name.title()}": value for name, value in stats.items()})
+        row.update({f"{label}_Concentration": int(count) for label, count in zip(DISTRIBUTION_LABELS, counts)})
+        if area is not None:
+            row = {'Area_Code': area, **row}
+        rows.append(row)
+    return pd.DataFrame(rows)
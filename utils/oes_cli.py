@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+OES Command Line
+One entry point for scrape, process, analyze, compare and query, importing only what the chosen command needs
+"""
+
+import time
+
+# Taken before anything else is imported, so the startup report covers the CLI's own imports
+CLI_START = time.perf_counter()
+
+import argparse
+import importlib
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# command -> target -> (directory, module); the first target is the default.
+# Modules are imported only once their command is chosen, so pandas, pyarrow and
+# selenium load only for the commands that use them (selenium only for scrapes).
+COMMANDS = {
+    'scrape': {
+        '2024': ('scrapers', 'selenium_oes_scraper'),
+        '2019': ('scrapers', 'selenium_oes_scraper_2019'),
+        'batch': ('scrapers', 'batch_oes_scraper'),
+        'years': ('scrapers', 'async_oes_fetcher'),
+    },
+    'process': {
+        '2024': ('utils', 'process_extracted_data'),
+        'flat-file': ('utils', 'oes_flat_file_ingest'),
+        'pages': ('utils', 'batch_process'),
+    },
+    'analyze': {
+        '2019': ('utils', 'analyze_2019_data'),
+        'lq': ('utils', 'lq_engine'),
+        'shift-share': ('utils', 'shift_share'),
+        'intervals': ('utils', 'lq_monte_carlo'),
+    },
+    'compare': {
+        '2019-2024': ('utils', 'compare_2019_2024'),
+        'panel': ('utils', 'panel_comparison'),
+    },
+    'query': {
+        'dataset': ('utils', 'oes_dataset'),
+        'cube': ('utils', 'lq_cube'),
+    },
+}
+
+def build_parser():
+    """Top-level parser with one subcommand per stage of the workflow"""
+    parser = argparse.ArgumentParser(
+        description="Riverside OES workflow: scrape, process, analyze, compare and query",
+        epilog="Arguments after the target are passed to its script, e.g. 'query dataset --years 2024'")
+    parser.add_argument("--timing", action="store_true", help="Report startup, import and run times")
+    parser.add_argument("--metrics", metavar="FILE", help="Append per-stage metrics to this JSON-lines file")
+    parser.add_argument("--quiet", action="store_true", help="Drop progress output (metrics are still recorded)")
+    parser.add_argument("--profile", metavar="STAGES",
+                        help="Profile CPU and memory of these stages, e.g. clean,read_table (or 'all')")
+    parser.add_argument("--profile-dir", help="Where profiles are written (default: oes_data/profiles)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command, targets in COMMANDS.items():
+        names = list(targets)
+        sub = subparsers.add_parser(command, help=f"{command} ({', '.join(names)})")
+        sub.add_argument("target", nargs="?", default=names[0], choices=names,
+                         help=f"What to {command} (default: {names[0]})")
+    return parser
+
+def load_command(command, target):
+    """Import the module behind a command, with scrapers/ and utils/ importable"""
+    directory, module = COMMANDS[command][target]
+    for code_dir in ('utils', directory):
+        path = os.path.join(REPO_ROOT, code_dir)
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    return importlib.import_module(module)
+
+def main(argv=None):
+    """Main function to dispatch an OES command"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args, passthrough = build_parser().parse_known_args(argv)
+    ready = time.perf_counter()
+
+    module = load_command(args.command, args.target)
+    imported = time.perf_counter()
+
+    import oes_metrics
+    import oes_profiling
+    # Through the environment as well, so worker processes record to the same file
+    if args.metrics:
+        os.environ[oes_metrics.METRICS_FILE_ENV] = os.path.abspath(args.metrics)
+        oes_metrics.configure(path=os.environ[oes_metrics.METRICS_FILE_ENV])
+    if args.quiet:
+        os.environ[oes_metrics.QUIET_ENV] = '1'
+        oes_metrics.configure(quiet=True)
+    if args.profile:
+        os.environ[oes_profiling.PROFILE_ENV] = args.profile
+    if args.profile_dir:
+        os.environ[oes_profiling.PROFILE_DIR_ENV] = os.path.abspath(args.profile_dir)
+
+    # Every script parses its own arguments from sys.argv
+    sys.argv = [module.__file__] + passthrough
+    try:
+        with oes_metrics.stage(f"{args.command}:{args.target}"), oes_metrics.quiet_output():
+            module.main()
+    finally:
+        finished = time.perf_counter()
+        if args.timing:
+            print(f"\n⏱️  {args.command} {args.target}: startup {(ready - CLI_START) * 1000:.0f}ms, "
+                  f"import {(imported - ready) * 1000:.0f}ms, run {finished - imported:.2f}s "
+                  f"(selenium {'loaded' if 'selenium' in sys.modules else 'not loaded'})")
+        if args.metrics and not oes_metrics.is_quiet():
+            print(f"\n📊 Stage metrics (appended to {args.metrics}):")
+            print(oes_metrics.summarize(oes_metrics.recorded_events()).round(3).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
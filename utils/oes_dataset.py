@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+OES Parquet Dataset
+Store canonical OES frames in a Parquet dataset with one file per year sorted by area, with column projection and filter pushdown
+"""
+
+import argparse
+import contextlib
+import os
+import threading
+import time
+
+import pandas as pd
+
+from oes_metrics import file_read, file_written, instrument, quiet_output
+from oes_schema import CANONICAL_DTYPES, to_canonical
+
+DATASET_DIR = os.path.join("oes_data", "dataset")
+
+# One hive directory per year (Year=2024/) holding one file sorted by area. Per-file and
+# per-row-group overhead dominates reads of small area tables, so areas share row groups
+# and are pruned through Area_Code min/max statistics instead of directories.
+PARTITION_COLUMNS = ['Year', 'Area_Code']
+ROW_GROUP_SIZE = 64 * 1024
+
+_write_lock = threading.Lock()
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow is required for the OES Parquet dataset (pip install pyarrow)")
+    return pyarrow
+
+def partitioning():
+    """Hive partitioning on Year"""
+    pa = _require_pyarrow()
+    return pa.dataset.partitioning(pa.schema([('Year', pa.int16())]), flavor='hive')
+
+def parse_years(text):
+    """'2012-2024' or '2018,2019' -> list of years"""
+    years = []
+    for part in text.split(','):
+        if '-' in part:
+            start, end = part.split('-')
+            years.extend(range(int(start), int(end) + 1))
+        else:
+            years.append(int(part))
+    return years
+
+def year_file(year, dataset_dir=DATASET_DIR):
+    return os.path.join(dataset_dir, f"Year={int(year)}", "part-0.parquet")
+
+def _to_table(df):
+    """Canonical frame with an Area_Code column -> Arrow table with plain string columns"""
+    pa = _require_pyarrow()
+
+    df = df.drop(columns=[col for col in ['Year'] if col in df.columns])
+    # One row per area and occupation: pages can repeat the whole table, and their
+    # footnote and repeated header rows have no SOC code
+    df = df[df['SOC_Code'].notna()].drop_duplicates(['Area_Code', 'SOC_Code']).reset_index(drop=True)
+    df['Area_Code'] = df['Area_Code'].astype(str)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Categories differ between areas; store plain strings so area tables can be combined
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(field.type.value_type))
+    return table.replace_schema_metadata(None)
+
+def _hidden_path(path, suffix):
+    """Sidecar file next to a year file; the leading dot keeps dataset discovery from reading it"""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.{suffix}")
+
+@contextlib.contextmanager
+def _year_lock(path):
+    """Hold the year file's lock across threads and processes (a hidden sidecar .lock file)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _write_lock, open(_hidden_path(path, "lock"), 'a+b') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _write_year(year, table, dataset_dir=DATASET_DIR):
+    """Merge a table of areas into a year's file, replacing those areas
+
+    The read-merge-replace runs under a file lock, so processes writing the same
+    year (batch scrapes, parallel ingests) do not drop each other's areas.
+    """
+    pa = _require_pyarrow()
+
+    path = year_file(year, dataset_dir)
+    with _year_lock(path):
+        tables = [table]
+        if os.path.exists(path):
+            existing = pa.parquet.read_table(path)
+            replaced = pa.compute.unique(table.column('Area_Code'))
+            tables.insert(0, existing.filter(pa.compute.invert(pa.compute.is_in(existing.column('Area_Code'), replaced))))
+
+        # Sorted by area so each row group covers a narrow Area_Code range
+        combined = pa.concat_tables(tables, promote_options='permissive').sort_by('Area_Code')
+
+        temp_path = _hidden_path(path, f"{os.getpid()}-{threading.get_ident()}.tmp")
+        pa.parquet.write_table(combined, temp_path, row_group_size=ROW_GROUP_SIZE)
+        os.replace(temp_path, path)
+    file_written(path)
+    return path
+
+def _area_frame(df, area_code):
+    """Canonical frame for one area, tagged with its Area_Code"""
+    df = to_canonical(df.drop(columns=[col for col in PARTITION_COLUMNS if col in df.columns]))
+    df.insert(0, 'Area_Code', str(area_code))
+    return df
+
+@instrument('dataset_write')
+def write_area_year(df, year, area_code, dataset_dir=DATASET_DIR):
+    """Write one area-year (any OES layout) to the dataset, replacing any earlier copy"""
+    return _write_year(year, _to_table(_area_frame(df, area_code)), dataset_dir)
+
+@instrument('dataset_write')
+def write_pages(pages, dataset_dir=DATASET_DIR):
+    """Write many (year, area_code, frame) pages, rewriting each year's file once"""
+    pa = _require_pyarrow()
+    by_year = {}
+    for year, area_code, df in pages:
+        # A page repeated for the same area-year replaces the earlier one
+        by_year.setdefault(int(year), {})[str(area_code)] = _to_table(_area_frame(df, area_code))
+    return [_write_year(year, pa.concat_tables(list(tables.values()), promote_options='permissive'), dataset_dir)
+            for year, tables in sorted(by_year.items())]
+
+def store_area_year(df, year, area_code, dataset_dir=DATASET_DIR):
+    """Write an area-year for a processing step; a missing pyarrow only skips the dataset"""
+    try:
+        path = write_area_year(df, year, area_code, dataset_dir)
+        print(f"💾 {year} {area_code} written to dataset {path}")
+        return path
+    except ImportError as e:
+        print(f"⚠️  Skipping Parquet dataset: {e}")
+        return None
+
+def store_pages(pages, dataset_dir=DATASET_DIR):
+    """Write many area-years for a processing step; a missing pyarrow only skips the dataset"""
+    try:
+        paths = write_pages(pages, dataset_dir)
+        print(f"💾 {len(pages)} area-years written to dataset ({len(paths)} year files)")
+        return paths
+    except ImportError as e:
+        print(f"⚠️  Skipping Parquet dataset: {e}")
+        return None
+
+@instrument('dataset_write')
+def write_panel(df, dataset_dir=DATASET_DIR):
+    """Write a canonical frame with Year and Area_Code columns, rewriting each year once"""
+    paths = []
+    for year, year_df in df.groupby('Year', observed=True, sort=True):
+        paths.append(_write_year(year, _to_table(year_df), dataset_dir))
+    return paths
+
+def build_filter(filters):
+    """{'Year': 2024, 'Area_Code': ['0040140', '0031080']} -> pyarrow expression"""
+    pa = _require_pyarrow()
+    if filters is None or not isinstance(filters, dict):
+        return filters
+
+    expression = None
+    for col, value in filters.items():
+        field = pa.dataset.field(col)
+        if isinstance(value, (list, tuple, set)):
+            condition = field.isin(list(value))
+        else:
+            condition = field == value
+        expression = condition if expression is None else expression & condition
+    return expression
+
+def _open(dataset_dir):
+    """Dataset handle that decodes categorical columns straight to dictionaries"""
+    pa = _require_pyarrow()
+    parquet_format = pa.dataset.ParquetFileFormat(read_options=pa.dataset.ParquetReadOptions(
+        dictionary_columns=['Area_Code'] + [col for col, dtype in CANONICAL_DTYPES.items() if str(dtype) == 'category']))
+    return pa.dataset.dataset(dataset_dir, format=parquet_format, partitioning=partitioning())
+
+@instrument('dataset_read')
+def read_dataset(dataset_dir=DATASET_DIR, columns=None, filters=None):
+    """Read selected columns of the matching rows as a canonical frame
+
+    Year filters prune whole directories; Area_Code and other filters are
+    pushed down to the Parquet row groups.
+    """
+    pa = _require_pyarrow()
+
+    if not os.path.isdir(dataset_dir):
+        return None
+
+    dataset = _open(dataset_dir)
+    expression = build_filter(filters)
+    table = dataset.to_table(columns=columns, filter=expression)
+    # Year files left after partition pruning
+    for fragment in dataset.get_fragments(filter=expression):
+        file_read(fragment.path)
+    df = table.to_pandas()
+
+    # Restore the canonical dtypes Parquet does not round-trip on its own
+    for col in df.columns:
+        if col in CANONICAL_DTYPES:
+            df[col] = df[col].astype(CANONICAL_DTYPES[col])
+    if 'Year' in df.columns:
+        df['Year'] = df['Year'].astype('Int16')
+    if 'Area_Code' in df.columns:
+        df['Area_Code'] = df['Area_Code'].astype('category')
+
+    return df
+
+def list_partitions(dataset_dir=DATASET_DIR):
+    """(year, area_code) pairs stored in the dataset"""
+    if not os.path.isdir(dataset_dir):
+        return []
+    table = _open(dataset_dir).to_table(columns=['Year', 'Area_Code']).unify_dictionaries()
+    pairs = table.group_by(['Year', 'Area_Code']).aggregate([])
+    return sorted((int(year), str(area_code)) for year, area_code in
+                  zip(pairs.column('Year').to_pylist(), pairs.column('Area_Code').to_pylist()))
+
+def main():
+    """Main function to query the OES dataset"""
+    parser = argparse.ArgumentParser(description="Query the partitioned OES Parquet dataset")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Dataset directory")
+    parser.add_argument("--columns", nargs="*", help="Columns to read (all by default)")
+    parser.add_argument("--years", nargs="*", type=int, help="Years to keep")
+    parser.add_argument("--areas", nargs="*", help="Area codes to keep")
+    parser.add_argument("--output", help="Write the result to this CSV")
+    args = parser.parse_args()
+
+    filters = {}
+    if args.years:
+        filters['Year'] = args.years
+    if args.areas:
+        filters['Area_Code'] = args.areas
+
+    start = time.perf_counter()
+    df = read_dataset(args.dataset, columns=args.columns, filters=filters or None)
+    elapsed = time.perf_counter() - start
+
+    if df is None:
+        print(f"❌ Dataset not found: {args.dataset}")
+        return
+
+    print(f"📊 Read {len(df)} rows x {len(df.columns)} columns in {elapsed * 1000:.1f} ms")
+    if args.output:
+        df.to_csv(args.output, index=False)
+        print(f"💾 Saved to {args.output}")
+    else:
+        print(df.head(20))
+
+if __name__ == "__main__":
+    with quiet_output():
+        main()
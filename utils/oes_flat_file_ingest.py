@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Ingest BLS OES Bulk Flat Files
+Stream full-year OES spreadsheets/CSVs in chunks and keep only the requested areas
+"""
+
+import argparse
+import os
+import re
+
+import pandas as pd
+
+from process_extracted_data import clean_oes_data
+from oes_dataset import DATASET_DIR, store_pages
+from oes_metrics import file_written, quiet_output
+
+# Flat file column -> column in the cleaned OES Query System layout
+FLAT_FILE_COLUMNS = {
+    'TOT_EMP': 'Employment  (1)',
+    'EMP_PRSE': 'Employment percent relative standard error  (3)',
+    'H_MEAN': 'Hourly mean wage  ()',
+    'A_MEAN': 'Annual mean wage  (2)',
+    'MEAN_PRSE': 'Wage percent relative standard error  (3)',
+    'H_PCT10': 'Hourly 10th percentile wage  ()',
+    'H_PCT25': 'Hourly 25th percentile wage  ()',
+    'H_MEDIAN': 'Hourly median wage  ()',
+    'H_PCT75': 'Hourly 75th percentile wage  ()',
+    'H_PCT90': 'Hourly 90th percentile wage  ()',
+    'A_PCT10': 'Annual 10th percentile wage  (2)',
+    'A_PCT25': 'Annual 25th percentile wage  (2)',
+    'A_MEDIAN': 'Annual median wage  (2)',
+    'A_PCT75': 'Annual 75th percentile wage  (2)',
+    'A_PCT90': 'Annual 90th percentile wage  (2)',
+    'JOBS_1000': 'Employment per 1,000 jobs  ()',
+    'LOC_QUOTIENT': 'Location Quotient  ()',
+}
+
+# Columns needed to filter rows and build the occupation label
+KEY_COLUMNS = ['AREA', 'OCC_CODE', 'OCC_TITLE', 'I_GROUP']
+
+def normalize_column(name):
+    """Older vintages use lower case and spaces ('loc quotient', 'occ_code')"""
+    return re.sub(r'[\s_]+', '_', str(name).strip()).upper()
+
+def normalize_area(area_code):
+    """Flat files drop leading zeros: '0040140' -> '40140'"""
+    return str(area_code).strip().lstrip('0') or '0'
+
+def infer_year(path):
+    """Survey year from file names like all_data_M_2023.xlsx or MSA_M2019_dl.xlsx"""
+    match = re.search(r'(20\d{2})', os.path.basename(path))
+    return int(match.group(1)) if match else None
+
+def iter_excel_chunks(path, chunksize):
+    """Stream rows from an .xlsx file without loading the whole workbook"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError("openpyxl is required to read .xlsx flat files (pip install openpyxl)")
+
+    workbook = load_workbook(path, read_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [normalize_column(cell) for cell in next(rows)]
+        wanted = [i for i, col in enumerate(header) if col in KEY_COLUMNS or col in FLAT_FILE_COLUMNS]
+        columns = [header[i] for i in wanted]
+
+        chunk = []
+        for row in rows:
+            chunk.append([row[i] for i in wanted])
+            if len(chunk) >= chunksize:
+                yield pd.DataFrame(chunk, columns=columns)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=columns)
+    finally:
+        workbook.close()
+
+def iter_csv_chunks(path, chunksize):
+    """Stream a CSV flat file in chunks, reading only the needed columns"""
+    wanted = set(KEY_COLUMNS) | set(FLAT_FILE_COLUMNS)
+    for chunk in pd.read_csv(path, chunksize=chunksize, dtype=str,
+                             usecols=lambda col: normalize_column(col) in wanted):
+        chunk.columns = [normalize_column(col) for col in chunk.columns]
+        yield chunk
+
+def iter_flat_file_chunks(path, chunksize=50000):
+    """Yield chunks of a flat file with normalized column names"""
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        return iter_excel_chunks(path, chunksize)
+    return iter_csv_chunks(path, chunksize)
+
+def filter_chunk(chunk, areas):
+    """Keep cross-industry rows for the requested areas"""
+    mask = chunk['AREA'].astype(str).str.strip().str.lstrip('0').isin(areas)
+    if 'I_GROUP' in chunk.columns:
+        # All-data files also carry industry breakdowns; keep the area totals
+        mask &= chunk['I_GROUP'].astype(str).str.strip().str.lower() == 'cross-industry'
+    return chunk[mask]
+
+def to_query_layout(rows):
+    """Map flat file rows onto the OES Query System column layout"""
+    df = pd.DataFrame({'Occupation (SOC code)': rows['OCC_TITLE'].astype(str).str.strip()
+                       + ' (' + rows['OCC_CODE'].astype(str).str.strip() + ')'})
+    for flat_col, query_col in FLAT_FILE_COLUMNS.items():
+        df[query_col] = rows[flat_col].values if flat_col in rows.columns else None
+    return df.reset_index(drop=True)
+
+def ingest_flat_file(path, area_codes, year=None, output_dir=os.path.join("oes_data", "flat_files"), chunksize=50000,
+                     dataset_dir=DATASET_DIR):
+    """Stream a flat file and write cleaned data for each requested area"""
+    print(f"📥 Ingesting OES flat file: {path}")
+
+    if not os.path.exists(path):
+        print(f"❌ Flat file not found: {path}")
+        return None
+
+    year = year or infer_year(path)
+    areas = {normalize_area(area_code): area_code for area_code in area_codes}
+    matched = {area: [] for area in areas}
+
+    total_rows = 0
+    for chunk in iter_flat_file_chunks(path, chunksize):
+        total_rows += len(chunk)
+        # Drop every other area before anything else touches the chunk
+        kept = filter_chunk(chunk, areas)
+        for area, rows in kept.groupby(kept['AREA'].astype(str).str.strip().str.lstrip('0')):
+            matched[area].append(rows)
+
+    print(f"📊 Scanned {total_rows} rows")
+    os.makedirs(output_dir, exist_ok=True)
+
+    results = {}
+    pages = []
+    for area, area_code in areas.items():
+        if not matched[area]:
+            print(f"⚠️  No rows found for area {area_code}")
+            continue
+
+        area_rows = to_query_layout(pd.concat(matched[area], ignore_index=True))
+        # Flat files have no repeated header rows; keep 'All Occupations' and the major groups
+        cleaned, value_codes = clean_oes_data(area_rows, return_codes=True, drop_header_rows=False)
+        if cleaned is None:
+            continue
+
+        suffix = f"_{year}" if year else ""
+        output_file = os.path.join(output_dir, f"oes_{area_code}{suffix}_cleaned_data.csv")
+        cleaned.to_csv(output_file, index=False)
+        file_written(output_file)
+        if year:
+            pages.append((year, area_code, area_rows))
+        if value_codes is not None:
+            codes_file = os.path.join(output_dir, f"oes_{area_code}{suffix}_value_codes.csv")
+            value_codes.to_csv(codes_file, index=False)
+            file_written(codes_file)
+        print(f"💾 {area_code}: {len(cleaned)} occupations saved to {output_file}")
+        results[area_code] = cleaned
+
+    # Every area of the year in one rewrite of the year file
+    if pages:
+        store_pages(pages, dataset_dir)
+
+    return results
+
+def main():
+    """Main function to ingest an OES flat file"""
+    parser = argparse.ArgumentParser(description="Ingest a BLS OES flat file for selected areas")
+    parser.add_argument("path", help="Flat file (.xlsx or .csv)")
+    parser.add_argument("area_codes", nargs="*", default=["0040140"], help="Area codes to keep")
+    parser.add_argument("--year", type=int, help="Survey year (inferred from the file name by default)")
+    parser.add_argument("--chunksize", type=int, default=50000, help="Rows per chunk")
+    args = parser.parse_args()
+
+    results = ingest_flat_file(args.path, args.area_codes, year=args.year, chunksize=args.chunksize)
+
+    if results:
+        print(f"\n✅ Ingested {len(results)} areas")
+    else:
+        print("\n❌ No areas ingested")
+
+if __name__ == "__main__":
+    with quiet_output():
+        main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+OES Stage Metrics
+Wall time, CPU time, rows and bytes for each stage of a run, recorded as JSON-lines events
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from oes_profiling import profile_stage, should_profile
+
+# Set by the CLI flags, or in the environment for scripts run directly and pipeline stages
+METRICS_FILE_ENV = "OES_METRICS_FILE"
+QUIET_ENV = "OES_QUIET"
+RUN_ID_ENV = "OES_RUN_ID"
+
+# The first process of a run picks the id; worker processes and pipeline stages inherit it
+RUN_ID = os.environ.setdefault(RUN_ID_ENV, uuid.uuid4().hex[:12])
+
+_lock = threading.Lock()
+_local = threading.local()
+_events = []
+_config = {
+    'path': os.environ.get(METRICS_FILE_ENV) or None,
+    'quiet': os.environ.get(QUIET_ENV, '').lower() in ('1', 'true', 'yes'),
+}
+
+def configure(path=None, quiet=None):
+    """Write events to a JSON-lines file (appended) and/or turn quiet mode on or off"""
+    if path is not None:
+        _config['path'] = path or None
+    if quiet is not None:
+        _config['quiet'] = bool(quiet)
+
+def is_quiet():
+    return _config['quiet']
+
+class StageRecord:
+    """Counters of one running stage; see stage()"""
+
+    def __init__(self, name, parent=None, **fields):
+        self.name = name
+        self.parent = parent
+        self.fields = fields
+        self.rows_in = None
+        self.rows_out = None
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.status = 'ok'
+        self.error = None
+
+    def read(self, path):
+        """Count a file this stage read"""
+        self.bytes_read += _file_size(path)
+
+    def wrote(self, path):
+        """Count a file this stage wrote"""
+        self.bytes_written += _file_size(path)
+
+    def fail(self, error=None):
+        """Mark the stage failed without raising (the repo's functions report errors by returning None)"""
+        self.status = 'failed'
+        if error is not None:
+            self.error = str(error)
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return 0
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+def current_stage():
+    """Innermost stage running in this thread, or None"""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+def file_read(path):
+    """Attribute a file read to the current stage (no-op outside a stage)"""
+    record = current_stage()
+    if record is not None:
+        record.read(path)
+
+def data_read(nbytes):
+    """Attribute bytes read from somewhere other than a local file, e.g. an HTTP response body"""
+    record = current_stage()
+    if record is not None:
+        record.bytes_read += int(nbytes)
+
+def file_written(path):
+    """Attribute a file write to the current stage (no-op outside a stage)"""
+    record = current_stage()
+    if record is not None:
+        record.wrote(path)
+
+def emit(event):
+    """Keep an event and append it to the metrics file, if one is configured"""
+    with _lock:
+        _events.append(event)
+        if _config['path']:
+            os.makedirs(os.path.dirname(_config['path']) or ".", exist_ok=True)
+            with open(_config['path'], 'a', encoding='utf-8') as f:
+                f.write(json.dumps(event, default=str) + "\n")
+
+def recorded_events():
+    """Events recorded by this process so far"""
+    with _lock:
+        return list(_events)
+
+@contextlib.contextmanager
+def stage(name, **fields):
+    """Time a block; the yielded record takes row and byte counts
+
+        with stage('clean', area='0040140') as record:
+            record.rows_in = len(df)
+    """
+    stack = _stack()
+    record = StageRecord(name, stack[-1].name if stack else None, **fields)
+    # Stages named in $OES_PROFILE also get a CPU and allocation profile
+    profiling = profile_stage(name) if should_profile(name) else contextlib.nullcontext()
+    profile = None
+    started_at = datetime.now(timezone.utc)
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    stack.append(record)
+    try:
+        with profiling as profile:
+            yield record
+    except BaseException as e:
+        record.status = 'error'
+        record.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        stack.pop()
+        if profile is not None and profile.report_path:
+            record.fields.update(profile=profile.report_path, peak_memory_bytes=profile.peak_memory_bytes)
+        emit({
+            'event': 'stage',
+            'run_id': RUN_ID,
+            'pid': os.getpid(),
+            'stage': record.name,
+            'parent': record.parent,
+            'started_at': started_at.isoformat(timespec='milliseconds'),
+            'wall_seconds': round(time.perf_counter() - wall_start, 6),
+            'cpu_seconds': round(time.thread_time() - cpu_start, 6),
+            'rows_in': record.rows_in,
+            'rows_out': record.rows_out,
+            'bytes_read': record.bytes_read,
+            'bytes_written': record.bytes_written,
+            'status': record.status,
+            'error': record.error,
+            **record.fields,
+        })
+
+def _row_count(value):
+    """Rows of a DataFrame, or of the first DataFrame in a tuple; None otherwise"""
+    if isinstance(value, tuple):
+        value = next((item for item in value if _row_count(item) is not None), None)
+    if hasattr(value, 'shape') and hasattr(value, 'columns'):
+        return len(value)
+    return None
+
+def instrument(name, expect_result=False):
+    """Decorator: run the function as a stage, counting DataFrame rows in (first argument) and out
+
+    With expect_result, a None or False return marks the stage failed.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name) as record:
+                record.rows_in = next((rows for rows in map(_row_count, args) if rows is not None), None)
+                result = func(*args, **kwargs)
+                record.rows_out = _row_count(result)
+                if expect_result and (result is None or result is False):
+                    record.fail()
+                return result
+        return wrapper
+    return decorator
+
+@contextlib.contextmanager
+def quiet_output(enabled=None):
+    """Drop progress printing (stdout) while quiet; errors raised still reach stderr"""
+    if not (is_quiet() if enabled is None else enabled):
+        yield
+        return
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+def load_events(path):
+    """Events of a JSON-lines metrics file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def summarize(events):
+    """Per stage: calls, failures, total and mean wall time, CPU time, rows and bytes (slowest first)"""
+    import pandas as pd
+
+    df = pd.DataFrame([event for event in events if event.get('event') == 'stage'])
+    if df.empty:
+        return df
+    df['failed'] = df['status'] != 'ok'
+    summary = df.groupby('stage').agg(
+        calls=('stage', 'size'),
+        failed=('failed', 'sum'),
+        wall_seconds=('wall_seconds', 'sum'),
+        mean_wall_seconds=('wall_seconds', 'mean'),
+        cpu_seconds=('cpu_seconds', 'sum'),
+        rows_out=('rows_out', 'sum'),
+        bytes_read=('bytes_read', 'sum'),
+        bytes_written=('bytes_written', 'sum'),
+    )
+    return summary.sort_values('wall_seconds', ascending=False).reset_index()
+
+def main():
+    """Main function to summarize a metrics file"""
+    parser = argparse.ArgumentParser(description="Summarize OES stage metrics")
+    parser.add_argument("path", nargs="?", default=os.environ.get(METRICS_FILE_ENV),
+                        help=f"JSON-lines metrics file (default: ${METRICS_FILE_ENV})")
+    parser.add_argument("--run", help="Only this run id ('last' for the most recent run)")
+    args = parser.parse_args()
+
+    if not args.path or not os.path.exists(args.path):
+        print(f"❌ Metrics file not found: {args.path}")
+        sys.exit(1)
+
+    events = load_events(args.path)
+    if args.run:
+        run = events[-1]['run_id'] if args.run == 'last' and events else args.run
+        events = [event for event in events if event.get('run_id') == run]
+
+    summary = summarize(events)
+    if summary.empty:
+        print("❌ No stage events")
+        return
+    runs = len({event['run_id'] for event in events})
+    print(f"📊 {len(events)} stage events from {runs} runs")
+    print(summary.round(3).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
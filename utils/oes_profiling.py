@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+OES Stage Profiling
+Opt-in cProfile and tracemalloc profiles of chosen metrics stages, with per-stage artifacts and a hotspot summary
+"""
+
+import argparse
+import contextlib
+import cProfile
+import io
+import itertools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+# Comma-separated stage names (as recorded by oes_metrics) or "all"
+PROFILE_ENV = "OES_PROFILE"
+PROFILE_DIR_ENV = "OES_PROFILE_DIR"
+PROFILE_DIR = os.path.join("oes_data", "profiles")
+INDEX_FILE = "profiles.jsonl"
+TOP_N = 15
+
+# Frames kept per allocation trace; more frames cost more memory while tracing
+TRACE_FRAMES = 5
+
+_counter = itertools.count(1)
+_lock = threading.Lock()
+# Thread holding the process's one profiler; cProfile cannot run two at once (3.12+ raises)
+_owner = None
+
+def parse_stages(spec):
+    """'clean, read_table' -> {'clean', 'read_table'}; 'all' -> {'all'}"""
+    return {name.strip() for name in (spec or '').split(',') if name.strip()}
+
+def profiled_stages():
+    return parse_stages(os.environ.get(PROFILE_ENV))
+
+def profile_dir():
+    return os.environ.get(PROFILE_DIR_ENV) or PROFILE_DIR
+
+def should_profile(name, stages=None):
+    stages = profiled_stages() if stages is None else stages
+    return 'all' in stages or name in stages
+
+class StageProfile:
+    """Artifacts and headline numbers of one profiled stage run"""
+
+    def __init__(self, name):
+        self.name = name
+        self.prof_path = None
+        self.report_path = None
+        self.wall_seconds = None
+        self.peak_memory_bytes = None
+        self.hotspots = []
+        self.allocations = []
+
+def _hotspots(profiler, n=TOP_N):
+    """Top functions by time spent inside them (excluding callees), as plain rows"""
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({'function': f"{os.path.basename(filename)}:{line}({function})", 'calls': calls,
+                     'tottime': round(tottime, 6), 'cumtime': round(cumtime, 6)})
+    rows.sort(key=lambda row: row['tottime'], reverse=True)
+    return rows[:n]
+
+def _allocations(snapshot, n=TOP_N):
+    """Source lines holding the most memory still allocated at the end of the stage"""
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    return [{'line': f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+             'size_bytes': stat.size, 'count': stat.count}
+            for stat in snapshot.filter_traces(filters).statistics('lineno')[:n]]
+
+def _write_artifacts(result, profiler, output_dir):
+    """<stage>-<pid>-<n>.prof (pstats) and .txt (readable report), plus a line in profiles.jsonl"""
+    os.makedirs(output_dir, exist_ok=True)
+    base = os.path.join(output_dir, f"{result.name}-{os.getpid()}-{next(_counter)}")
+    result.prof_path = base + ".prof"
+    result.report_path = base + ".txt"
+    profiler.dump_stats(result.prof_path)
+
+    text = io.StringIO()
+    text.write(f"Stage {result.name}: {result.wall_seconds:.3f}s wall, "
+               f"peak traced memory {result.peak_memory_bytes / 1e6:.1f} MB\n\n")
+    pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(TOP_N)
+    text.write("Largest allocations still held at the end of the stage:\n")
+    for row in result.allocations:
+        text.write(f"  {row['size_bytes'] / 1e6:10.2f} MB  {row['count']:8d} blocks  {row['line']}\n")
+    with open(result.report_path, 'w', encoding='utf-8') as f:
+        f.write(text.getvalue())
+
+    with _lock, open(os.path.join(output_dir, INDEX_FILE), 'a', encoding='utf-8') as f:
+        f.write(json.dumps({
+            'stage': result.name, 'pid': os.getpid(), 'wall_seconds': round(result.wall_seconds, 6),
+            'peak_memory_bytes': result.peak_memory_bytes, 'profile': result.prof_path,
+            'report': result.report_path, 'hotspots': result.hotspots, 'allocations': result.allocations,
+        }) + "\n")
+
+@contextlib.contextmanager
+def profile_stage(name, output_dir=None):
+    """CPU-profile and trace allocations of a block; yields a StageProfile filled in on exit
+
+    One stage is profiled at a time per process. A nested stage is skipped, as its time
+    and memory are already part of the outer one. So are stages that start in other
+    threads (e.g. thread pool workers) meanwhile: cProfile cannot run two profilers at
+    once, and tracemalloc's peak is process-wide. Profile those stages on their own,
+    or with a single worker.
+    """
+    global _owner
+    result = StageProfile(name)
+    thread = threading.get_ident()
+    with _lock:
+        owner = _owner
+        if owner is None:
+            _owner = thread
+    if owner is not None:
+        if owner != thread:
+            print(f"⚠️  Not profiling {name} in {threading.current_thread().name}: "
+                  f"another thread's stage is being profiled")
+        yield result
+        return
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACE_FRAMES)
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        profiler.enable()
+        yield result
+    finally:
+        profiler.disable()
+        result.wall_seconds = time.perf_counter() - start
+        result.peak_memory_bytes = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+        result.allocations = _allocations(tracemalloc.take_snapshot())
+        if started_tracing:
+            tracemalloc.stop()
+        with _lock:
+            _owner = None
+        result.hotspots = _hotspots(profiler)
+        _write_artifacts(result, profiler, output_dir or profile_dir())
+        print(f"🔬 Profiled {name}: {result.wall_seconds:.2f}s, peak {result.peak_memory_bytes / 1e6:.1f} MB "
+              f"→ {result.report_path}")
+
+def load_profiles(output_dir=None):
+    """Index entries of every profiled stage run in a profile directory"""
+    path = os.path.join(output_dir or profile_dir(), INDEX_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def hotspot_summary(profiles, n=TOP_N):
+    """Per stage: runs, time and peak memory, plus the top-n functions by time spent in them"""
+    import pandas as pd
+
+    if not profiles:
+        return pd.DataFrame(), pd.DataFrame()
+    runs = pd.DataFrame(profiles)
+    stages = runs.groupby('stage').agg(runs=('stage', 'size'), wall_seconds=('wall_seconds', 'sum'),
+                                       peak_memory_mb=('peak_memory_bytes', 'max'))
+    stages['peak_memory_mb'] = stages['peak_memory_mb'] / 1e6
+
+    functions = pd.DataFrame([dict(hotspot, stage=profile['stage'])
+                              for profile in profiles for hotspot in profile['hotspots']])
+    functions = (functions.groupby(['stage', 'function'])[['calls', 'tottime', 'cumtime']].sum()
+                 .reset_index().sort_values('tottime', ascending=False).head(n))
+    return stages.sort_values('wall_seconds', ascending=False).reset_index(), functions
+
+def main():
+    """Main function to summarize stage profiles"""
+    parser = argparse.ArgumentParser(description="Summarize OES stage profiles (enable with OES_PROFILE or --profile)")
+    parser.add_argument("--dir", default=profile_dir(), help="Profile directory")
+    parser.add_argument("--top", type=int, default=TOP_N, help="Hotspots to list")
+    args = parser.parse_args()
+
+    profiles = load_profiles(args.dir)
+    if not profiles:
+        print(f"❌ No profiles in {args.dir} (run with OES_PROFILE=<stages> or oes_cli.py --profile <stages>)")
+        sys.exit(1)
+
+    stages, functions = hotspot_summary(profiles, args.top)
+    print(f"🔬 {len(profiles)} profiled stage runs in {args.dir}")
+    print(stages.round(3).to_string(index=False))
+    print(f"\n🔥 Top {len(functions)} hotspots (time inside the function):")
+    print(functions.round(4).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Canonical OES Schema
+Map any OES layout (2019 static pages, the 2024 query system, bulk flat files) onto one compactly typed frame
+"""
+
+import re
+
+import pandas as pd
+
+from oes_value_parser import parse_oes_column
+from soc_index import TWO_DIGIT_MINOR_GROUPS
+
+# Hierarchy levels, broadest first
+SOC_LEVELS = ['total', 'major', 'minor', 'broad', 'detail']
+
+# Canonical column -> dtype, in output order
+CANONICAL_DTYPES = {
+    'SOC_Code': 'category',
+    'Occupation': 'category',
+    'Level': pd.CategoricalDtype(SOC_LEVELS, ordered=True),
+    'Employment': 'Int32',
+    'Employment_RSE': 'float32',
+    'Jobs_Per_1000': 'float32',
+    'Location_Quotient': 'float32',
+    'Hourly_Mean_Wage': 'float32',
+    'Annual_Mean_Wage': 'float32',
+    'Wage_RSE': 'float32',
+    'Hourly_P10_Wage': 'float32',
+    'Hourly_P25_Wage': 'float32',
+    'Hourly_Median_Wage': 'float32',
+    'Hourly_P75_Wage': 'float32',
+    'Hourly_P90_Wage': 'float32',
+    'Annual_P10_Wage': 'float32',
+    'Annual_P25_Wage': 'float32',
+    'Annual_Median_Wage': 'float32',
+    'Annual_P75_Wage': 'float32',
+    'Annual_P90_Wage': 'float32',
+}
+
+CANONICAL_COLUMNS = list(CANONICAL_DTYPES)
+TEXT_COLUMNS = ['SOC_Code', 'Occupation', 'Level']
+
+# Normalized source column name -> canonical column, for every known vintage
+COLUMN_ALIASES = {
+    # 2019 static pages
+    'occupation code': 'SOC_Code',
+    'occupation title (click on the occupation title to view its profile)': 'Occupation',
+    'occupation title': 'Occupation',
+    'level': 'Level',
+    'employment': 'Employment',
+    'employment rse': 'Employment_RSE',
+    'employment per 1,000 jobs': 'Jobs_Per_1000',
+    'location quotient': 'Location_Quotient',
+    'median hourly wage': 'Hourly_Median_Wage',
+    'mean hourly wage': 'Hourly_Mean_Wage',
+    'annual mean wage': 'Annual_Mean_Wage',
+    'mean wage rse': 'Wage_RSE',
+    # 2024 OES Query System
+    'employment percent relative standard error': 'Employment_RSE',
+    'hourly mean wage': 'Hourly_Mean_Wage',
+    'wage percent relative standard error': 'Wage_RSE',
+    'hourly 10th percentile wage': 'Hourly_P10_Wage',
+    'hourly 25th percentile wage': 'Hourly_P25_Wage',
+    'hourly median wage': 'Hourly_Median_Wage',
+    'hourly 75th percentile wage': 'Hourly_P75_Wage',
+    'hourly 90th percentile wage': 'Hourly_P90_Wage',
+    'annual 10th percentile wage': 'Annual_P10_Wage',
+    'annual 25th percentile wage': 'Annual_P25_Wage',
+    'annual median wage': 'Annual_Median_Wage',
+    'annual 75th percentile wage': 'Annual_P75_Wage',
+    'annual 90th percentile wage': 'Annual_P90_Wage',
+    # Bulk flat files
+    'occ code': 'SOC_Code',
+    'occ title': 'Occupation',
+    'o group': 'Level',
+    'occ group': 'Level',
+    'group': 'Level',
+    'tot emp': 'Employment',
+    'emp prse': 'Employment_RSE',
+    'jobs 1000': 'Jobs_Per_1000',
+    'loc quotient': 'Location_Quotient',
+    'h mean': 'Hourly_Mean_Wage',
+    'a mean': 'Annual_Mean_Wage',
+    'mean prse': 'Wage_RSE',
+    'h pct10': 'Hourly_P10_Wage',
+    'h pct25': 'Hourly_P25_Wage',
+    'h median': 'Hourly_Median_Wage',
+    'h pct75': 'Hourly_P75_Wage',
+    'h pct90': 'Hourly_P90_Wage',
+    'a pct10': 'Annual_P10_Wage',
+    'a pct25': 'Annual_P25_Wage',
+    'a median': 'Annual_Median_Wage',
+    'a pct75': 'Annual_P75_Wage',
+    'a pct90': 'Annual_P90_Wage',
+}
+
+# Canonical frames map onto themselves
+COLUMN_ALIASES.update({col.lower().replace('_', ' '): col for col in CANONICAL_COLUMNS})
+
+# Source level spellings -> SOC_LEVELS (flat files use 'detailed'; older ones also 'all')
+LEVEL_ALIASES = {
+    'all': 'total',
+    'all occupations': 'total',
+    'detailed': 'detail',
+}
+
+# 2024 query layout packs both into one column: "Chief Executives (11-1011)"
+COMBINED_OCCUPATION_COLUMN = 'occupation (soc code)'
+COMBINED_OCCUPATION_PATTERN = r'^\s*(?P<title>.*?)\s*\((?P<code>\d{2}-\d{4})\)\s*$'
+
+def normalize_column_name(name):
+    """'Location Quotient  ()' or 'Location Quotient ()' -> 'location quotient', 'TOT_EMP' -> 'tot emp'"""
+    name = str(name).strip()
+    # Footnote suffix in the query layout; parsed page sources collapse its two spaces to one
+    name = re.sub(r'\s+\(\d*\)$', '', name)
+    name = re.sub(r'[\s_]+', ' ', name)
+    return name.lower()
+
+def map_columns(columns):
+    """Source column -> canonical column for the columns this schema understands"""
+    mapping = {}
+    for col in columns:
+        canonical = COLUMN_ALIASES.get(normalize_column_name(col))
+        if canonical and canonical not in mapping.values():
+            mapping[col] = canonical
+    return mapping
+
+def numeric_columns(columns):
+    """Source columns holding OES values (employment, wages, quotients, RSEs), leaving codes, titles and levels out"""
+    return [col for col, canonical in map_columns(columns).items() if canonical not in TEXT_COLUMNS]
+
+def soc_level(codes):
+    """Hierarchy level implied by SOC codes: 00-0000 total, 11-0000 major, 11-1000 minor, 11-1010 broad"""
+    codes = codes.astype('string').str.strip()
+    level = pd.Series(pd.NA, index=codes.index, dtype='object')
+    level[codes.str.match(r'^\d{2}-\d{4}$', na=False)] = 'detail'
+    level[codes.str.endswith('0', na=False)] = 'broad'
+    level[codes.str.endswith('000', na=False) | codes.isin(TWO_DIGIT_MINOR_GROUPS)] = 'minor'
+    level[codes.str.endswith('0000', na=False)] = 'major'
+    level[codes == '00-0000'] = 'total'
+    return level.astype(CANONICAL_DTYPES['Level'])
+
+def to_canonical(df, year=None, area_code=None):
+    """Convert an OES frame of any known layout to the canonical typed layout"""
+    columns = {}
+
+    # Split the combined "Title (code)" column first
+    for col in df.columns:
+        if normalize_column_name(col) == COMBINED_OCCUPATION_COLUMN:
+            parts = df[col].astype('string').str.extract(COMBINED_OCCUPATION_PATTERN)
+            columns['Occupation'] = parts['title'].fillna(df[col].astype('string').str.strip())
+            columns['SOC_Code'] = parts['code']
+            break
+
+    for col, canonical in map_columns(df.columns).items():
+        if canonical in columns:
+            continue
+        if canonical in TEXT_COLUMNS:
+            columns[canonical] = df[col].astype('string').str.strip()
+        else:
+            columns[canonical], _, _ = parse_oes_column(df[col])
+
+    if 'Level' in columns:
+        level = columns['Level'].str.lower().replace(LEVEL_ALIASES)
+        level = level.where(level.isin(SOC_LEVELS)).astype(CANONICAL_DTYPES['Level'])
+        # Spellings not recognized fall back to the level the code implies
+        if 'SOC_Code' in columns:
+            level = level.fillna(soc_level(columns['SOC_Code']))
+        columns['Level'] = level
+    elif 'SOC_Code' in columns:
+        columns['Level'] = soc_level(columns['SOC_Code'])
+
+    canonical_df = pd.DataFrame(index=df.index)
+    if year is not None:
+        canonical_df['Year'] = pd.Series(year, index=df.index, dtype='Int16')
+    if area_code is not None:
+        canonical_df['Area_Code'] = pd.Series(str(area_code), index=df.index, dtype='category')
+
+    for col, dtype in CANONICAL_DTYPES.items():
+        values = columns.get(col)
+        if values is None:
+            canonical_df[col] = pd.Series(pd.NA if dtype == 'Int32' else None, index=df.index).astype(dtype)
+        elif dtype == 'Int32':
+            canonical_df[col] = values.round().astype('Int32')
+        elif dtype == 'category':
+            # Plain object values so categories get the default string dtype
+            canonical_df[col] = values.astype(object).astype(dtype)
+        else:
+            canonical_df[col] = values.astype(dtype)
+
+    # Drop blank rows, repeated header rows and footnotes: none of them carry a SOC code
+    # (a layout without SOC codes keeps every row with a title)
+    keep = canonical_df['SOC_Code'].notna() if 'SOC_Code' in columns else canonical_df['Occupation'].notna()
+    return canonical_df[keep].reset_index(drop=True)
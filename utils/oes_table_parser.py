@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Targeted OES Table Parser
+Stream-parse saved page sources with lxml and convert only the table whose header matches
+"""
+
+import os
+import re
+from io import BytesIO, StringIO
+
+import pandas as pd
+from lxml import etree, html as lxml_html
+from pandas.io.parsers import TextParser
+
+from oes_metrics import file_read, instrument
+
+# Same whitespace handling pd.read_html applies to cell text
+WHITESPACE_RE = re.compile(r"[\r\n]+|\s{2,}")
+
+def as_source(source):
+    """Accept a file path, raw bytes/str or a file-like object"""
+    if isinstance(source, bytes):
+        return BytesIO(source)
+    if isinstance(source, str) and not os.path.exists(source) and '<' in source:
+        return BytesIO(source.encode('utf-8'))
+    return source
+
+def header_text(table):
+    """Lower-cased header text of a table element"""
+    cells = table.xpath('./thead//th') or table.xpath('.//tr[1]/th | .//tr[1]/td')
+    return ' '.join(''.join(cell.itertext()) for cell in cells).lower()
+
+def find_table_by_header(source, keywords):
+    """Return the first <table> element whose header mentions any keyword
+
+    Tables that do not match are cleared as soon as they are closed, so only
+    the target table is ever kept in memory.
+    """
+    keywords = [keyword.lower() for keyword in keywords]
+
+    for _, table in etree.iterparse(as_source(source), events=('end',), tag='table', html=True, huge_tree=True):
+        text = header_text(table)
+        if any(keyword in text for keyword in keywords):
+            return table
+
+        # Free the rejected table and anything parsed before it
+        table.clear()
+        parent = table.getparent()
+        while parent is not None and table.getprevious() is not None:
+            del parent[0]
+
+    return None
+
+def cell_text(cell):
+    return WHITESPACE_RE.sub(" ", ''.join(cell.itertext()).strip())
+
+def table_to_dataframe(table):
+    """Convert one table element into a DataFrame with pd.read_html's typing"""
+    # Spanning cells need read_html's full layout logic
+    if table.xpath('.//*[(self::td or self::th) and ((@colspan and @colspan != "1") or (@rowspan and @rowspan != "1"))]'):
+        return pd.read_html(StringIO(etree.tostring(table, encoding='unicode', method='html')))[0]
+
+    # Last header row made of <th> cells; DataTables adds hidden helper rows of <td>
+    header_rows = [row for row in table.xpath('./thead/tr') if row.xpath('./th')]
+    body_rows = table.xpath('./tbody/tr') or table.xpath('./tr')
+    if header_rows:
+        header = [cell_text(cell) for cell in header_rows[-1].xpath('./th')]
+    elif body_rows and body_rows[0].xpath('./th'):
+        header = [cell_text(cell) for cell in body_rows[0].xpath('./th')]
+        body_rows = body_rows[1:]
+    else:
+        header = None
+
+    rows = [[cell_text(cell) for cell in row.xpath('./td | ./th')] for row in body_rows]
+    rows = [row for row in rows if row]
+    if not rows:
+        return None
+
+    width = len(header) if header else max(len(row) for row in rows)
+    rows = [row[:width] + [''] * (width - len(row)) for row in rows]
+    if header is None:
+        return TextParser(rows, header=None, thousands=',').read()
+    return TextParser([header] + rows, header=0, thousands=',').read()
+
+@instrument('read_table', expect_result=True)
+def read_target_table(source, keywords=('location quotient',)):
+    """Convert only the matching table into a DataFrame (None if there is none)"""
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    if isinstance(source, str) and os.path.exists(source):
+        file_read(source)
+
+    table = find_table_by_header(source, keywords)
+    if table is None:
+        return None
+
+    return table_to_dataframe(table)
+
+def table_html_matches(table_html, keywords):
+    """Cheap header check on one table's outerHTML, without building a DataFrame"""
+    fragment = lxml_html.fragment_fromstring(table_html)
+    tables = [fragment] if fragment.tag == 'table' else fragment.xpath('.//table')
+    if not tables:
+        return False
+    text = header_text(tables[0])
+    return any(keyword.lower() in text for keyword in keywords)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+OES Value Parser
+Split footnote-prefixed OES cells like "()  $113.23" or "(5)  -" into numbers, footnote codes and null reasons
+"""
+
+import numpy as np
+import pandas as pd
+
+# Optional "(n)" footnote prefix followed by the displayed value
+CELL_PATTERN = r'^\s*(?:\((?P<footnote>\d*)\))?\s*(?P<value>.*?)\s*$'
+
+# Why a cell has no numeric value
+NULL_REASON_NONE = 0
+NULL_REASON_DASH = 1
+NULL_REASON_HASH = 2
+NULL_REASON_STAR = 3
+NULL_REASON_DOUBLE_STAR = 4
+NULL_REASON_FOOTNOTE_ONLY = 5
+NULL_REASON_EMPTY = 6
+NULL_REASON_UNPARSED = 7
+
+NULL_REASONS = {
+    NULL_REASON_NONE: 'value',
+    NULL_REASON_DASH: 'not available (-)',
+    NULL_REASON_HASH: 'wage at or above the top of the reported range (#)',
+    NULL_REASON_STAR: 'estimate not released (*)',
+    NULL_REASON_DOUBLE_STAR: 'employment estimate not released (**)',
+    NULL_REASON_FOOTNOTE_ONLY: 'footnote only',
+    NULL_REASON_EMPTY: 'empty',
+    NULL_REASON_UNPARSED: 'unparsed text',
+}
+
+# Suppression markers shown in place of a value
+NULL_MARKERS = {
+    '-': NULL_REASON_DASH,
+    '#': NULL_REASON_HASH,
+    '*': NULL_REASON_STAR,
+    '**': NULL_REASON_DOUBLE_STAR,
+}
+
+def parse_oes_column(series):
+    """Parse one column into (float64 values, int8 footnote codes, int8 null reasons)"""
+    index = series.index
+
+    # Columns that are already numeric only need their nulls labelled
+    if pd.api.types.is_numeric_dtype(series):
+        values = series.astype('float64')
+        footnotes = pd.Series(np.zeros(len(series), dtype='int8'), index=index)
+        reasons = pd.Series(np.where(values.isna(), NULL_REASON_EMPTY, NULL_REASON_NONE).astype('int8'), index=index)
+        return values, footnotes, reasons
+
+    text = series.astype('string')
+    parts = text.str.extract(CELL_PATTERN)
+
+    footnotes = pd.to_numeric(parts['footnote'], errors='coerce').fillna(0).astype('int8')
+
+    raw = parts['value'].fillna('')
+    values = pd.to_numeric(raw.str.replace(r'[$,%]', '', regex=True), errors='coerce').astype('float64')
+
+    marker = raw.map(NULL_MARKERS)
+    reasons = np.select(
+        [values.notna().to_numpy(),
+         marker.notna().to_numpy(),
+         ((raw == '') & parts['footnote'].notna()).to_numpy(),
+         (raw == '').to_numpy()],
+        [NULL_REASON_NONE,
+         marker.fillna(0).to_numpy(),
+         NULL_REASON_FOOTNOTE_ONLY,
+         NULL_REASON_EMPTY],
+        default=NULL_REASON_UNPARSED,
+    ).astype('int8')
+
+    return values, footnotes, pd.Series(reasons, index=index)
+
+def parse_oes_values(df, columns=None):
+    """Parse value columns; return (numeric DataFrame, long table of footnote and null reason codes)
+
+    The code table has one row per cell that carries a footnote or has no value,
+    keyed by row index and column name.
+    """
+    columns = list(df.columns if columns is None else columns)
+
+    values = {}
+    codes = []
+    for col in columns:
+        col_values, footnotes, reasons = parse_oes_column(df[col])
+        values[col] = col_values
+
+        flagged = (footnotes != 0) | (reasons != NULL_REASON_NONE)
+        if flagged.any():
+            codes.append(pd.DataFrame({
+                'Row': df.index[flagged.to_numpy()],
+                'Column': col,
+                'Footnote': footnotes[flagged].to_numpy(),
+                'Null_Reason': reasons[flagged].to_numpy(),
+            }))
+
+    if codes:
+        code_table = pd.concat(codes, ignore_index=True)
+    else:
+        code_table = pd.DataFrame({'Row': pd.Series(dtype='int64'), 'Column': pd.Series(dtype='object'),
+                                   'Footnote': pd.Series(dtype='int8'), 'Null_Reason': pd.Series(dtype='int8')})
+
+    return pd.DataFrame(values, index=df.index), code_table
+
+def describe_null_reasons(code_table):
+    """Count of null cells per column and reason, with readable labels"""
+    nulls = code_table[code_table['Null_Reason'] != NULL_REASON_NONE]
+    counts = nulls.groupby(['Column', 'Null_Reason']).size().reset_index(name='Cells')
+    counts['Reason'] = counts['Null_Reason'].map(NULL_REASONS)
+    return counts
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+OES Panel Comparison
+Compare location quotients across any number of years and areas: change, percent change, CAGR and rank movement
+"""
+
+import argparse
+import itertools
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from oes_dataset import DATASET_DIR, parse_years, read_dataset
+from oes_metrics import file_written, quiet_output
+from oes_schema import soc_level, to_canonical
+
+# Output column prefix per measure ('LQ_From'); other measures use their own name ('Employment_From')
+MEASURE_PREFIXES = {'Location_Quotient': 'LQ'}
+
+class Panel:
+    """One measure aligned on SOC as an area x SOC x year array"""
+
+    def __init__(self, values, areas, soc_codes, years, occupations=None, measure='Location_Quotient'):
+        self.values = values
+        self.areas = list(areas)
+        self.soc_codes = list(soc_codes)
+        self.years = [int(year) for year in years]
+        self.occupations = occupations or {}
+        self.measure = measure
+
+def panel_from_frame(df, measure='Location_Quotient'):
+    """Align a canonical frame with Year and Area_Code columns on SOC in one pass"""
+    df = df[df['SOC_Code'].notna() & df[measure].notna()]
+
+    area_idx, areas = pd.factorize(df['Area_Code'].astype(str), sort=True)
+    soc_idx, soc_codes = pd.factorize(df['SOC_Code'].astype(str), sort=True)
+    year_idx, years = pd.factorize(df['Year'].astype(int), sort=True)
+
+    values = np.full((len(areas), len(soc_codes), len(years)), np.nan)
+    # Canonical measures are float32; round away the widening noise (0.74 -> 0.7400000095)
+    values[area_idx, soc_idx, year_idx] = df[measure].to_numpy(dtype='float64', na_value=np.nan).round(4)
+
+    occupations = {}
+    if 'Occupation' in df.columns:
+        titles = df.sort_values('Year').drop_duplicates('SOC_Code', keep='last')
+        occupations = dict(zip(titles['SOC_Code'].astype(str), titles['Occupation'].astype(str)))
+
+    return Panel(values, areas, soc_codes, years, occupations, measure)
+
+def panel_from_frames(frames, measure='Location_Quotient'):
+    """Build a panel from (year, area_code, frame) tuples in any OES layout"""
+    canonical = [to_canonical(df, year=year, area_code=area_code) for year, area_code, df in frames]
+    for df in canonical:
+        df['Area_Code'] = df['Area_Code'].astype(str)
+        df['SOC_Code'] = df['SOC_Code'].astype(str)
+        df['Occupation'] = df['Occupation'].astype(str)
+    return panel_from_frame(pd.concat(canonical, ignore_index=True), measure)
+
+def panel_from_dataset(dataset_dir=DATASET_DIR, years=None, areas=None, measure='Location_Quotient'):
+    """Build a panel from the Parquet dataset, reading only the needed columns and partitions"""
+    filters = {}
+    if years:
+        filters['Year'] = list(years)
+    if areas:
+        filters['Area_Code'] = list(areas)
+    df = read_dataset(dataset_dir, columns=['Year', 'Area_Code', 'SOC_Code', 'Occupation', measure],
+                      filters=filters or None)
+    if df is None or df.empty:
+        return None
+    return panel_from_frame(df, measure)
+
+def rank_within_years(values, levels=None):
+    """Rank of each occupation within its area and year, 1 = highest (ties share the best rank)
+
+    With a SOC level per occupation, each level is ranked on its own, so the total
+    and group rows do not push detailed occupations down the ranking.
+    """
+    n_areas, n_socs, n_years = values.shape
+    flat = values.transpose(0, 2, 1).reshape(n_areas * n_years, n_socs)
+    groups = np.zeros(n_socs, dtype='int64') if levels is None else pd.factorize(pd.Series(levels))[0]
+    ranks = np.empty(flat.shape)
+    for group in np.unique(groups):
+        columns = groups == group
+        ranks[:, columns] = pd.DataFrame(flat[:, columns]).rank(axis=1, ascending=False, method='min').to_numpy()
+    return ranks.reshape(n_areas, n_years, n_socs).transpose(0, 2, 1)
+
+def year_pairs(years, pairs='all'):
+    """Index pairs to compare: every pair, consecutive years, or each year against the first"""
+    n = len(years)
+    if pairs == 'all':
+        return list(itertools.combinations(range(n), 2))
+    if pairs == 'consecutive':
+        return [(i, i + 1) for i in range(n - 1)]
+    if pairs == 'base':
+        return [(0, j) for j in range(1, n)]
+    index = {year: i for i, year in enumerate(years)}
+    return [(index[int(start)], index[int(end)]) for start, end in pairs]
+
+def compare_panel(panel, pairs='all'):
+    """Change, percent change, CAGR and rank movement for every area, occupation and year pair"""
+    n_areas, n_socs, n_years = panel.values.shape
+    years = np.array(panel.years)
+
+    # Year-major copies so each year is one contiguous row of area x SOC cells
+    values = np.ascontiguousarray(panel.values.transpose(2, 0, 1).reshape(n_years, -1))
+    levels = soc_level(pd.Series(panel.soc_codes)).to_numpy()
+    ranks = np.ascontiguousarray(rank_within_years(panel.values, levels).transpose(2, 0, 1).reshape(n_years, -1))
+    present = ~np.isnan(values)
+
+    pair_index = year_pairs(panel.years, pairs)
+    masks = [np.flatnonzero(present[i] & present[j]) for i, j in pair_index]
+    total = sum(len(cells) for cells in masks)
+    if not total:
+        return pd.DataFrame()
+
+    cells = np.empty(total, dtype='int64')
+    year_from = np.empty(total, dtype='int16')
+    year_to = np.empty(total, dtype='int16')
+    start = np.empty(total)
+    end = np.empty(total)
+    rank_start = np.empty(total, dtype='int32')
+    rank_end = np.empty(total, dtype='int32')
+    span = np.empty(total)
+
+    offset = 0
+    for (i, j), pair_cells in zip(pair_index, masks):
+        segment = slice(offset, offset + len(pair_cells))
+        cells[segment] = pair_cells
+        year_from[segment] = years[i]
+        year_to[segment] = years[j]
+        start[segment] = values[i, pair_cells]
+        end[segment] = values[j, pair_cells]
+        rank_start[segment] = ranks[i, pair_cells]
+        rank_end[segment] = ranks[j, pair_cells]
+        span[segment] = years[j] - years[i]
+        offset += len(pair_cells)
+
+    change = end - start
+    positive = start > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent_change = np.where(positive, change / start * 100, 0.0)
+        cagr = np.where(positive & (end >= 0), (end / start) ** (1.0 / span) - 1, np.nan) * 100
+
+    prefix = MEASURE_PREFIXES.get(panel.measure, panel.measure)
+    comparison = pd.DataFrame({
+        'Area_Code': pd.Categorical.from_codes(cells // n_socs, panel.areas),
+        'SOC_Code': pd.Categorical.from_codes(cells % n_socs, panel.soc_codes),
+        'Year_From': year_from,
+        'Year_To': year_to,
+        f'{prefix}_From': start,
+        f'{prefix}_To': end,
+        'Change': change,
+        'Percent_Change': percent_change,
+        'CAGR_Percent': cagr,
+        'Rank_From': rank_start,
+        'Rank_To': rank_end,
+        # Positive = moved up the area's ranking
+        'Rank_Change': rank_start - rank_end,
+    })
+
+    if panel.occupations:
+        comparison.insert(2, 'Occupation', comparison['SOC_Code'].map(panel.occupations))
+    return comparison
+
+def summarize_comparison(comparison):
+    """Per area and year pair: occupations compared, increases, decreases and mean change"""
+    keys = ['Area_Code', 'Year_From', 'Year_To']
+    flags = comparison[keys].assign(Increased=comparison['Change'] > 0, Decreased=comparison['Change'] < 0,
+                                    Change=comparison['Change'], Percent_Change=comparison['Percent_Change'])
+    grouped = flags.groupby(keys, observed=True)
+    summary = grouped.agg(Occupations=('Change', 'size'), Increased=('Increased', 'sum'),
+                          Decreased=('Decreased', 'sum'), Mean_Change=('Change', 'mean'),
+                          Mean_Percent_Change=('Percent_Change', 'mean'))
+    return summary.reset_index()
+
+def main():
+    """Main function to compare location quotients across a multi-year panel"""
+    parser = argparse.ArgumentParser(description="Compare OES location quotients across years and areas")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Parquet dataset directory")
+    parser.add_argument("--years", help="Years to include, e.g. 2012-2024 (all by default)")
+    parser.add_argument("--areas", nargs="*", help="Area codes to include (all by default)")
+    parser.add_argument("--pairs", default="all", choices=["all", "consecutive", "base"], help="Year pairs to compare")
+    parser.add_argument("--output", default=os.path.join("oes_data", "lq_panel_comparison.csv"),
+                        help="Output file (.csv or .parquet)")
+    args = parser.parse_args()
+
+    print("🚀 Comparing OES location quotient panel")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    panel = panel_from_dataset(args.dataset, parse_years(args.years) if args.years else None, args.areas)
+    if panel is None:
+        print(f"❌ No data in dataset: {args.dataset}")
+        return
+    print(f"📊 Panel: {len(panel.areas)} areas x {len(panel.soc_codes)} occupations x {len(panel.years)} years")
+
+    comparison = compare_panel(panel, args.pairs)
+    elapsed = time.perf_counter() - start
+    print(f"📊 {len(comparison)} comparisons in {elapsed:.2f}s")
+    if comparison.empty:
+        print("❌ No year pairs with overlapping data")
+        return
+
+    summary = summarize_comparison(comparison)
+    print(summary.to_string(index=False))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    if args.output.endswith('.parquet'):
+        comparison.to_parquet(args.output, index=False)
+    else:
+        comparison.to_csv(args.output, index=False)
+    file_written(args.output)
+    print(f"\n💾 Panel comparison saved to {args.output}")
+
+if __name__ == "__main__":
+    with quiet_output():
+        main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+OES Pipeline Runner
+Run scrape -> process -> analyze -> compare as a dependency graph, rerunning only stages whose inputs changed
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from oes_metrics import quiet_output
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+STATE_FILE = os.path.join("oes_data", "pipeline_state.json")
+LOG_DIR = os.path.join("oes_data", "pipeline_logs")
+
+# Scraped pages are reused for as long as the page cache keeps them fresh
+SCRAPE_MAX_AGE = 7 * 24 * 3600
+
+# Directories whose modules count as a stage's code
+CODE_DIRS = ['scrapers', 'utils']
+
+class Stage:
+    """One step of the pipeline: a command with declared input and output files"""
+
+    def __init__(self, name, command, inputs=(), outputs=(), deps=(), sources=(), max_age=None):
+        self.name = name
+        self.command = list(command)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.sources = list(sources)
+        # Seconds after which the stage reruns even with unchanged inputs (e.g. scrapes)
+        self.max_age = max_age
+
+def script_stage(name, script, **kwargs):
+    """Stage that runs a repo script; its code and the local modules it imports are fingerprinted"""
+    return Stage(name, [sys.executable, script], sources=local_sources(script), **kwargs)
+
+def local_sources(script, root=REPO_ROOT):
+    """The script plus every scrapers/ or utils/ module it imports, directly or indirectly"""
+    pending = [script]
+    found = []
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.append(path)
+        with open(os.path.join(root, path), 'r', encoding='utf-8') as f:
+            source = f.read()
+        for module in re.findall(r'^\s*(?:from|import)\s+(\w+)', source, re.MULTILINE):
+            for code_dir in CODE_DIRS:
+                candidate = os.path.join(code_dir, module + '.py')
+                if os.path.exists(os.path.join(root, candidate)):
+                    pending.append(candidate)
+    return sorted(found)
+
+def oes_stages():
+    """The Riverside workflow: both scrapes, their processing steps and the 2019/2024 comparison"""
+    dataset = os.path.join("oes_data", "dataset")
+    return [
+        script_stage("scrape_2024", os.path.join("scrapers", "selenium_oes_scraper.py"),
+                     outputs=[os.path.join("oes_data", "riverside_oes_selenium_data.csv")],
+                     max_age=SCRAPE_MAX_AGE),
+        script_stage("scrape_2019", os.path.join("scrapers", "selenium_oes_scraper_2019.py"),
+                     outputs=[os.path.join("oes_data_2019", "riverside_oes_2019_selenium_data.csv")],
+                     max_age=SCRAPE_MAX_AGE),
+        script_stage("process_2024", os.path.join("utils", "process_extracted_data.py"),
+                     deps=["scrape_2024"],
+                     inputs=[os.path.join("oes_data", "bls_oes_page_source.html")],
+                     outputs=[os.path.join("oes_data", "riverside_oes_cleaned_data.csv"),
+                              os.path.join("oes_data", "riverside_oes_analysis_results.csv"),
+                              os.path.join("oes_data", "riverside_location_quotient_report.csv"),
+                              os.path.join(dataset, "Year=2024", "part-0.parquet")]),
+        script_stage("analyze_2019", os.path.join("utils", "analyze_2019_data.py"),
+                     deps=["scrape_2019"],
+                     inputs=[os.path.join("oes_data_2019", "riverside_oes_2019_selenium_data.csv")],
+                     outputs=[os.path.join("oes_data_2019", "riverside_oes_2019_analysis_results.csv"),
+                              os.path.join("oes_data_2019", "riverside_location_quotient_2019_report.csv"),
+                              os.path.join(dataset, "Year=2019", "part-0.parquet")]),
+        script_stage("compare", os.path.join("utils", "compare_2019_2024.py"),
+                     deps=["process_2024", "analyze_2019"],
+                     inputs=[os.path.join(dataset, "Year=2019", "part-0.parquet"),
+                             os.path.join(dataset, "Year=2024", "part-0.parquet"),
+                             os.path.join("oes_data_2019", "riverside_oes_2019_selenium_data.csv"),
+                             os.path.join("oes_data", "riverside_oes_selenium_data.csv")],
+                     outputs=[os.path.join("oes_data", "riverside_location_quotient_comparison_2019_2024.csv")]),
+    ]
+
+class Pipeline:
+    """Runs stages in dependency order, in parallel where branches are independent"""
+
+    def __init__(self, stages, root=REPO_ROOT, state_file=STATE_FILE, log_dir=LOG_DIR):
+        self.stages = {stage.name: stage for stage in stages}
+        self.root = root
+        self.state_file = os.path.join(root, state_file)
+        self.log_dir = os.path.join(root, log_dir)
+        self._lock = threading.Lock()
+        self.state = self._load_state()
+        self.order = self._topological_order()
+
+    def _load_state(self):
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'stages': {}, 'files': {}}
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        temp_path = self.state_file + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.state_file)
+
+    def _topological_order(self):
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+
+        order, done = [], set()
+        remaining = list(self.stages)
+        while remaining:
+            ready = [name for name in remaining if all(dep in done for dep in self.stages[name].deps)]
+            if not ready:
+                raise ValueError(f"Dependency cycle among stages: {', '.join(remaining)}")
+            order.extend(ready)
+            done.update(ready)
+            remaining = [name for name in remaining if name not in done]
+        return order
+
+    def file_hash(self, path):
+        """SHA-256 of a file's content; files whose size and mtime are unchanged are not reread"""
+        full_path = os.path.join(self.root, path)
+        if not os.path.exists(full_path):
+            return None
+        stat = os.stat(full_path)
+        with self._lock:
+            cached = self.state['files'].get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(full_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        with self._lock:
+            self.state['files'][path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def fingerprint(self, stage):
+        """Hash of the stage's command, code and input contents"""
+        digest = hashlib.sha256()
+        # Arguments only: a different interpreter path alone does not make a stage stale
+        digest.update(json.dumps(stage.command[1:]).encode())
+        for path in sorted(stage.sources) + sorted(stage.inputs):
+            digest.update(f"{path}:{self.file_hash(path) or 'missing'}\n".encode())
+        return digest.hexdigest()
+
+    def is_fresh(self, stage, fingerprint):
+        """Same fingerprint as the last successful run, outputs untouched since, and not expired"""
+        with self._lock:
+            record = self.state['stages'].get(stage.name)
+        if record is None or record['fingerprint'] != fingerprint:
+            return False
+        if stage.max_age is not None and time.time() - record['finished'] > stage.max_age:
+            return False
+        return all(self.file_hash(path) == record['outputs'].get(path) for path in stage.outputs)
+
+    def run_stage(self, stage):
+        """Run one stage's command, logging its output; success needs exit 0 and rewritten outputs"""
+        os.makedirs(self.log_dir, exist_ok=True)
+        log_path = os.path.join(self.log_dir, f"{stage.name}.log")
+        started = time.time()
+        with open(log_path, 'w', encoding='utf-8') as log:
+            result = subprocess.run(stage.command, cwd=self.root, stdout=log, stderr=subprocess.STDOUT,
+                                    env=dict(os.environ, PYTHONIOENCODING='utf-8'))
+
+        missing = [path for path in stage.outputs
+                   if not os.path.exists(os.path.join(self.root, path))
+                   or os.path.getmtime(os.path.join(self.root, path)) < started - 1]
+        if result.returncode != 0 or missing:
+            reason = f"exit code {result.returncode}" if result.returncode != 0 else f"not written: {', '.join(missing)}"
+            return False, reason, log_path
+        return True, None, log_path
+
+    def _required(self, targets):
+        """Targets and everything upstream of them"""
+        if not targets:
+            return set(self.stages)
+        required = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name not in required:
+                required.add(name)
+                pending.extend(self.stages[name].deps)
+        return required
+
+    def run(self, targets=None, force=(), workers=4, dry_run=False, assume_fresh=()):
+        """Bring the targets (all stages by default) up to date; returns {stage: status}
+
+        Stages in assume_fresh are not run while their outputs exist (e.g. scrapes when offline).
+        """
+        required = self._required(targets)
+        force = set(force)
+        assume_fresh = set(assume_fresh)
+        status = {}
+
+        def process(name):
+            stage = self.stages[name]
+            if name in assume_fresh and all(self.file_hash(path) for path in stage.outputs):
+                return 'fresh', 0.0, None
+            fingerprint = self.fingerprint(stage)
+            if name not in force and self.is_fresh(stage, fingerprint):
+                return 'fresh', 0.0, None
+            if dry_run:
+                return 'stale', 0.0, None
+
+            print(f"▶️  {name}: running")
+            start = time.perf_counter()
+            ok, reason, log_path = self.run_stage(stage)
+            elapsed = time.perf_counter() - start
+            if not ok:
+                return 'failed', elapsed, f"{reason} (log: {os.path.relpath(log_path, self.root)})"
+
+            # Record outputs as written, against the fingerprint the stage ran with
+            outputs = {path: self.file_hash(path) for path in stage.outputs}
+            with self._lock:
+                self.state['stages'][name] = {'fingerprint': fingerprint, 'finished': time.time(), 'outputs': outputs}
+                self._save_state()
+            return 'ran', elapsed, None
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            running = {}
+            pending = [name for name in self.order if name in required]
+            while pending or running:
+                for name in list(pending):
+                    deps = self.stages[name].deps
+                    if any(status.get(dep) in ('failed', 'skipped') for dep in deps):
+                        status[name] = 'skipped'
+                        pending.remove(name)
+                        print(f"⏭️  {name}: skipped (upstream failed)")
+                    elif dry_run and any(status.get(dep) == 'stale' for dep in deps):
+                        # Stale upstream means this stage will see new inputs
+                        status[name] = 'stale'
+                        pending.remove(name)
+                        print(f"🔄 {name}: stale")
+                    elif all(dep in status for dep in deps):
+                        pending.remove(name)
+                        running[executor.submit(process, name)] = name
+
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    result, elapsed, message = future.result()
+                    status[name] = result
+                    if result == 'fresh':
+                        print(f"✅ {name}: up to date")
+                    elif result == 'stale':
+                        print(f"🔄 {name}: stale")
+                    elif result == 'ran':
+                        print(f"✅ {name}: done in {elapsed:.1f}s")
+                    else:
+                        print(f"❌ {name}: failed after {elapsed:.1f}s - {message}")
+
+        with self._lock:
+            self._save_state()
+        return status
+
+def main():
+    """Main function to run the OES pipeline"""
+    parser = argparse.ArgumentParser(description="Run the OES pipeline, rerunning only stale stages")
+    parser.add_argument("targets", nargs="*", help="Stages to bring up to date (all by default)")
+    parser.add_argument("--force", nargs="*", default=[], help="Stages to rerun even if up to date")
+    parser.add_argument("--workers", type=int, default=4, help="Stages run in parallel")
+    parser.add_argument("--assume-fresh", nargs="*", default=[],
+                        help="Stages to treat as up to date while their outputs exist (e.g. scrape_2024 scrape_2019)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which stages are stale")
+    parser.add_argument("--list", action="store_true", help="List the stages and exit")
+    args = parser.parse_args()
+
+    pipeline = Pipeline(oes_stages())
+
+    if args.list:
+        for name in pipeline.order:
+            stage = pipeline.stages[name]
+            deps = f" (after {', '.join(stage.deps)})" if stage.deps else ""
+            print(f"   {name}{deps}")
+        return
+
+    print("🚀 Running OES pipeline")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    try:
+        status = pipeline.run(args.targets, force=args.force, workers=args.workers, dry_run=args.dry_run,
+                              assume_fresh=args.assume_fresh)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    counts = {result: list(status.values()).count(result) for result in sorted(set(status.values()))}
+    print(f"\n📊 {', '.join(f'{count} {result}' for result, count in counts.items())} "
+          f"in {time.perf_counter() - start:.2f}s")
+    if any(result in ('failed', 'skipped') for result in status.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    with quiet_output():
+        main()
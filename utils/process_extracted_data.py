@@ -4,11 +4,20 @@ Process Extracted BLS OES Data
 Extract and analyze Riverside location quotient data from the saved HTML
 """
 
+import numpy as np
 import pandas as pd
 import os
-from io import StringIO
 import re
+from oes_table_parser import read_target_table
+from oes_value_parser import parse_oes_values
+from oes_dataset import store_area_year
+from oes_schema import numeric_columns
+from oes_metrics import file_written, instrument, quiet_output
+from lq_report import CATEGORY_EDGES, distribution, lq_report, summary_stats, top_bottom
 
+RIVERSIDE_AREA_CODE = "0040140"
+
+@instrument('process_page', expect_result=True)
 def process_extracted_html():
     """Process the extracted HTML data"""
     print("🔍 Processing extracted BLS OES HTML data...")
@@ -21,42 +30,39 @@ def process_extracted_html():
         return None
     
     try:
-        with open(html_file, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        print(f"✅ Successfully read HTML file ({len(html_content)} characters)")
+        print(f"✅ Found HTML file ({os.path.getsize(html_file)} bytes)")
         
-        # Extract tables from HTML
-        tables = pd.read_html(StringIO(html_content))
-        print(f"📊 Found {len(tables)} tables in HTML")
-        
-        # Find the main data table (should be the one with 780 rows and 18 columns)
-        main_table = None
-        for i, table in enumerate(tables):
-            print(f"📋 Table {i+1}: {table.shape} columns: {list(table.columns)}")
-            
-            # Look for the table with Location Quotient column
-            if 'Location Quotient' in str(table.columns):
-                main_table = table
-                print(f"✅ Found main data table: Table {i+1}")
-                break
+        # Stream the page and convert only the table with the Location Quotient column
+        main_table = read_target_table(html_file, 'Location Quotient')
         
         if main_table is None:
             print("❌ Could not find main data table with Location Quotient column")
             return None
         
+        print("✅ Found main data table")
         print(f"📊 Main table shape: {main_table.shape}")
         print(f"📋 Main table columns: {list(main_table.columns)}")
         
         # Clean up the data
-        cleaned_table = clean_oes_data(main_table)
+        cleaned_table, value_codes = clean_oes_data(main_table, return_codes=True)
         
         if cleaned_table is not None:
             # Save the cleaned data
             output_file = os.path.join("oes_data", "riverside_oes_cleaned_data.csv")
             cleaned_table.to_csv(output_file, index=False)
+            file_written(output_file)
             print(f"💾 Cleaned data saved to {output_file}")
             
+            # Footnote and null reason codes for cells that carry them
+            if value_codes is not None:
+                codes_file = os.path.join("oes_data", "riverside_oes_value_codes.csv")
+                value_codes.to_csv(codes_file, index=False)
+                file_written(codes_file)
+                print(f"💾 Value codes saved to {codes_file}")
+            
+            # Columnar copy for queries across years and areas (the schema does its own cleaning)
+            store_area_year(main_table, 2024, RIVERSIDE_AREA_CODE)
+            
             # Analyze the data
             analyze_oes_data(cleaned_table)
             
@@ -69,8 +75,9 @@ def process_extracted_html():
         print(f"❌ Error processing HTML: {e}")
         return None
 
-def clean_oes_data(df):
-    """Clean and process the OES data"""
+@instrument('clean')
+def clean_oes_data(df, return_codes=False, drop_header_rows=True):
+    """Clean and process the OES data (optionally also return footnote/null reason codes)"""
     print("🧹 Cleaning OES data...")
     
     try:
@@ -96,23 +103,25 @@ def clean_oes_data(df):
             df = df[df[occupation_col].notna()]
             df = df[df[occupation_col].astype(str).str.strip() != '']
             
-            # Remove header rows (rows that contain column names)
-            header_indicators = ['occupation', 'soc code', 'employment', 'wage']
-            df = df[~df[occupation_col].astype(str).str.lower().str.contains('|'.join(header_indicators), na=False)]
-        
-        # Clean Location Quotient column specifically
-        lq_col = None
-        for col in df.columns:
-            if 'location quotient' in col.lower():
-                lq_col = col
-                break
-        
-        if lq_col:
-            print(f"🔧 Cleaning Location Quotient column: {lq_col}")
-            # Remove the "()  " prefix and convert to numeric
-            df[lq_col] = df[lq_col].astype(str).str.replace(r'\(\)\s*', '', regex=True)
-            df[lq_col] = pd.to_numeric(df[lq_col], errors='coerce')
-            print(f"✅ Location Quotient column cleaned")
+            # Remove header rows repeated inside scraped tables. The match is by keyword, so it
+            # would also drop 'All Occupations' and the major groups of sources without them
+            if drop_header_rows:
+                header_indicators = ['occupation', 'soc code', 'employment', 'wage']
+                df = df[~df[occupation_col].astype(str).str.lower().str.contains('|'.join(header_indicators), na=False)]
+        
+        # Split every value cell into a number, a footnote code and a null reason in one pass per column.
+        # Only known value columns: the 2019 'Occupation code' and 'Level' columns stay text
+        value_cols = [col for col in numeric_columns(df.columns) if col != occupation_col]
+        value_codes = None
+        if value_cols:
+            print(f"🔧 Parsing {len(value_cols)} value columns")
+            df = df.copy()
+            values, value_codes = parse_oes_values(df, value_cols)
+            df[value_cols] = values
+            if occupation_col:
+                value_codes.insert(0, 'Occupation', df.loc[value_codes['Row'], occupation_col].to_numpy())
+            value_codes = value_codes.drop(columns='Row')
+            print(f"✅ Value columns parsed ({int((value_codes['Null_Reason'] != 0).sum())} null cells)")
         
         print(f"📊 Cleaned data shape: {df.shape}")
         
@@ -120,12 +129,15 @@ def clean_oes_data(df):
         print("📄 Sample of cleaned data:")
         print(df.head())
         
+        if return_codes:
+            return df, value_codes
         return df
         
     except Exception as e:
         print(f"❌ Error cleaning data: {e}")
-        return None
+        return (None, None) if return_codes else None
 
+@instrument('analyze')
 def analyze_oes_data(df):
     """Analyze the OES data"""
     print("\n📊 ANALYZING LOS ANGELES OES DATA")
@@ -155,48 +167,43 @@ def analyze_oes_data(df):
         df[lq_col] = pd.to_numeric(df[lq_col], errors='coerce')
         
         # Basic statistics
-        lq_stats = df[lq_col].describe()
+        lq_stats = summary_stats(df[lq_col])
         print(f"\n📈 Location Quotient Statistics:")
         print(f"   Count: {lq_stats['count']:.0f}")
         print(f"   Mean: {lq_stats['mean']:.3f}")
-        print(f"   Median: {lq_stats['50%']:.3f}")
+        print(f"   Median: {lq_stats['median']:.3f}")
         print(f"   Min: {lq_stats['min']:.3f}")
         print(f"   Max: {lq_stats['max']:.3f}")
         print(f"   Std: {lq_stats['std']:.3f}")
         
+        occupations = df.iloc[:, 0].astype(str).to_numpy()  # First column should be occupation
+        lq_values = df[lq_col].to_numpy(dtype='float64', na_value=np.nan)
+        top_lq, bottom_lq = top_bottom(lq_values, 10)
+        
         # Find highest LQ occupations
         print(f"\n🏆 TOP 10 HIGHEST LOCATION QUOTIENTS:")
         print("-" * 60)
         
-        top_lq = df.nlargest(10, lq_col)
-        for i, (_, row) in enumerate(top_lq.iterrows(), 1):
-            occupation = str(row.iloc[0])[:50]  # First column should be occupation
-            lq_value = row[lq_col]
-            print(f"{i:2d}. {occupation:<50} LQ: {lq_value:.3f}")
+        for i, pos in enumerate(top_lq, 1):
+            print(f"{i:2d}. {occupations[pos][:50]:<50} LQ: {lq_values[pos]:.3f}")
         
         # Find lowest LQ occupations
         print(f"\n📉 TOP 10 LOWEST LOCATION QUOTIENTS:")
         print("-" * 60)
         
-        bottom_lq = df.nsmallest(10, lq_col)
-        for i, (_, row) in enumerate(bottom_lq.iterrows(), 1):
-            occupation = str(row.iloc[0])[:50]  # First column should be occupation
-            lq_value = row[lq_col]
-            print(f"{i:2d}. {occupation:<50} LQ: {lq_value:.3f}")
+        for i, pos in enumerate(bottom_lq, 1):
+            print(f"{i:2d}. {occupations[pos][:50]:<50} LQ: {lq_values[pos]:.3f}")
         
         # Analyze by LQ categories
         print(f"\n📊 LOCATION QUOTIENT DISTRIBUTION:")
         print("-" * 40)
         
-        high_concentration = df[df[lq_col] > 2.0]
-        moderate_concentration = df[(df[lq_col] > 1.0) & (df[lq_col] <= 2.0)]
-        average_concentration = df[(df[lq_col] > 0.5) & (df[lq_col] <= 1.0)]
-        low_concentration = df[df[lq_col] <= 0.5]
+        low_concentration, average_concentration, moderate_concentration, high_concentration = distribution(lq_values)
         
-        print(f"   High concentration (LQ > 2.0): {len(high_concentration)} occupations")
-        print(f"   Moderate concentration (1.0 < LQ ≤ 2.0): {len(moderate_concentration)} occupations")
-        print(f"   Average concentration (0.5 < LQ ≤ 1.0): {len(average_concentration)} occupations")
-        print(f"   Low concentration (LQ ≤ 0.5): {len(low_concentration)} occupations")
+        print(f"   High concentration (LQ > 2.0): {high_concentration} occupations")
+        print(f"   Moderate concentration (1.0 < LQ ≤ 2.0): {moderate_concentration} occupations")
+        print(f"   Average concentration (0.5 < LQ ≤ 1.0): {average_concentration} occupations")
+        print(f"   Low concentration (LQ ≤ 0.5): {low_concentration} occupations")
         
         # Save analysis results
         analysis_file = os.path.join("oes_data", "riverside_oes_analysis_results.csv")
@@ -205,17 +212,19 @@ def analyze_oes_data(df):
         analysis_summary = pd.DataFrame({
             'Metric': ['Total Occupations', 'High Concentration (LQ>2)', 'Moderate Concentration (1<LQ≤2)', 
                       'Average Concentration (0.5<LQ≤1)', 'Low Concentration (LQ≤0.5)', 'Mean LQ', 'Median LQ'],
-            'Value': [len(df), len(high_concentration), len(moderate_concentration), 
-                     len(average_concentration), len(low_concentration), 
-                     lq_stats['mean'], lq_stats['50%']]
+            'Value': [len(df), high_concentration, moderate_concentration, 
+                     average_concentration, low_concentration, 
+                     lq_stats['mean'], lq_stats['median']]
         })
         
         analysis_summary.to_csv(analysis_file, index=False)
+        file_written(analysis_file)
         print(f"\n💾 Analysis results saved to {analysis_file}")
         
     except Exception as e:
         print(f"❌ Error analyzing data: {e}")
 
+@instrument('report', expect_result=True)
 def create_location_quotient_report(df):
     """Create a comprehensive location quotient report"""
     print("\n📋 CREATING LOCATION QUOTIENT REPORT")
@@ -242,49 +251,22 @@ def create_location_quotient_report(df):
         print("❌ Required columns not found")
         return
     
-    # Create detailed report
-    report_data = []
-    
-    # Sort by location quotient
-    sorted_df = df.sort_values(lq_col, ascending=False)
-    
-    for i, (_, row) in enumerate(sorted_df.iterrows(), 1):
-        occupation = str(row[occupation_col])
-        lq_value = row[lq_col]
-        
-        # Categorize by LQ level
-        if lq_value > 2.0:
-            category = "Very High Concentration"
-        elif lq_value > 1.5:
-            category = "High Concentration"
-        elif lq_value > 1.0:
-            category = "Above Average"
-        elif lq_value > 0.5:
-            category = "Below Average"
-        else:
-            category = "Low Concentration"
-        
-        report_data.append({
-            'Rank': i,
-            'Occupation': occupation,
-            'Location_Quotient': lq_value,
-            'Category': category
-        })
-    
-    # Create report DataFrame
-    report_df = pd.DataFrame(report_data)
+    # Ranks, categories and order in one columnar pass
+    report_df = lq_report(df, occupation_col, lq_col)
     
     # Save report
     report_file = os.path.join("oes_data", "riverside_location_quotient_report.csv")
     report_df.to_csv(report_file, index=False)
+    file_written(report_file)
     print(f"💾 Location quotient report saved to {report_file}")
     
     # Print summary
     print(f"\n📊 REPORT SUMMARY:")
     print(f"   Total occupations analyzed: {len(report_df)}")
-    print(f"   Very High Concentration (LQ > 2.0): {len(report_df[report_df['Location_Quotient'] > 2.0])}")
-    print(f"   High Concentration (LQ > 1.5): {len(report_df[report_df['Location_Quotient'] > 1.5])}")
-    print(f"   Above Average (LQ > 1.0): {len(report_df[report_df['Location_Quotient'] > 1.0])}")
+    category_counts = distribution(report_df['Location_Quotient'], CATEGORY_EDGES)
+    print(f"   Very High Concentration (LQ > 2.0): {category_counts[4]}")
+    print(f"   High Concentration (LQ > 1.5): {category_counts[3:].sum()}")
+    print(f"   Above Average (LQ > 1.0): {category_counts[2:].sum()}")
     
     return report_df
 
@@ -304,6 +286,7 @@ def main():
         print(f"📊 Processed {len(data)} occupations")
         print(f"📁 Files created:")
         print(f"   - oes_data/riverside_oes_cleaned_data.csv")
+        print(f"   - oes_data/riverside_oes_value_codes.csv")
         print(f"   - oes_data/riverside_oes_analysis_results.csv")
         print(f"   - oes_data/riverside_location_quotient_report.csv")
         
@@ -317,4 +300,5 @@ def main():
         print("Please ensure the HTML file exists and contains valid data")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    with quiet_output():
+        main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+OES Shift-Share Decomposition
+Split employment change per area and occupation into national growth, occupation mix and regional competitive parts
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from lq_engine import NATIONAL_AREA_CODE, TOTAL_SOC_CODE
+from oes_dataset import DATASET_DIR, parse_years
+from oes_metrics import file_written, quiet_output
+from oes_schema import soc_level
+from panel_comparison import panel_from_dataset, year_pairs
+
+COMPONENTS = ['National_Growth', 'Occupation_Mix', 'Competitive']
+
+def split_totals(panel):
+    """Detailed occupation employment (area x occupation x year) and area totals (area x year)
+
+    Totals are the 00-0000 rows; area-years without one use the sum of their detailed occupations.
+    Major, minor and broad groups are dropped: they repeat the employment of their detailed
+    occupations, so summing components over every row would count it twice.
+    """
+    codes = pd.Series(panel.soc_codes)
+    is_total = (codes == TOTAL_SOC_CODE).to_numpy()
+    is_detail = (soc_level(codes) == 'detail').to_numpy()
+
+    detail_sums = np.nansum(panel.values[:, is_detail, :], axis=1)
+    totals = panel.values[:, is_total, :][:, 0, :] if is_total.any() else np.full(detail_sums.shape, np.nan)
+    totals = np.where(np.isnan(totals), detail_sums, totals)
+    return panel.values[:, is_detail, :], totals, [code for code, detail in zip(panel.soc_codes, is_detail) if detail]
+
+def baseline_rows(panel, baseline_areas=None):
+    """Rows summed into the baseline: the given areas, else the nation, else every area"""
+    if baseline_areas is None:
+        baseline_areas = [NATIONAL_AREA_CODE] if NATIONAL_AREA_CODE in panel.areas else panel.areas
+    index = {area: i for i, area in enumerate(panel.areas)}
+    try:
+        return np.array([index[str(area)] for area in baseline_areas], dtype='int64')
+    except KeyError as e:
+        raise KeyError(f"Area not in panel: {e.args[0]}")
+
+def shift_share(panel, pairs='all', baseline_areas=None):
+    """Shift-share components for every area, occupation and year pair in one pass
+
+    national growth = E0 * G, occupation mix = E0 * (g_occ - G), competitive = E1 - E0 - both,
+    where G is baseline total growth and g_occ baseline growth of the occupation.
+    """
+    employment, totals, soc_codes = split_totals(panel)
+    rows = baseline_rows(panel, baseline_areas)
+
+    # Baseline occupation employment (occupation x year); an occupation suppressed everywhere stays unknown
+    base = employment[rows]
+    base_employment = np.where(np.isnan(base).all(axis=0), np.nan, np.nansum(base, axis=0))
+    base_totals = np.nansum(totals[rows], axis=0)
+
+    pair_index = np.array(year_pairs(panel.years, pairs), dtype='int64').reshape(-1, 2)
+    if not len(pair_index):
+        return pd.DataFrame()
+    start, end = pair_index[:, 0], pair_index[:, 1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        total_growth = base_totals[end] / base_totals[start] - 1                     # pair
+        occupation_growth = base_employment[:, end] / base_employment[:, start] - 1  # occupation x pair
+
+    # Every (area, occupation, pair) cell with both years and a finite baseline growth
+    valid = (~np.isnan(employment[:, :, start]) & ~np.isnan(employment[:, :, end])
+             & np.isfinite(occupation_growth)[np.newaxis] & np.isfinite(total_growth)[np.newaxis, np.newaxis])
+    area_idx, soc_idx, pair_idx = np.nonzero(valid)
+
+    employment_from = employment[area_idx, soc_idx, start[pair_idx]]
+    employment_to = employment[area_idx, soc_idx, end[pair_idx]]
+    change = employment_to - employment_from
+    national = employment_from * total_growth[pair_idx]
+    mix = employment_from * (occupation_growth[soc_idx, pair_idx] - total_growth[pair_idx])
+    competitive = change - national - mix
+
+    years = np.array(panel.years, dtype='int16')
+    result = pd.DataFrame({
+        'Area_Code': pd.Categorical.from_codes(area_idx, panel.areas),
+        'SOC_Code': pd.Categorical.from_codes(soc_idx, soc_codes),
+        'Year_From': years[start[pair_idx]],
+        'Year_To': years[end[pair_idx]],
+        'Employment_From': employment_from,
+        'Employment_To': employment_to,
+        'Change': change,
+        'National_Growth': national,
+        'Occupation_Mix': mix,
+        'Competitive': competitive,
+    })
+    if panel.occupations:
+        result.insert(2, 'Occupation', result['SOC_Code'].map(panel.occupations))
+    return result
+
+def summarize_shift_share(result):
+    """Per area and year pair: employment change and each component, summed over occupations"""
+    keys = ['Area_Code', 'Year_From', 'Year_To']
+    summary = result.groupby(keys, observed=True)[['Change'] + COMPONENTS].sum()
+    return summary.reset_index()
+
+def main():
+    """Main function to run a shift-share decomposition over the OES dataset"""
+    parser = argparse.ArgumentParser(description="Shift-share decomposition of OES employment change")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Parquet dataset directory")
+    parser.add_argument("--years", help="Years to include, e.g. 2019,2024 or 2012-2024 (all by default)")
+    parser.add_argument("--areas", nargs="*", help="Area codes to include (all by default)")
+    parser.add_argument("--baseline-areas", nargs="*",
+                        help="Areas summed into the baseline (area 99 if stored, else every area)")
+    parser.add_argument("--pairs", default="consecutive", choices=["all", "consecutive", "base"],
+                        help="Year pairs to decompose")
+    parser.add_argument("--output", default=os.path.join("oes_data", "shift_share.csv"),
+                        help="Output file (.csv or .parquet)")
+    args = parser.parse_args()
+
+    print("🚀 OES shift-share decomposition")
+    print("=" * 50)
+
+    areas = None
+    if args.areas:
+        # The baseline areas have to be read as well
+        areas = sorted(set(args.areas) | set(args.baseline_areas or [NATIONAL_AREA_CODE]))
+
+    start = time.perf_counter()
+    panel = panel_from_dataset(args.dataset, parse_years(args.years) if args.years else None, areas,
+                               measure='Employment')
+    if panel is None:
+        print(f"❌ No data in dataset: {args.dataset}")
+        return
+    print(f"📊 Panel: {len(panel.areas)} areas x {len(panel.soc_codes)} occupations x {len(panel.years)} years")
+
+    try:
+        result = shift_share(panel, args.pairs, args.baseline_areas)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return
+    if args.areas:
+        result = result[result['Area_Code'].isin(args.areas)]
+    print(f"📊 {len(result)} decompositions in {time.perf_counter() - start:.2f}s")
+    if result.empty:
+        print("❌ No year pairs with overlapping employment")
+        return
+
+    print(summarize_shift_share(result).round(0).to_string(index=False))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    if args.output.endswith('.parquet'):
+        result.to_parquet(args.output, index=False)
+    else:
+        result.to_csv(args.output, index=False)
+    file_written(args.output)
+    print(f"\n💾 Shift-share results saved to {args.output}")
+
+if __name__ == "__main__":
+    with quiet_output():
+        main()
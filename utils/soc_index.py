@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+SOC Code Index
+Integer SOC keys with major/minor/broad hierarchy keys, and hash joins of OES frames on them
+"""
+
+import numpy as np
+import pandas as pd
+
+# "11-1011" anywhere in a cell, including the "(11-1011)" suffix of the 2024 layout
+SOC_PATTERN = r'(\d{2})-(\d{4})'
+
+MISSING_KEY = -1
+
+# Minor groups numbered XX-XX00 instead of XX-X000: SOC 2018 15-1200 (Computer Occupations),
+# 31-1100 (Home Health and Personal Care Aides ...) and 51-5100 (Printing Workers), plus
+# SOC 2010's 15-1100 (Computer Occupations) for older vintages
+TWO_DIGIT_MINOR_GROUPS = ['15-1100', '15-1200', '31-1100', '51-5100']
+
+def soc_keys(codes):
+    """Vectorized '11-1011' or 'Chief Executives (11-1011)' -> 111011; unparseable -> -1"""
+    parts = pd.Series(codes).astype('string').str.extract(SOC_PATTERN)
+    keys = pd.to_numeric(parts[0] + parts[1], errors='coerce')
+    return keys.fillna(MISSING_KEY).astype('int32').to_numpy()
+
+def format_soc(keys):
+    """111011 -> '11-1011'"""
+    keys = np.asarray(keys)
+    return [f"{key // 10000:02d}-{key % 10000:04d}" if key >= 0 else None for key in keys]
+
+TWO_DIGIT_MINOR_KEYS = soc_keys(TWO_DIGIT_MINOR_GROUPS)
+
+def hierarchy_keys(keys):
+    """Major, minor and broad group keys for each SOC key (11-1011 -> 11-0000, 11-1000, 11-1010; 15-1252 -> 15-1200)"""
+    keys = np.asarray(keys, dtype='int32')
+    valid = keys >= 0
+    minor = np.where(np.isin(keys // 100 * 100, TWO_DIGIT_MINOR_KEYS), keys // 100 * 100, keys // 1000 * 1000)
+    return {
+        'Major_Key': np.where(valid, keys // 10000 * 10000, MISSING_KEY).astype('int32'),
+        'Minor_Key': np.where(valid, minor, MISSING_KEY).astype('int32'),
+        'Broad_Key': np.where(valid, keys // 10 * 10, MISSING_KEY).astype('int32'),
+    }
+
+def add_soc_keys(df, code_col='SOC_Code'):
+    """Copy of df with SOC_Key and hierarchy key columns"""
+    df = df.copy()
+    df['SOC_Key'] = soc_keys(df[code_col])
+    for name, keys in hierarchy_keys(df['SOC_Key']).items():
+        df[name] = keys
+    return df
+
+class SOCIndex:
+    """Hash index from SOC key to row position in one frame"""
+
+    def __init__(self, df, code_col='SOC_Code'):
+        self.df = df
+        self.keys = soc_keys(df[code_col])
+
+        # First row wins when a page lists an occupation twice
+        positions = pd.Series(np.arange(len(self.keys)), index=self.keys)
+        positions = positions[~positions.index.duplicated(keep='first')]
+        self.positions = positions[positions.index != MISSING_KEY]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, code):
+        return int(soc_keys([code])[0]) in self.positions.index
+
+    def lookup(self, codes):
+        """Row positions for SOC codes (-1 where absent), via one hash probe per code"""
+        return self.positions.index.get_indexer(soc_keys(codes))
+
+    def rows(self, codes):
+        """Rows of the indexed frame for SOC codes, in the given order"""
+        positions = self.lookup(codes)
+        return self.df.iloc[self.positions.to_numpy()[positions[positions >= 0]]]
+
+    def children(self, code, level='Major_Key'):
+        """Rows whose hierarchy key at the given level equals this code's key"""
+        key = soc_keys([code])[0]
+        group_keys = hierarchy_keys(self.keys)[level]
+        return self.df[(group_keys == key) & (self.keys != key)]
+
+def join_on_soc(left, right, suffixes=('_left', '_right'), code_col='SOC_Code'):
+    """Inner hash join of two OES frames on SOC key (first row per code on each side)"""
+    left = add_soc_keys(left, code_col)
+    right = add_soc_keys(right, code_col)
+    left = left[left['SOC_Key'] != MISSING_KEY].drop_duplicates('SOC_Key', keep='first')
+    right = right[right['SOC_Key'] != MISSING_KEY].drop_duplicates('SOC_Key', keep='first')
+    right = right.drop(columns=['Major_Key', 'Minor_Key', 'Broad_Key'])
+    return left.merge(right, on='SOC_Key', how='inner', suffixes=suffixes, sort=False)